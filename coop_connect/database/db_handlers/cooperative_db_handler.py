@@ -2,14 +2,58 @@ import logging
 from typing import Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import and_, delete, extract, func, insert, select, update
+from sqlalchemy import (
+    Integer,
+    String,
+    and_,
+    column,
+    delete,
+    extract,
+    func,
+    insert,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 import coop_connect.schemas.cooperative_schemas as schemas
 from coop_connect.database.orms.cooperative_orm import Cooperative as Cooperative_DB
 from coop_connect.database.orms.cooperative_orm import Member as Member_DB
-from coop_connect.root.database import async_session
+from coop_connect.database.orms.cooperative_orm import (
+    MembershipSequence as MembershipSequence_DB,
+)
+from coop_connect.database.orms.user_orm import User as User_DB
+from coop_connect.root.coop_enums import CountMode
+from coop_connect.root.database import (
+    commit,
+    on_commit,
+    read_from_primary,
+    read_scope,
+    rollback,
+    session_scope,
+)
+from coop_connect.root.settings import Settings
+from coop_connect.root.utils.pagination import (
+    count_statement,
+    estimate_row_count,
+    page_cursors,
+    paginate,
+    total_count_column,
+)
+from coop_connect.root.utils.projection import construct, projection, sparse_schema
+from coop_connect.root.utils.search import search_filter, search_rank
+from coop_connect.services.service_utils.cache_utils import (
+    cache_count,
+    get_cached_count,
+    invalidate_counts,
+    invalidate_member_role,
+    invalidate_user,
+)
 from coop_connect.services.service_utils.exception_collection import (
     CreateError,
     DuplicateError,
@@ -18,12 +62,87 @@ from coop_connect.services.service_utils.exception_collection import (
 )
 
 LOGGER = logging.getLogger(__name__)
+settings = Settings()
+
+
+async def _fetch_page(
+    session: AsyncSession,
+    model,
+    columns: tuple,
+    filters: tuple,
+    limit: int,
+    offset: int,
+    cursor,
+    count_mode: CountMode,
+    count_key: tuple,
+    joins: tuple = (),
+    rank=None,
+):
+    """
+    One listing page and its total, returns (rows, total_count, next_cursor, prev_cursor).
+
+    Rows hold only ``columns`` (see utils/projection.py), ``joins`` are (target, onclause)
+    pairs the filters need, ``rank`` orders search results.
+    """
+    statement = select(*columns)
+    for target, onclause in joins:
+        statement = statement.join(target, onclause)
+    statement = statement.filter(*filters)
+    if count_mode == CountMode.EXACT:
+        statement = statement.add_columns(
+            total_count_column(model=model, filters=filters, cursor=cursor, joins=joins)
+        )
+
+    rows = (
+        await session.execute(
+            paginate(
+                statement,
+                model=model,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                rank=rank,
+            )
+        )
+    ).all()
+    total_count = rows[0].total_count if rows and count_mode == CountMode.EXACT else 0
+    if rank is None:
+        rows, next_cursor, prev_cursor = page_cursors(
+            rows=rows, limit=limit, offset=offset, cursor=cursor
+        )
+    else:
+        # ranked pages have no keyset, callers page them with offset
+        rows, next_cursor, prev_cursor = rows[:limit], None, None
+    if not rows or count_mode == CountMode.EXACT:
+        return rows, total_count, next_cursor, prev_cursor
+
+    total_statement = count_statement(model=model, filters=filters, joins=joins)
+    if count_mode == CountMode.CACHED:
+        total_count = get_cached_count(key=count_key)
+        if total_count is None:
+            # refills follow invalidations, a lagging replica would cache the old total
+            read_from_primary(session)
+            total_count = (await session.execute(total_statement)).scalar_one()
+            cache_count(key=count_key, total_count=total_count)
+    else:
+        total_count = await estimate_row_count(
+            session=session,
+            statement=total_statement.with_only_columns(
+                model.id, maintain_column_froms=True
+            ),
+        )
+        if total_count < settings.count_estimate_threshold:
+            # planner estimates are rough on small sets, and counting them is cheap
+            total_count = (await session.execute(total_statement)).scalar_one()
+
+    return rows, total_count, next_cursor, prev_cursor
 
 
 async def create_cooperative(
     cooperative_in: schemas.CooperativeExtended,
+    session: Optional[AsyncSession] = None,
 ):
-    async with async_session() as session:
+    async with session_scope(session) as session:
         stmt = (
             insert(Cooperative_DB)
             .values(
@@ -35,18 +154,21 @@ async def create_cooperative(
             result = (await session.execute(statement=stmt)).scalar_one_or_none()
         except IntegrityError as e:
             LOGGER.error(f"duplicate record found {cooperative_in.name} - {e}")
-            await session.rollback()
+            await rollback(session)
             raise DuplicateError
         if not result:
             LOGGER.error("Cooperative User Creation Failed")
-            await session.rollback()
+            await rollback(session)
             raise CreateError
-        await session.commit()
+        on_commit(session, invalidate_counts, "cooperative")
+        await commit(session)
         return schemas.CooperativeProfile(**result.as_dict())
 
 
-async def get_cooperative_via_accronym(acronym: str):  # user_id: UUID
-    async with async_session() as session:
+async def get_cooperative_via_accronym(
+    acronym: str, session: Optional[AsyncSession] = None
+):
+    async with read_scope(session) as session:
         result = (
             await session.execute(
                 select(Cooperative_DB).filter(Cooperative_DB.acronym == acronym)
@@ -57,24 +179,27 @@ async def get_cooperative_via_accronym(acronym: str):  # user_id: UUID
         return schemas.CooperativeProfile(**result.as_dict())
 
 
-async def get_cooperatives_via_acronym(acronym: str):
+async def get_cooperatives_via_acronym(
+    acronym: str,
+    fields: frozenset = frozenset(),
+    session: Optional[AsyncSession] = None,
+):
 
-    async with async_session() as session:
-        result = (
-            (
-                await session.execute(
-                    select(Cooperative_DB).filter(Cooperative_DB.acronym == acronym)
-                )
+    schema = sparse_schema(
+        schemas.CooperativeSummary, schemas.CooperativeProfile, fields
+    )
+    async with read_scope(session) as session:
+        result = await session.execute(
+            select(*projection(Cooperative_DB, schema)).filter(
+                Cooperative_DB.acronym == acronym
             )
-            .scalars()
-            .all()
         )
 
-        return [schemas.CooperativeProfile(**x.as_dict()) for x in result]
+        return [construct(schema, row._mapping) for row in result]
 
 
-async def get_cooperative(id: UUID):  # user_id: UUID
-    async with async_session() as session:
+async def get_cooperative(id: UUID, session: Optional[AsyncSession] = None):
+    async with read_scope(session) as session:
         result = (
             await session.execute(select(Cooperative_DB).where(Cooperative_DB.id == id))
         ).scalar_one_or_none()
@@ -83,57 +208,65 @@ async def get_cooperative(id: UUID):  # user_id: UUID
         return schemas.CooperativeProfile(**result.as_dict())
 
 
-async def get_cooperatives(**kwargs):
+async def get_cooperatives(session: Optional[AsyncSession] = None, **kwargs):
 
     public_listing = kwargs.get("public_listing")
-    search = kwargs.get("search")
+    search = (kwargs.get("search") or "").strip() or None
     offset = kwargs.get("offset", 0)
     limit = kwargs.get("limit", 20)
+    cursor = kwargs.get("cursor")  # decoded pagination.Cursor, replaces offset
+    count_mode = kwargs.get("count_mode") or CountMode.EXACT
+    schema = sparse_schema(
+        schemas.CooperativeSummary,
+        schemas.CooperativeProfile,
+        kwargs.get("fields") or frozenset(),
+    )
+
+    search_columns = (Cooperative_DB.name, Cooperative_DB.acronym)
 
     filter_array = []
     if public_listing:
 
         filter_array.append(Cooperative_DB.public_listing == public_listing)
     if search:
-        filter_array.append(Cooperative_DB.name.ilike(f"%{search}%"))
-
-    async with async_session() as session:
-
-        statement = (
-            select(Cooperative_DB)
-            .filter(and_(*filter_array))
-            .offset(offset=offset)
-            .limit(limit=limit)
+        filter_array.append(search_filter(columns=search_columns, search=search))
+
+    async with read_scope(session) as session:
+        result, total_count, next_cursor, prev_cursor = await _fetch_page(
+            session=session,
+            model=Cooperative_DB,
+            columns=projection(Cooperative_DB, schema),
+            filters=tuple(filter_array),
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            count_mode=count_mode,
+            count_key=("cooperative", public_listing, search),
+            rank=search_rank(columns=search_columns, search=search) if search else None,
         )
 
-        result = (await session.execute(statement=statement)).scalars().all()
-
         if not result:
 
             return schemas.PaginatedCooperativeProfile()
 
-        total_count = (
-            await session.execute(
-                select(func.count(Cooperative_DB.id)).filter(
-                    Cooperative_DB.public_listing == public_listing
-                )
-            )
-        ).scalar()
-        return schemas.PaginatedCooperativeProfile(
-            result_set=[
-                schemas.CooperativeProfile(**coop.as_dict()) for coop in result
-            ],
+        return schemas.PaginatedCooperativeProfile.model_construct(
+            result_set=[construct(schema, row._mapping) for row in result],
             result_count=total_count,
-            page=offset + 1,
+            page=0 if cursor else (offset // limit) + 1,
             page_size=len(result),
             total_count=total_count,
+            count_mode=count_mode,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
         )
 
 
 async def update_cooperative(
-    cooperative_details: schemas.CooperativeUpdate, coop_id: UUID
+    cooperative_details: schemas.CooperativeUpdate,
+    coop_id: UUID,
+    session: Optional[AsyncSession] = None,
 ):
-    async with async_session() as session:
+    async with session_scope(session) as session:
         stmt = (
             update(Cooperative_DB)
             .where(Cooperative_DB.id == coop_id)
@@ -144,10 +277,11 @@ async def update_cooperative(
         )
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
         if not result:
-            await session.rollback()
+            await rollback(session)
             raise UpdateError
 
-        await session.commit()
+        on_commit(session, invalidate_counts, "cooperative")
+        await commit(session)
 
         return schemas.CooperativeProfile(**result.as_dict())
 
@@ -161,25 +295,84 @@ async def delete_cooperative(): ...
 # ------- START OF COOP MEMBER HANDLER MANAGEMENT -------
 async def create_coop_member(
     member: schemas.MembershipExtended,
+    session: Optional[AsyncSession] = None,
 ):
-    async with async_session() as session:
+    async with session_scope(session) as session:
         stmt = insert(Member_DB).values(member.model_dump()).returning(Member_DB)
         try:
             result = (await session.execute(statement=stmt)).scalar_one_or_none()
         except IntegrityError as e:
             LOGGER.error(f"duplicate record found for user with {member.user_id} - {e}")
-            await session.rollback()
+            await rollback(session)
             raise DuplicateError
         if not result:
             LOGGER.error("membership creation/onboarding failed")
-            await session.rollback()
+            await rollback(session)
             raise CreateError
-        await session.commit()
+        on_commit(session, invalidate_counts, "member", str(member.cooperative_id))
+        await commit(session)
         return schemas.MembershipProfile(**result.as_dict())
 
 
-async def get_coop_member_via_user_id(user_id: UUID, cooperative_id: UUID):
-    async with async_session() as session:
+async def create_coop_members(
+    members: list[schemas.MembershipImport],
+    session: Optional[AsyncSession] = None,
+) -> int:
+    """Bulk insert, sent as multi-row INSERTs rather than one round trip per member."""
+    if not members:
+        return 0
+
+    async with session_scope(session) as session:
+        try:
+            await session.execute(
+                insert(Member_DB), [member.model_dump() for member in members]
+            )
+        except IntegrityError as e:
+            LOGGER.error(f"duplicate record found in member import - {e}")
+            await rollback(session)
+            raise DuplicateError
+        on_commit(session, invalidate_counts, "member", str(members[0].cooperative_id))
+        await commit(session)
+        return len(members)
+
+
+async def get_member_user_ids(
+    cooperative_id: UUID, user_ids: list[UUID], session: Optional[AsyncSession] = None
+) -> set[UUID]:
+    """The subset of ``user_ids`` already holding a membership in the cooperative."""
+    if not user_ids:
+        return set()
+
+    async with session_scope(session) as session:
+        result = await session.execute(
+            select(Member_DB.user_id).where(
+                Member_DB.cooperative_id == cooperative_id,
+                Member_DB.user_id.in_(user_ids),
+            )
+        )
+        return set(result.scalars())
+
+
+async def get_taken_membership_ids(
+    membership_ids: list[str], session: Optional[AsyncSession] = None
+) -> set[str]:
+    if not membership_ids:
+        return set()
+
+    async with session_scope(session) as session:
+        result = await session.execute(
+            select(Member_DB.membership_id).where(
+                Member_DB.membership_id.in_(membership_ids)
+            )
+        )
+        return set(result.scalars())
+
+
+async def get_coop_member_via_user_id(
+    user_id: UUID, cooperative_id: UUID, session: Optional[AsyncSession] = None
+):
+    # permission checks and the member role cache rely on it, never a lagging replica
+    async with session_scope(session) as session:
         result = (
             await session.execute(
                 select(Member_DB).where(
@@ -195,8 +388,23 @@ async def get_coop_member_via_user_id(user_id: UUID, cooperative_id: UUID):
         return schemas.MembershipProfile(**result.as_dict())
 
 
-async def get_coop_member(id: UUID, cooperative_id: UUID):
-    async with async_session() as session:
+async def get_user_memberships(user_id: UUID, session: Optional[AsyncSession] = None):
+    # signed into access tokens as coop role claims, read from the primary
+    async with session_scope(session) as session:
+        result = (
+            await session.execute(
+                select(
+                    Member_DB.cooperative_id, Member_DB.role, Member_DB.status
+                ).where(Member_DB.user_id == user_id)
+            )
+        ).all()
+        return result
+
+
+async def get_coop_member(
+    id: UUID, cooperative_id: UUID, session: Optional[AsyncSession] = None
+):
+    async with read_scope(session) as session:
         result = (
             await session.execute(
                 select(Member_DB)
@@ -213,7 +421,7 @@ async def get_coop_member(id: UUID, cooperative_id: UUID):
         )
 
 
-async def get_all_members(id: UUID, **kwargs):
+async def get_all_members(id: UUID, session: Optional[AsyncSession] = None, **kwargs):
 
     filter_array = []
 
@@ -221,6 +429,25 @@ async def get_all_members(id: UUID, **kwargs):
     limit = kwargs.get("limit", 20)
     years = kwargs.get("years", 0)
     status = kwargs.get("status")
+    search = (kwargs.get("search") or "").strip() or None
+    cursor = kwargs.get("cursor")  # decoded pagination.Cursor, replaces offset
+    count_mode = kwargs.get("count_mode") or CountMode.EXACT
+    schema = sparse_schema(
+        schemas.MembershipSummary,
+        schemas.MembershipProfile,
+        kwargs.get("fields") or frozenset(),
+    )
+
+    search_columns = (
+        User_DB.first_name,
+        User_DB.last_name,
+        Member_DB.membership_id,
+        User_DB.phone_number,
+    )
+    joins = ()
+    if search:
+        filter_array.append(search_filter(columns=search_columns, search=search))
+        joins = ((User_DB, Member_DB.user_id == User_DB.id),)
 
     if years:
         filter_array.append(extract("year", Member_DB.date_created_utc) == years)
@@ -228,31 +455,31 @@ async def get_all_members(id: UUID, **kwargs):
     if status:
         filter_array.append(Member_DB.status == schemas.MembershipStatus(status))
 
-    async with async_session() as session:
-        base_query = (
-            select(Member_DB)
-            .filter(Member_DB.cooperative_id == id, *filter_array)
-            .limit(limit)
-            .offset(offset)
+    async with read_scope(session) as session:
+        result, total_count, next_cursor, prev_cursor = await _fetch_page(
+            session=session,
+            model=Member_DB,
+            columns=projection(Member_DB, schema),
+            filters=(Member_DB.cooperative_id == id, *filter_array),
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            count_mode=count_mode,
+            count_key=("member", str(id), status, years, search),
+            joins=joins,
+            rank=search_rank(columns=search_columns, search=search) if search else None,
         )
-
-        result = (await session.execute(base_query)).scalars().all()
         if not result:
             return schemas.PaginatedMembersResponse()
 
-        total_count = (
-            await session.execute(
-                statement=select(func.count(Member_DB.id)).filter(
-                    Member_DB.cooperative_id == id,
-                )
-            )
-        ).scalar() or 0
-
-        return schemas.PaginatedMembersResponse(
-            result_set=[schemas.MembershipProfile(**m.as_dict()) for m in result],
-            result_size=len(result),
+        return schemas.PaginatedMembersResponse.model_construct(
+            result_set=[construct(schema, row._mapping) for row in result],
+            page_size=len(result),
             total_count=total_count,
-            page=(offset // limit) + 1,
+            page=0 if cursor else (offset // limit) + 1,
+            count_mode=count_mode,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
         )
 
 
@@ -260,8 +487,9 @@ async def update_coop_membership(
     coop_member_update: schemas.MembershipExtendedUpdate,
     coop_member_id: UUID,
     coop_id: UUID,
+    session: Optional[AsyncSession] = None,
 ):
-    async with async_session() as session:
+    async with session_scope(session) as session:
         stmt = (
             update(Member_DB)
             .where(
@@ -276,13 +504,165 @@ async def update_coop_membership(
         )
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
         if not result:
-            await session.rollback()
+            await rollback(session)
             raise UpdateError
-        await session.commit()
+
+        # revokes the coop role claims already issued in this user's access tokens
+        await session.execute(
+            update(User_DB)
+            .where(User_DB.id == result.user_id)
+            .values(coop_role_version=User_DB.coop_role_version + 1)
+        )
+        on_commit(
+            session,
+            invalidate_member_role,
+            user_id=result.user_id,
+            cooperative_id=coop_id,
+        )
+        on_commit(session, invalidate_user, user_id=result.user_id)
+        on_commit(session, invalidate_counts, "member", str(coop_id))
+        await commit(session)
         return schemas.MembershipProfile(**result.as_dict())
 
 
+async def lock_pending_members(
+    coop_id: UUID, member_ids: list[UUID], session: Optional[AsyncSession] = None
+) -> list[UUID]:
+    """
+    Row-locks the members of ``member_ids`` still pending approval, oldest first,
+    so a concurrent approval of the same member waits instead of numbering it twice.
+    """
+    async with session_scope(session) as session:
+        result = await session.execute(
+            select(Member_DB.id)
+            .where(
+                Member_DB.cooperative_id == coop_id,
+                Member_DB.id.in_(member_ids),
+                Member_DB.status == schemas.MembershipStatus.PENDING_APPROVAL,
+            )
+            .order_by(Member_DB.date_created_utc, Member_DB.id)
+            .with_for_update()
+        )
+        return list(result.scalars())
+
+
+async def approve_coop_members(
+    coop_id: UUID,
+    approvals: list[tuple[UUID, str, str]],
+    session: Optional[AsyncSession] = None,
+) -> list[schemas.MembershipProfile]:
+    """Activates (member_id, membership_id, referal_code) approvals in one UPDATE ... FROM VALUES."""
+    if not approvals:
+        return []
+
+    approval_values = values(
+        column("id", PG_UUID(as_uuid=True)),
+        column("membership_id", String),
+        column("referal_code", String),
+        name="approval",
+    ).data(approvals)
+
+    async with session_scope(session) as session:
+        stmt = (
+            update(Member_DB)
+            .where(
+                Member_DB.id == approval_values.c.id,
+                Member_DB.cooperative_id == coop_id,
+                Member_DB.status == schemas.MembershipStatus.PENDING_APPROVAL,
+            )
+            .values(
+                status=schemas.MembershipStatus.ACTIVE,
+                membership_id=approval_values.c.membership_id,
+                referal_code=approval_values.c.referal_code,
+            )
+            .returning(Member_DB)
+            .execution_options(synchronize_session=False)
+        )
+        result = list((await session.execute(statement=stmt)).scalars())
+        if len(result) != len(approvals):
+            await rollback(session)
+            raise UpdateError
+
+        user_ids = [member.user_id for member in result]
+        # revokes the coop role claims already issued in these users' access tokens
+        await session.execute(
+            update(User_DB)
+            .where(User_DB.id.in_(user_ids))
+            .values(coop_role_version=User_DB.coop_role_version + 1)
+        )
+        for user_id in user_ids:
+            on_commit(
+                session, invalidate_member_role, user_id=user_id, cooperative_id=coop_id
+            )
+            on_commit(session, invalidate_user, user_id=user_id)
+        on_commit(session, invalidate_counts, "member", str(coop_id))
+        await commit(session)
+        return [schemas.MembershipProfile(**member.as_dict()) for member in result]
+
+
 async def delete_coop_member(): ...
 
 
+async def allocate_membership_numbers(
+    cooperative_id: UUID,
+    year: int,
+    count: int = 1,
+    session: Optional[AsyncSession] = None,
+) -> int:
+    """
+    Reserves ``count`` consecutive membership numbers for (cooperative, year) and
+    returns the first. The sequence row stays locked until the caller's transaction
+    ends, so concurrent approvals queue instead of issuing duplicates.
+    """
+    async with session_scope(session) as session:
+        last_value = (
+            await session.execute(
+                update(MembershipSequence_DB)
+                .where(
+                    MembershipSequence_DB.cooperative_id == cooperative_id,
+                    MembershipSequence_DB.year == year,
+                )
+                .values(last_value=MembershipSequence_DB.last_value + count)
+                .returning(MembershipSequence_DB.last_value)
+            )
+        ).scalar_one_or_none()
+
+        if last_value is None:
+            # first number of the year, continue after members numbered before the sequence existed
+            issued = (
+                select(
+                    func.coalesce(
+                        func.max(
+                            func.substring(Member_DB.membership_id, r"-(\d+)$").cast(
+                                Integer
+                            )
+                        ),
+                        0,
+                    )
+                )
+                .where(
+                    Member_DB.cooperative_id == cooperative_id,
+                    Member_DB.membership_id.like(f"%-{year}-%"),
+                )
+                .scalar_subquery()
+            )
+            stmt = pg_insert(MembershipSequence_DB).values(
+                id=uuid4(),
+                cooperative_id=cooperative_id,
+                year=year,
+                last_value=issued + count,
+            )
+            last_value = (
+                await session.execute(
+                    stmt.on_conflict_do_update(
+                        constraint="uq_membership_sequence_cooperative_year",
+                        set_={"last_value": MembershipSequence_DB.last_value + count},
+                    ).returning(MembershipSequence_DB.last_value)
+                )
+            ).scalar_one()
+
+        await commit(session)
+        return last_value - count + 1
+
+
 # ------- END OF COOP MEMBER HANDLER MANAGEMENT -------
@@ -1,25 +1,81 @@
 import logging
+import random
+from datetime import date, datetime
+from functools import lru_cache
 from typing import Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import and_, delete, extract, func, insert, select, update
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    DateTime,
+    Integer,
+    String,
+    and_,
+    bindparam,
+    cast,
+    column,
+    delete,
+    extract,
+    false,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
 
 import coop_connect.schemas.finance_schemas as schemas
 from coop_connect.database.orms.cooperative_orm import Wallet as WalletDB
 from coop_connect.database.orms.cooperative_orm import ReservedBankAccount as ReservedBankAccountDB
 from coop_connect.database.orms.cooperative_orm import Member as Member_DB
-from coop_connect.root.database import async_session
+from coop_connect.database.orms.ledger_orm import InterestAccrual as InterestAccrualDB
+from coop_connect.database.orms.ledger_orm import LedgerAccount as LedgerAccountDB
+from coop_connect.database.orms.ledger_orm import LedgerBalance as LedgerBalanceDB
+from coop_connect.database.orms.ledger_orm import LedgerBalanceCheckpoint as LedgerBalanceCheckpointDB
+from coop_connect.database.orms.ledger_orm import LedgerJournal as LedgerJournalDB
+from coop_connect.database.orms.ledger_orm import LedgerPosting as LedgerPostingDB
+from coop_connect.root.coop_enums import Ledger
+from coop_connect.root.database import (
+    async_session,
+    commit,
+    execute_precompiled,
+    precompile,
+    read_scope,
+    read_session,
+    rollback,
+    session_scope,
+)
+from coop_connect.root.settings import Settings
+from coop_connect.services.service_utils import ledger_utils
 from coop_connect.services.service_utils.exception_collection import (
     CreateError,
     DuplicateError,
+    InsufficientFunds,
     NotFound,
     UpdateError,
 )
 
 LOGGER = logging.getLogger(__name__)
 
+settings = Settings()
+
+# a batch draws one stripe, taken modulo each account's balance_stripes
+STRIPE_DRAWS = 1 << 16
+# advisory lock class of a cooperative's balance checkpoints, the object id is
+# hashtext(cooperative_id): journal batches share the lock, a checkpoint takes it alone
+CHECKPOINT_LOCK_CLASS = 22
+# advisory lock class of a cooperative's interest accruals, one day at a time
+INTEREST_ACCRUAL_LOCK_CLASS = 25
+
 
 # ------ WALLET ----------
 async def create_wallet(
@@ -47,7 +103,7 @@ async def create_wallet(
         return schemas.WalletFull(**result.as_dict())
 
 async def get_wallet(user_id: UUID, cooperative_id: UUID):
-    async with async_session() as session:
+    async with read_session() as session:
         result = (
             await session.execute(
                 select(WalletDB).where(
@@ -67,13 +123,15 @@ async def update_wallet(
     wallet_id: UUID
 
 ):
+    """Wallet settings only, the balance moves through credit_wallet/debit_wallet."""
+    values = wallet_details.model_dump(exclude_none=True, exclude_unset=True)
+    if not values:
+        raise UpdateError("nothing to update")
     async with async_session() as session:
         stmt = (
             update(WalletDB)
             .where(WalletDB.id == wallet_id)
-            .values(
-                wallet_details.model_dump(exclude_none=True, exclude_unset=True)
-            )
+            .values(values)
             .returning(WalletDB)
         )
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
@@ -84,6 +142,53 @@ async def update_wallet(
         await session.commit()
 
         return schemas.WalletFull(**result.as_dict())
+
+async def _move_wallet_balance(
+    wallet_id: UUID, delta: int, session: Optional[AsyncSession] = None
+):
+    """
+    Adds ``delta`` minor units in a single UPDATE: the row lock it takes
+    serialises concurrent changes, each applied to the balance the previous one
+    left, and the guard is re-checked against that balance.
+    """
+    stmt = (
+        update(WalletDB)
+        .where(WalletDB.id == wallet_id, WalletDB.balance + delta >= 0)
+        .values(balance=WalletDB.balance + delta, version=WalletDB.version + 1)
+        .returning(WalletDB)
+    )
+    async with session_scope(session) as session:
+        result = (await session.execute(statement=stmt)).scalar_one_or_none()
+        if not result:
+            exists = (
+                await session.execute(
+                    select(WalletDB.id).where(WalletDB.id == wallet_id)
+                )
+            ).scalar_one_or_none()
+            await rollback(session)
+            if not exists:
+                raise NotFound
+            LOGGER.info(f"wallet {wallet_id} can't cover a debit of {-delta}")
+            raise InsufficientFunds
+
+        await commit(session)
+
+        return schemas.WalletFull(**result.as_dict())
+
+async def credit_wallet(
+    wallet_id: UUID, amount: int, session: Optional[AsyncSession] = None
+):
+    return await _move_wallet_balance(
+        wallet_id=wallet_id, delta=amount, session=session
+    )
+
+async def debit_wallet(
+    wallet_id: UUID, amount: int, session: Optional[AsyncSession] = None
+):
+    """Raises InsufficientFunds, leaving the wallet as is, if the balance is short."""
+    return await _move_wallet_balance(
+        wallet_id=wallet_id, delta=-amount, session=session
+    )
     
 # ------ END OF WALLET ----------
 
@@ -114,7 +219,7 @@ async def create_bank_account(
         return schemas.BankAccountFull(**result.as_dict())
 
 async def get_bank_account(user_id: UUID, cooperative_id: UUID):
-    async with async_session() as session:
+    async with read_session() as session:
         result = (
             await session.execute(
                 select(ReservedBankAccountDB).where(
@@ -156,4 +261,677 @@ async def update_bank_account(
         await session.commit()
 
         return schemas.BankAccountFull(**result.as_dict())
-# ------ END OF BANK ACCOUNTS ----------
\ No newline at end of file
+# ------ END OF BANK ACCOUNTS ----------
+
+
+# ------ LEDGER ----------
+async def create_gl_accounts(
+    cooperative_id: UUID, session: Optional[AsyncSession] = None
+):
+    """Seeds the cooperative's GL accounts from ledger_arch.csv, existing ones are kept."""
+    async with session_scope(session) as session:
+        await session.execute(
+            pg_insert(LedgerAccountDB)
+            .values(
+                [
+                    {
+                        **account,
+                        "cooperative_id": cooperative_id,
+                        "balance_stripes": (
+                            settings.ledger_hot_account_stripes
+                            if account["code"] in ledger_utils.HOT_ACCOUNTS
+                            else 1
+                        ),
+                    }
+                    for account in ledger_utils.gl_accounts()
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
+        await commit(session)
+
+
+async def create_member_accounts(
+    cooperative_id: UUID,
+    member_ids: list[UUID],
+    session: Optional[AsyncSession] = None,
+):
+    """Opens the subsidiary accounts of every listed member, existing ones are kept."""
+    if not member_ids:
+        return
+    async with session_scope(session) as session:
+        await session.execute(
+            pg_insert(LedgerAccountDB)
+            .values(
+                [
+                    {
+                        **account,
+                        "cooperative_id": cooperative_id,
+                        "member_id": member_id,
+                    }
+                    for member_id in member_ids
+                    for account in ledger_utils.member_accounts()
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
+        await commit(session)
+
+
+def _ledger_account_filters(
+    cooperative_id: UUID,
+    member_ids: Optional[list[UUID]] = None,
+    codes: Optional[list[str]] = None,
+) -> list:
+    filters = [LedgerAccountDB.cooperative_id == cooperative_id]
+    if member_ids is None:
+        filters.append(LedgerAccountDB.ledger == Ledger.COOPERATIVE_GL)
+    else:
+        filters.append(LedgerAccountDB.member_id.in_(member_ids))
+    if codes is not None:
+        filters.append(LedgerAccountDB.code.in_(codes))
+    return filters
+
+
+async def get_ledger_accounts(
+    cooperative_id: UUID,
+    member_ids: Optional[list[UUID]] = None,
+    codes: Optional[list[str]] = None,
+    session: Optional[AsyncSession] = None,
+):
+    """GL accounts, or the subsidiary accounts of ``member_ids``, optionally only ``codes``."""
+    stmt = select(LedgerAccountDB).where(
+        *_ledger_account_filters(
+            cooperative_id=cooperative_id, member_ids=member_ids, codes=codes
+        )
+    )
+
+    async with session_scope(session) as session:
+        result = (await session.execute(stmt)).scalars().all()
+        return [schemas.LedgerAccountFull(**account.as_dict()) for account in result]
+
+
+def _journal_batch_statement():
+    """
+    One statement for a whole batch: the journals and their legs arrive as
+    arrays, journals whose reference was already posted are skipped together
+    with their legs, and legs on another cooperative's accounts are dropped so
+    the caller can tell from the posting count. The balances of the accounts
+    posted to, and their checkpoints past a back-dated leg, move in the same
+    statement; a striped account's delta lands on the stripe the batch drew, so
+    concurrent batches mostly lock different rows of it.
+    """
+    journal_rows = (
+        func.unnest(
+            bindparam("journal_ids", type_=ARRAY(PG_UUID)),
+            bindparam("references", type_=ARRAY(String)),
+            bindparam("descriptions", type_=ARRAY(String)),
+            bindparam("journal_effective_at", type_=ARRAY(DateTime)),
+        )
+        .table_valued(
+            column("id", PG_UUID),
+            column("reference", String),
+            column("description", String),
+            column("effective_at", DateTime),
+        )
+        .render_derived(name="journal_rows")
+    )
+    journals = (
+        pg_insert(LedgerJournalDB)
+        .from_select(
+            [
+                "id",
+                "cooperative_id",
+                "reference",
+                "description",
+                "effective_at",
+                "date_created_utc",
+            ],
+            select(
+                journal_rows.c.id,
+                bindparam("journal_cooperative_id", type_=PG_UUID),
+                journal_rows.c.reference,
+                journal_rows.c.description,
+                journal_rows.c.effective_at,
+                func.now(),
+            ),
+            include_defaults=False,
+        )
+        .on_conflict_do_nothing(index_elements=["cooperative_id", "reference"])
+        .returning(LedgerJournalDB.id, LedgerJournalDB.reference)
+        .cte("journals")
+    )
+
+    legs = (
+        func.unnest(
+            bindparam("posting_journal_ids", type_=ARRAY(PG_UUID)),
+            bindparam("account_ids", type_=ARRAY(PG_UUID)),
+            bindparam("amounts", type_=ARRAY(BigInteger)),
+            bindparam("posting_effective_at", type_=ARRAY(DateTime)),
+        )
+        .table_valued(
+            column("journal_id", PG_UUID),
+            column("account_id", PG_UUID),
+            column("amount", BigInteger),
+            column("effective_at", DateTime),
+        )
+        .render_derived(name="legs")
+    )
+    postings = (
+        insert(LedgerPostingDB)
+        .from_select(
+            [
+                "id",
+                "journal_id",
+                "account_id",
+                "amount",
+                "effective_at",
+                "date_created_utc",
+            ],
+            select(
+                # generated here, a batch can carry a posting per member
+                func.gen_random_uuid(),
+                legs.c.journal_id,
+                legs.c.account_id,
+                legs.c.amount,
+                legs.c.effective_at,
+                func.now(),
+            )
+            .join(journals, journals.c.id == legs.c.journal_id)
+            .join(
+                LedgerAccountDB,
+                and_(
+                    LedgerAccountDB.id == legs.c.account_id,
+                    LedgerAccountDB.cooperative_id
+                    == bindparam("journal_cooperative_id", type_=PG_UUID),
+                ),
+            ),
+            include_defaults=False,
+        )
+        .returning(
+            LedgerPostingDB.id,
+            LedgerPostingDB.account_id,
+            LedgerPostingDB.amount,
+            LedgerPostingDB.effective_at,
+        )
+        .cte("postings")
+    )
+
+    stripe = (
+        bindparam("stripe", type_=Integer) % LedgerAccountDB.balance_stripes
+    ).label("stripe")
+    deltas = (
+        select(
+            postings.c.account_id,
+            stripe,
+            cast(func.sum(postings.c.amount), BigInteger).label("amount"),
+        )
+        .join(LedgerAccountDB, LedgerAccountDB.id == postings.c.account_id)
+        .group_by(postings.c.account_id, stripe)
+        .subquery("deltas")
+    )
+    balances = pg_insert(LedgerBalanceDB).from_select(
+        ["id", "account_id", "stripe", "balance", "date_created_utc"],
+        # row order, so concurrent batches lock shared balance rows in the same order
+        select(
+            func.gen_random_uuid(),
+            deltas.c.account_id,
+            deltas.c.stripe,
+            deltas.c.amount,
+            func.now(),
+        ).order_by(deltas.c.account_id, deltas.c.stripe),
+        include_defaults=False,
+    )
+    balances = (
+        balances.on_conflict_do_update(
+            index_elements=["account_id", "stripe"],
+            set_={
+                "balance": LedgerBalanceDB.balance + balances.excluded.balance,
+                "date_updated_utc": func.now(),
+            },
+        )
+        .returning(LedgerBalanceDB.id)
+        .cte("balances")
+    )
+
+    checkpoint = aliased(LedgerBalanceCheckpointDB)
+    late = (
+        select(
+            checkpoint.id,
+            cast(func.sum(postings.c.amount), BigInteger).label("amount"),
+        )
+        .join(
+            postings,
+            and_(
+                postings.c.account_id == checkpoint.account_id,
+                postings.c.effective_at < checkpoint.as_of,
+            ),
+        )
+        .group_by(checkpoint.id)
+        .subquery("late")
+    )
+    restated = (
+        update(LedgerBalanceCheckpointDB)
+        .where(LedgerBalanceCheckpointDB.id == late.c.id)
+        .values(
+            balance=LedgerBalanceCheckpointDB.balance + late.c.amount,
+            date_updated_utc=func.now(),
+        )
+        .returning(LedgerBalanceCheckpointDB.id)
+        .cte("restated")
+    )
+
+    return (
+        select(
+            journals.c.reference,
+            select(func.count()).select_from(postings).scalar_subquery(),
+        )
+        # unreferenced, they only need to run
+        .add_cte(balances)
+        .add_cte(restated)
+    )
+
+
+@lru_cache(maxsize=None)
+def _journal_batch_compiled():
+    """
+    Uncacheable (ON CONFLICT), compiled once instead of on every batch. Built on
+    first use: aliasing an ORM class configures every mapper, which needs all of
+    the ORM modules imported first.
+    """
+    return precompile(_journal_batch_statement())
+
+
+def _journal_batch_params(
+    cooperative_id: UUID, entries: list[schemas.JournalEntry]
+) -> tuple[dict, dict]:
+    journal_ids = [uuid4() for _ in entries]
+    params = {
+        "journal_cooperative_id": cooperative_id,
+        "stripe": random.randrange(STRIPE_DRAWS),
+        "journal_ids": journal_ids,
+        "references": [entry.reference for entry in entries],
+        "descriptions": [entry.description for entry in entries],
+        "journal_effective_at": [entry.effective_at for entry in entries],
+        "posting_journal_ids": [],
+        "account_ids": [],
+        "amounts": [],
+        "posting_effective_at": [],
+    }
+    legs_per_reference = {}
+    for journal_id, entry in zip(journal_ids, entries):
+        account_ids = [leg.account_id for leg in entry.legs]
+        amounts = [leg.amount for leg in entry.legs]
+        if entry.detail is not None:
+            account_ids += entry.detail.account_ids
+            amounts += entry.detail.amounts
+        legs_per_reference[entry.reference] = len(account_ids)
+        params["posting_journal_ids"] += [journal_id] * len(account_ids)
+        params["account_ids"] += account_ids
+        params["amounts"] += amounts
+        params["posting_effective_at"] += [entry.effective_at] * len(account_ids)
+    return params, legs_per_reference
+
+
+def _cooperative_lock(lock_class: int, cooperative_id: UUID, shared: bool = False):
+    """Transaction-level advisory lock of ``lock_class`` on the cooperative."""
+    lock = func.pg_advisory_xact_lock_shared if shared else func.pg_advisory_xact_lock
+    return select(lock(lock_class, func.hashtext(str(cooperative_id))))
+
+
+def _checkpoint_lock(cooperative_id: UUID, shared: bool):
+    """Transaction-level advisory lock on the cooperative's balance checkpoints."""
+    return _cooperative_lock(CHECKPOINT_LOCK_CLASS, cooperative_id, shared=shared)
+
+
+async def post_journals(
+    cooperative_id: UUID,
+    entries: list[schemas.JournalEntry],
+    session: Optional[AsyncSession] = None,
+) -> list[str]:
+    """
+    Posts balanced ``entries`` and their detail in one round trip and returns
+    the references written; references posted before are skipped. Raises
+    UpdateError, writing nothing, if a posting isn't on one of the cooperative's
+    accounts.
+    """
+    if not entries:
+        return []
+    params, legs_per_reference = _journal_batch_params(
+        cooperative_id=cooperative_id, entries=entries
+    )
+    async with session_scope(session) as session:
+        # a statement of its own, so the batch sees a checkpoint committed meanwhile
+        await session.execute(
+            _checkpoint_lock(cooperative_id=cooperative_id, shared=True)
+        )
+        rows = (
+            await execute_precompiled(session, _journal_batch_compiled(), params)
+        ).all()
+        posted = [row[0] for row in rows]
+        postings = rows[0][1] if rows else 0
+        if postings != sum(legs_per_reference[reference] for reference in posted):
+            LOGGER.error(
+                f"journal batch for {cooperative_id} has legs on foreign accounts"
+            )
+            await rollback(session)
+            raise UpdateError
+        await commit(session)
+        return posted
+
+
+# postings effective from the start of time, for accounts without a checkpoint
+NO_CHECKPOINT = literal(datetime.min, DateTime)
+
+
+def _as_of_balance_select(as_of: datetime, *columns):
+    """``columns`` of ledger_account plus each account's balance as of ``as_of``."""
+    checkpoint = (
+        select(LedgerBalanceCheckpointDB.as_of, LedgerBalanceCheckpointDB.balance)
+        .where(
+            LedgerBalanceCheckpointDB.account_id == LedgerAccountDB.id,
+            LedgerBalanceCheckpointDB.as_of <= as_of,
+        )
+        .order_by(LedgerBalanceCheckpointDB.as_of.desc())
+        .limit(1)
+        .lateral("checkpoint")
+    )
+    delta = (
+        select(func.sum(LedgerPostingDB.amount).label("amount"))
+        .where(
+            LedgerPostingDB.account_id == LedgerAccountDB.id,
+            LedgerPostingDB.effective_at
+            >= func.coalesce(checkpoint.c.as_of, NO_CHECKPOINT),
+            LedgerPostingDB.effective_at < as_of,
+        )
+        .lateral("delta")
+    )
+    return (
+        select(
+            *columns,
+            cast(
+                func.coalesce(checkpoint.c.balance, 0)
+                + func.coalesce(delta.c.amount, 0),
+                BigInteger,
+            ),
+        )
+        .select_from(LedgerAccountDB)
+        .outerjoin(checkpoint, true())
+        .join(delta, true())
+    )
+
+
+async def get_ledger_balances(
+    cooperative_id: UUID,
+    member_ids: Optional[list[UUID]] = None,
+    codes: Optional[list[str]] = None,
+    as_of: Optional[datetime] = None,
+    session: Optional[AsyncSession] = None,
+):
+    """
+    Current balances of the accounts ``get_ledger_accounts`` selects, or their
+    balances over the postings effective before ``as_of``: the latest checkpoint
+    at or before ``as_of`` plus the postings between the two.
+    """
+    filters = _ledger_account_filters(
+        cooperative_id=cooperative_id, member_ids=member_ids, codes=codes
+    )
+    if as_of is None:
+        # striped accounts sum their stripes
+        balance = (
+            select(
+                cast(func.coalesce(func.sum(LedgerBalanceDB.balance), 0), BigInteger)
+            )
+            .where(LedgerBalanceDB.account_id == LedgerAccountDB.id)
+            .scalar_subquery()
+        )
+        stmt = select(LedgerAccountDB, balance).where(*filters)
+    else:
+        stmt = _as_of_balance_select(as_of, LedgerAccountDB).where(*filters)
+
+    async with read_scope(session) as session:
+        result = (await session.execute(stmt)).all()
+        return [
+            schemas.LedgerBalance(**account.as_dict(), balance=balance, as_of=as_of)
+            for account, balance in result
+        ]
+
+
+def _checkpoint_statement(as_of: datetime, cooperative_id: UUID):
+    previous = (
+        select(LedgerBalanceCheckpointDB.as_of, LedgerBalanceCheckpointDB.balance)
+        .where(
+            LedgerBalanceCheckpointDB.account_id == LedgerAccountDB.id,
+            LedgerBalanceCheckpointDB.as_of < as_of,
+        )
+        .order_by(LedgerBalanceCheckpointDB.as_of.desc())
+        .limit(1)
+        .lateral("previous")
+    )
+    activity = (
+        select(
+            func.sum(LedgerPostingDB.amount).label("amount"),
+            func.count().label("postings"),
+        )
+        .where(
+            LedgerPostingDB.account_id == LedgerAccountDB.id,
+            LedgerPostingDB.effective_at
+            >= func.coalesce(previous.c.as_of, NO_CHECKPOINT),
+            LedgerPostingDB.effective_at < as_of,
+        )
+        .lateral("activity")
+    )
+    accounts = (
+        select(
+            func.gen_random_uuid(),
+            LedgerAccountDB.id,
+            literal(as_of, DateTime),
+            cast(
+                func.coalesce(previous.c.balance, 0) + activity.c.amount, BigInteger
+            ),
+            func.now(),
+        )
+        .outerjoin(previous, true())
+        .join(activity, true())
+        .where(
+            LedgerAccountDB.cooperative_id == cooperative_id,
+            # a quiet account is still answered by its previous checkpoint
+            activity.c.postings > 0,
+        )
+    )
+
+    return (
+        pg_insert(LedgerBalanceCheckpointDB)
+        .from_select(
+            ["id", "account_id", "as_of", "balance", "date_created_utc"],
+            accounts,
+            include_defaults=False,
+        )
+        .on_conflict_do_nothing(index_elements=["account_id", "as_of"])
+    )
+
+
+async def create_balance_checkpoints(
+    as_of: datetime,
+    cooperative_id: UUID,
+    session: Optional[AsyncSession] = None,
+) -> int:
+    """
+    Checkpoints every account of the cooperative posted to since its previous
+    checkpoint, over the postings effective before ``as_of``. Returns the number
+    of checkpoints written.
+    """
+    async with session_scope(session) as session:
+        # journal batches restate the checkpoints past a back-dated leg; holding
+        # the cooperative's batches off until this commits keeps one from landing
+        # between the sums below and the checkpoint it should have restated
+        await session.execute(
+            _checkpoint_lock(cooperative_id=cooperative_id, shared=False)
+        )
+        result = await session.execute(
+            _checkpoint_statement(as_of=as_of, cooperative_id=cooperative_id)
+        )
+        await commit(session)
+        return result.rowcount
+
+
+async def get_ledger_cooperative_ids(session: Optional[AsyncSession] = None):
+    """Every cooperative with a seeded GL."""
+    async with read_scope(session) as session:
+        result = await session.execute(
+            select(LedgerAccountDB.cooperative_id).where(
+                LedgerAccountDB.member_id.is_(None),
+                LedgerAccountDB.code == ledger_utils.BANK_OPERATING,
+            )
+        )
+        return result.scalars().all()
+
+
+async def lock_interest_accruals(cooperative_id: UUID, session: AsyncSession):
+    """Holds off the cooperative's other accruals until the transaction ends."""
+    await session.execute(
+        _cooperative_lock(INTEREST_ACCRUAL_LOCK_CLASS, cooperative_id)
+    )
+
+
+async def get_interest_accrued_through(
+    cooperative_id: UUID, session: Optional[AsyncSession] = None
+) -> Optional[date]:
+    """The latest day accrued on the cooperative's accounts, None if none was."""
+    stmt = (
+        select(func.max(InterestAccrualDB.accrued_through))
+        .join(LedgerAccountDB, LedgerAccountDB.id == InterestAccrualDB.account_id)
+        .where(LedgerAccountDB.cooperative_id == cooperative_id)
+    )
+    async with session_scope(session) as session:
+        return (await session.execute(stmt)).scalar()
+
+
+async def get_interest_accrual_inputs(
+    cooperative_id: UUID,
+    codes: list[str],
+    as_of: datetime,
+    member_detail_codes: Optional[dict[str, str]] = None,
+    session: Optional[AsyncSession] = None,
+) -> list[tuple]:
+    """
+    (account_id, code, carried residual, detail account id, balance as of
+    ``as_of``) of every member account in ``codes``. The detail account is the
+    member's account of ``member_detail_codes[code]``, None for other codes.
+    Plain rows, a cooperative can have a million.
+    """
+    detail_account = aliased(LedgerAccountDB)
+    stmt = (
+        _as_of_balance_select(
+            as_of,
+            LedgerAccountDB.id,
+            LedgerAccountDB.code,
+            func.coalesce(InterestAccrualDB.residual, 0),
+            detail_account.id,
+        )
+        .outerjoin(
+            InterestAccrualDB, InterestAccrualDB.account_id == LedgerAccountDB.id
+        )
+        .outerjoin(
+            detail_account,
+            and_(
+                detail_account.cooperative_id == LedgerAccountDB.cooperative_id,
+                detail_account.member_id == LedgerAccountDB.member_id,
+                or_(
+                    false(),
+                    *(
+                        and_(
+                            LedgerAccountDB.code == code,
+                            detail_account.code == detail_code,
+                        )
+                        for code, detail_code in (member_detail_codes or {}).items()
+                    ),
+                ),
+            ),
+        )
+        .where(
+            LedgerAccountDB.cooperative_id == cooperative_id,
+            LedgerAccountDB.ledger == Ledger.MEMBERS_SUBSIDIARY,
+            LedgerAccountDB.code.in_(codes),
+        )
+    )
+    async with read_scope(session) as session:
+        return (await session.execute(stmt)).tuples().all()
+
+
+def _interest_accrual_statement():
+    accruals = (
+        func.unnest(
+            bindparam("account_ids", type_=ARRAY(PG_UUID)),
+            bindparam("amounts", type_=ARRAY(BigInteger)),
+            bindparam("residuals", type_=ARRAY(BigInteger)),
+        )
+        .table_valued(
+            column("account_id", PG_UUID),
+            column("amount", BigInteger),
+            column("residual", BigInteger),
+        )
+        .render_derived(name="accruals")
+    )
+    stmt = pg_insert(InterestAccrualDB).from_select(
+        [
+            "id",
+            "account_id",
+            "accrued",
+            "residual",
+            "accrued_through",
+            "date_created_utc",
+        ],
+        select(
+            func.gen_random_uuid(),
+            accruals.c.account_id,
+            accruals.c.amount,
+            accruals.c.residual,
+            bindparam("accrual_date", type_=Date),
+            func.now(),
+        ),
+        include_defaults=False,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=["account_id"],
+        set_={
+            "accrued": InterestAccrualDB.accrued + stmt.excluded.accrued,
+            "residual": stmt.excluded.residual,
+            "accrued_through": stmt.excluded.accrued_through,
+            "date_updated_utc": func.now(),
+        },
+        # a rerun of the account's day is left alone, earlier days are refused
+        # by the service under lock_interest_accruals
+        where=InterestAccrualDB.accrued_through < stmt.excluded.accrued_through,
+    )
+
+
+@lru_cache(maxsize=None)
+def _interest_accrual_compiled():
+    """Uncacheable (ON CONFLICT), compiled once on first use like the journal batch."""
+    return precompile(_interest_accrual_statement())
+
+
+async def record_interest_accruals(
+    account_ids: list[UUID],
+    amounts: list[int],
+    residuals: list[int],
+    accrual_date: date,
+    session: Optional[AsyncSession] = None,
+):
+    """Adds a day's amounts to the accounts' accrued interest and stores their residuals."""
+    if not account_ids:
+        return
+    async with session_scope(session) as session:
+        await execute_precompiled(
+            session,
+            _interest_accrual_compiled(),
+            {
+                "account_ids": account_ids,
+                "amounts": amounts,
+                "residuals": residuals,
+                "accrual_date": accrual_date,
+            },
+        )
+        await commit(session)
+# ------ END OF LEDGER ----------
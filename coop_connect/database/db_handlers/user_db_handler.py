@@ -1,16 +1,17 @@
 import logging
 from uuid import UUID, uuid4
 
-from sqlalchemy import and_, delete, insert, select, update
+from sqlalchemy import and_, delete, insert, or_, select, update
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, load_only
 
 import coop_connect.schemas.user_schemas as schemas
 from coop_connect.database.orms.misc_orm import File
 from coop_connect.database.orms.user_orm import MfaToken as MfaToken_DB
 from coop_connect.database.orms.user_orm import User as User_DB
 from coop_connect.database.orms.user_orm import UserBio as UserBio_DB
-from coop_connect.root.database import async_session
+from coop_connect.root.database import async_session, read_session
+from coop_connect.services.service_utils.cache_utils import invalidate_user
 from coop_connect.services.service_utils.exception_collection import (
     CreateError,
     DuplicateError,
@@ -57,18 +58,51 @@ async def get_user(email: str = None, phone_number: str = None):
         return schemas.UserProfile(**result.as_dict())
 
 
+async def get_users_by_contact(
+    emails: list[str], phone_numbers: list[str]
+) -> list[schemas.UserContact]:
+    """Users matching any of ``emails``/``phone_numbers``, with their bio id when onboarded."""
+    if not emails and not phone_numbers:
+        return []
+
+    async with async_session() as session:
+        result = await session.execute(
+            select(
+                User_DB.id,
+                User_DB.email,
+                User_DB.phone_number,
+                UserBio_DB.id.label("bio_id"),
+            )
+            .outerjoin(UserBio_DB, UserBio_DB.user_id == User_DB.id)
+            .where(
+                or_(User_DB.email.in_(emails), User_DB.phone_number.in_(phone_numbers))
+            )
+        )
+        return [schemas.UserContact(**row._mapping) for row in result]
+
+
 async def get(user_id: UUID):
+    # only the columns UserBioRead/FileLite expose are hydrated for the bio files
+    file_columns = (File.id, File.purpose, File.file_name, File.link)
+    # authenticates every request and refills the profile cache (coop_role_version
+    # included), so it reads the primary: a replica may not have seen a revocation
     async with async_session() as session:
         result = (
             (
                 await session.execute(
                     select(User_DB)
                     .options(
-                        joinedload(User_DB.bio).joinedload(
-                            UserBio_DB.identification_file
-                        ),
-                        joinedload(User_DB.bio).joinedload(UserBio_DB.passport_file),
-                        joinedload(User_DB.bio).joinedload(UserBio_DB.signature_file),
+                        joinedload(User_DB.bio).options(
+                            joinedload(UserBio_DB.identification_file).load_only(
+                                *file_columns
+                            ),
+                            joinedload(UserBio_DB.passport_file).load_only(
+                                *file_columns
+                            ),
+                            joinedload(UserBio_DB.signature_file).load_only(
+                                *file_columns
+                            ),
+                        )
                     )
                     .where(User_DB.id == user_id)
                 )
@@ -103,9 +137,30 @@ async def update_user(user_update: schemas.UserUpdate, user_id: UUID):
             raise UpdateError
 
         await session.commit()
+        invalidate_user(user_id=user_id)
         return schemas.UserProfile(**result.as_dict())
 
 
+async def update_user_password(user_id: UUID, password: str):
+
+    async with async_session() as session:
+        stmt = (
+            update(User_DB)
+            .where(User_DB.id == user_id)
+            .values(password=password)
+            .returning(User_DB.id)
+        )
+
+        result = (await session.execute(statement=stmt)).scalar_one_or_none()
+
+        if not result:
+            raise UpdateError
+
+        await session.commit()
+        invalidate_user(user_id=user_id)
+        return result
+
+
 async def delete_user(): ...
 
 
@@ -230,12 +285,12 @@ async def create_user_bio(user_bio: schemas.UserBio, user_id: UUID):
             )
 
         await session.commit()
-        print(result.as_dict())
+        invalidate_user(user_id=user_id)
         return schemas.UserBio(**result.as_dict())
 
 
 async def get_user_bio(user_id: UUID):
-    async with async_session() as session:
+    async with read_session() as session:
         stmt = select(UserBio_DB).filter(UserBio_DB.user_id == user_id)
 
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
@@ -262,4 +317,5 @@ async def update_user_bio(user_bio: schemas.UserBio, user_id: UUID):
             raise UpdateError(f"User Bio update failed for user_id: {user_id}")
 
         await session.commit()
+        invalidate_user(user_id=user_id)
         return schemas.UserBio(**result.as_dict())
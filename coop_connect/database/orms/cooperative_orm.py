@@ -1,18 +1,23 @@
 from sqlalchemy import (
     ARRAY,
+    BigInteger,
     Boolean,
+    CheckConstraint,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
+    UniqueConstraint,
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.ext.mutable import MutableList
 from sqlalchemy.orm import relationship
 
 from coop_connect.root.utils.abstract_base import AbstractBase
+from coop_connect.root.utils.search import trigram_index
 
 
 class Cooperative(AbstractBase):
@@ -33,6 +38,14 @@ class Cooperative(AbstractBase):
         "User", back_populates="cooperatives", foreign_keys=[created_by]
     )
 
+    __table_args__ = (
+        # keyset pagination order, see root/utils/pagination.py
+        Index("ix_cooperative_date_created_utc_id", "date_created_utc", "id"),
+        # search, see root/utils/search.py
+        trigram_index("ix_cooperative_name_trgm", "name"),
+        trigram_index("ix_cooperative_acronym_trgm", "acronym"),
+    )
+
 
 class Member(AbstractBase):
     user_id = Column(UUID, ForeignKey("user.id"), nullable=False)
@@ -77,17 +90,51 @@ class Member(AbstractBase):
     bio = relationship("UserBio", back_populates="member", foreign_keys=[user_bio])
     cooperative = relationship("Cooperative", foreign_keys=[cooperative_id])
 
+    __table_args__ = (
+        # keyset pagination of a cooperative's members
+        Index(
+            "ix_member_cooperative_id_date_created_utc_id",
+            "cooperative_id",
+            "date_created_utc",
+            "id",
+        ),
+        trigram_index("ix_member_membership_id_trgm", "membership_id"),
+        # membership lookups, permission checks and a user's memberships
+        Index("ix_member_user_id_cooperative_id", "user_id", "cooperative_id"),
+    )
+
+
+class MembershipSequence(AbstractBase):
+    """Last membership number issued per cooperative and year, e.g. 42 for THEO-2025-042."""
+
+    cooperative_id = Column(UUID, ForeignKey("cooperative.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    last_value = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "cooperative_id", "year", name="uq_membership_sequence_cooperative_year"
+        ),
+    )
+
 
 class Wallet(AbstractBase):
     user_id = Column(UUID, ForeignKey("user.id"), nullable=False)
     cooperative_id = Column(UUID, ForeignKey("cooperative.id"), nullable=False)
-    balance = Column(String, default=0, nullable=False)
+    # minor units, 10 ** precision per currency unit; only moved by credit/debit
+    balance = Column(BigInteger, default=0, server_default="0", nullable=False)
+    version = Column(Integer, default=0, server_default="0", nullable=False)
     currency_code = Column(String, nullable=False)
     precision = Column(Integer, default=2, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     user = relationship("User", foreign_keys=[user_id])
     cooperative = relationship("Cooperative", foreign_keys=[cooperative_id])
 
+    __table_args__ = (
+        Index("ix_wallet_user_id_cooperative_id", "user_id", "cooperative_id"),
+        CheckConstraint("balance >= 0", name="ck_wallet_balance_non_negative"),
+    )
+
 
 class ReservedBankAccount(AbstractBase):
     user_id = Column(UUID, ForeignKey("user.id"), nullable=False)
@@ -103,6 +150,14 @@ class ReservedBankAccount(AbstractBase):
     user = relationship("User", foreign_keys=[user_id])
     cooperative = relationship("Cooperative", foreign_keys=[cooperative_id])
 
+    __table_args__ = (
+        Index(
+            "ix_reserved_bank_account_user_id_cooperative_id",
+            "user_id",
+            "cooperative_id",
+        ),
+    )
+
 
 # class IncomingDeposits(AbstractBase):
 #     user_id =
@@ -0,0 +1,124 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
+from sqlalchemy.dialects.postgresql import UUID
+
+from coop_connect.root.utils.abstract_base import AbstractBase
+
+
+class LedgerAccount(AbstractBase):
+    """An account of ledger_arch.csv, GL accounts have no member_id."""
+
+    cooperative_id = Column(UUID, ForeignKey("cooperative.id"), nullable=False)
+    member_id = Column(UUID, ForeignKey("member.id"), nullable=True)
+    ledger = Column(String, nullable=False)
+    code = Column(String, nullable=False)  # "1010", or "savings" for member accounts
+    name = Column(String, nullable=False)
+    account_type = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    # rows its balance is spread over, > 1 for accounts every deposit posts to
+    balance_stripes = Column(Integer, default=1, server_default="1", nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ux_ledger_account_cooperative_id_member_id_code",
+            "cooperative_id",
+            "member_id",
+            "code",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+        Index("ix_ledger_account_member_id", "member_id"),
+    )
+
+
+class LedgerJournal(AbstractBase):
+    """One balanced entry, append-only; corrections are posted as new journals."""
+
+    cooperative_id = Column(UUID, ForeignKey("cooperative.id"), nullable=False)
+    reference = Column(String, nullable=False)  # idempotency key within the coop
+    description = Column(String, nullable=True)
+    effective_at = Column(DateTime(), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ux_ledger_journal_cooperative_id_reference",
+            "cooperative_id",
+            "reference",
+            unique=True,
+        ),
+    )
+
+
+class LedgerPosting(AbstractBase):
+    """One leg of a journal, append-only."""
+
+    journal_id = Column(UUID, ForeignKey("ledger_journal.id"), nullable=False)
+    account_id = Column(UUID, ForeignKey("ledger_account.id"), nullable=False)
+    amount = Column(BigInteger, nullable=False)  # minor units, debit > 0, credit < 0
+    effective_at = Column(DateTime(), nullable=False)  # copied from the journal
+
+    __table_args__ = (
+        Index("ix_ledger_posting_journal_id", "journal_id"),
+        Index(
+            "ix_ledger_posting_account_id_effective_at", "account_id", "effective_at"
+        ),
+    )
+
+
+class LedgerBalance(AbstractBase):
+    """
+    Running balance of an account, kept in step by every journal batch. Striped
+    accounts have one row per stripe a batch posted to, their balance is the sum.
+    """
+
+    account_id = Column(UUID, ForeignKey("ledger_account.id"), nullable=False)
+    stripe = Column(Integer, default=0, server_default="0", nullable=False)
+    balance = Column(BigInteger, nullable=False)  # sum of the stripe's postings
+
+    __table_args__ = (
+        Index(
+            "ux_ledger_balance_account_id_stripe", "account_id", "stripe", unique=True
+        ),
+    )
+
+
+class LedgerBalanceCheckpoint(AbstractBase):
+    """Balance of an account over the postings effective before ``as_of``."""
+
+    account_id = Column(UUID, ForeignKey("ledger_account.id"), nullable=False)
+    as_of = Column(DateTime(), nullable=False)
+    balance = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ux_ledger_balance_checkpoint_account_id_as_of",
+            "account_id",
+            "as_of",
+            unique=True,
+        ),
+    )
+
+
+class InterestAccrual(AbstractBase):
+    """
+    Interest accrued on a member's savings or loan principal account: the
+    per-member share of the daily journals and the remainder not yet posted.
+    """
+
+    account_id = Column(UUID, ForeignKey("ledger_account.id"), nullable=False)
+    accrued = Column(BigInteger, nullable=False)  # minor units posted so far
+    # carried into the next accrual, in 1 / (RATE_SCALE * day_count) minor units
+    residual = Column(BigInteger, nullable=False)
+    accrued_through = Column(Date, nullable=False)  # last day accrued
+
+    __table_args__ = (
+        Index("ux_interest_accrual_account_id", "account_id", unique=True),
+    )
@@ -1,10 +1,11 @@
 from datetime import datetime, timedelta
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 
 from coop_connect.root.utils.abstract_base import AbstractBase
+from coop_connect.root.utils.search import trigram_index
 
 
 class User(AbstractBase):
@@ -16,6 +17,8 @@ class User(AbstractBase):
     user_type = Column(String, nullable=False)
     dob = Column(DateTime, nullable=True)
     gender = Column(String, nullable=True)
+    # bumped whenever a membership role/status changes, invalidates role claims in tokens
+    coop_role_version = Column(Integer, nullable=False, default=0, server_default="0")
     bio = relationship("UserBio", back_populates="user", uselist=False)
     cooperatives = relationship(
         "Cooperative",
@@ -23,6 +26,13 @@ class User(AbstractBase):
         foreign_keys="Cooperative.created_by",
     )
 
+    __table_args__ = (
+        # member search, see root/utils/search.py
+        trigram_index("ix_user_first_name_trgm", "first_name"),
+        trigram_index("ix_user_last_name_trgm", "last_name"),
+        trigram_index("ix_user_phone_number_trgm", "phone_number"),
+    )
+
 
 class UserBio(AbstractBase):
     user_id = Column(UUID, ForeignKey("user.id"), nullable=False)
@@ -37,6 +47,8 @@ class UserBio(AbstractBase):
     signature_file = relationship("File", foreign_keys=[signature])
     member = relationship("Member", back_populates="bio", uselist=False)
 
+    __table_args__ = (Index("ix_user_bio_user_id", "user_id"),)
+
 
 class MfaToken(AbstractBase):
     phone_number = Column(String, nullable=True)
@@ -49,6 +61,12 @@ class MfaToken(AbstractBase):
         default=lambda: datetime.now() + timedelta(minutes=30),
     )
 
+    # code lookups use the unique constraint's index
+    __table_args__ = (
+        Index("ix_mfa_token_phone_number_verified", "phone_number", "verified"),
+        Index("ix_mfa_token_email_verified", "email", "verified"),
+    )
+
 
 # Cooperative -> [# Cooperative_Members]{"meta": {"level_info": 1000}}
 # Uploads (S3 uploads) [Signature]
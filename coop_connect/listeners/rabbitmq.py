@@ -7,6 +7,7 @@ import aio_pika
 from aio_pika.abc import AbstractIncomingMessage
 
 from coop_connect.root.settings import settings
+from coop_connect.root.utils.metrics import observe_publish
 
 # from coop_connect.services.payaza_service import process_payaza_payment
 
@@ -32,17 +33,19 @@ async def publish_to_rabbitmq(message: Dict[str, Any], queue_name: str):
         queue_name (str): Name of the RabbitMQ queue
     """
     try:
-        # Connect to RabbitMQ
-        channel, queue = await get_rabbitmq_channel(queue_name)
-
-        # Prepare message
-        message_body = json.dumps(message, default=str)
-        rabbitmq_message = aio_pika.Message(
-            message_body.encode("utf-8"), delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-        )
-
-        # Publish message
-        await channel.default_exchange.publish(rabbitmq_message, routing_key=queue)
+        async with observe_publish(queue=queue_name):
+            # Connect to RabbitMQ
+            channel, queue = await get_rabbitmq_channel(queue_name)
+
+            # Prepare message
+            message_body = json.dumps(message, default=str)
+            rabbitmq_message = aio_pika.Message(
+                message_body.encode("utf-8"),
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            )
+
+            # Publish message
+            await channel.default_exchange.publish(rabbitmq_message, routing_key=queue)
 
         LOGGER.info(f"Successfully published webhook to RabbitMQ queue: {queue_name}")
 
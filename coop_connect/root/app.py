@@ -1,19 +1,54 @@
 import logging
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.responses import RedirectResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from coop_connect.root.api_router import router
 from coop_connect.root.coop_enums import Environment
+from coop_connect.root.database import (
+    engine,
+    pool_stats,
+    replica_engine,
+    warm_up_pool,
+)
 from coop_connect.root.settings import settings
+from coop_connect.root.utils.metrics import MetricsMiddleware
+from coop_connect.root.utils.profiling import ProfilingMiddleware
+from coop_connect.root.utils.query_stats import (
+    QueryStatsMiddleware,
+    dispose_plan_engines,
+    instrument_engine,
+)
 
 LOGGER = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_up_pool()
+    yield
+    await engine.dispose()
+    if replica_engine is not engine:
+        await replica_engine.dispose()
+    await dispose_plan_engines()
+
+
 def intialize() -> FastAPI:
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
     app.include_router(router=router)
 
+    if settings.query_stats_enabled:
+        for bind in {engine, replica_engine}:
+            instrument_engine(bind)
+        app.add_middleware(QueryStatsMiddleware)
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+    # added last, so it wraps the other middlewares as well
+    if settings.profiling_enabled:
+        app.add_middleware(ProfilingMiddleware)
+
     return app
 
 
@@ -25,6 +60,18 @@ def health_check():
     return {"message": "server is up, and healthy"}
 
 
+@app.get("/health-check/db-pool")
+def db_pool_health_check():
+    return pool_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/", status_code=307)
 def root():
     url = "/docs"
@@ -65,7 +65,26 @@ class QuestionType(StrEnum):
     FILE_UPLOAD = "File_Upload"
 
 
+class CountMode(StrEnum):
+    EXACT = "Exact"  # counted in the page query
+    CACHED = "Cached"  # per-filter counter cache, refreshed on expiry or writes
+    ESTIMATED = "Estimated"  # planner row estimate for very large result sets
+
+
 class Environment(StrEnum):
     DEVELOPMENT = "DEVELOPMENT"
     STAGING = "STAGING"
     PRODUCTION = "PRODUCTION"
+
+
+class Ledger(StrEnum):
+    COOPERATIVE_GL = "cooperative_gl"
+    MEMBERS_SUBSIDIARY = "members_subsidiary"
+
+
+class LedgerAccountType(StrEnum):
+    ASSET = "asset"
+    LIABILITY = "liability"
+    EQUITY = "equity"
+    INCOME = "income"
+    EXPENSE = "expense"
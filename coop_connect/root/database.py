@@ -1,9 +1,313 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import asyncio
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+from uuid import UUID, uuid4
+
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql.compiler import Compiled
+from sqlalchemy.sql.dml import UpdateBase
 
 from coop_connect.root.settings import Settings
 
 settings = Settings()
-engine = create_async_engine(url=str(settings.postgres_url))
+
+# checkout waits recorded by InstrumentedQueuePool
+_checkout_wait_stats = {
+    "checkouts": 0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0,
+}
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started_at
+            _checkout_wait_stats["checkouts"] += 1
+            _checkout_wait_stats["wait_seconds_total"] += waited
+            _checkout_wait_stats["wait_seconds_max"] = max(
+                _checkout_wait_stats["wait_seconds_max"], waited
+            )
+
+
+def _connect_args() -> dict:
+    if settings.db_pgbouncer_mode:
+        # pgbouncer (transaction pooling) can hand a prepared statement to another
+        # backend, so disable both statement caches and never reuse statement names
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+    }
+
+
+def _create_engine(url) -> AsyncEngine:
+    return create_async_engine(
+        url=str(url),
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=_connect_args(),
+    )
+
+
+def single_connection_engine(bind: AsyncEngine) -> AsyncEngine:
+    """
+    An engine on ``bind``'s database that holds at most one connection of its own,
+    for diagnostics that must never take a connection from the request pool.
+    """
+    return create_async_engine(
+        url=bind.url,
+        pool_size=1,
+        max_overflow=0,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=_connect_args(),
+    )
+
+
+engine = _create_engine(settings.postgres_url)
+# without a replica configured every read goes to the primary
+replica_engine = (
+    _create_engine(settings.postgres_replica_url)
+    if settings.postgres_replica_url
+    else engine
+)
 
 
 async_session = async_sessionmaker(engine, expire_on_commit=False)
+
+UNIT_OF_WORK = "unit_of_work"
+READ_FROM_PRIMARY = "read_from_primary"
+WROTE = "wrote"
+ON_COMMIT = "on_commit"
+
+# id of the authenticated user of the current request, see bind_request_user
+_request_user: ContextVar[Optional[str]] = ContextVar("request_user", default=None)
+# the current request committed a write, its later reads must see it
+_request_wrote: ContextVar[bool] = ContextVar("request_wrote", default=False)
+# users who committed a write within the last read_your_writes_window seconds
+_recent_writers = TTLCache(
+    maxsize=settings.read_your_writes_maxsize, ttl=settings.read_your_writes_window
+)
+
+
+class RoutingSession(Session):
+    """
+    Sync session behind read_session: reads go to the replica, while flushes,
+    DML and SELECT ... FOR UPDATE go to the primary, as does everything after them.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self._flushing
+            or isinstance(clause, UpdateBase)
+            or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            self.info[READ_FROM_PRIMARY] = True
+
+        if self.info.get(READ_FROM_PRIMARY):
+            return engine.sync_engine
+        return replica_engine.sync_engine
+
+
+replica_session = async_sessionmaker(
+    sync_session_class=RoutingSession, expire_on_commit=False
+)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_dml(orm_execute_state):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info[WROTE] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    session.info[WROTE] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_write(session):
+    if not session.info.pop(WROTE, False):
+        return
+
+    _request_wrote.set(True)
+    user_id = _request_user.get()
+    if user_id is not None:
+        _recent_writers[user_id] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _run_on_commit(session):
+    for callback, args, kwargs in session.info.pop(ON_COMMIT, []):
+        callback(*args, **kwargs)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_write(session):
+    session.info.pop(WROTE, None)
+    session.info.pop(ON_COMMIT, None)
+
+
+def on_commit(session: AsyncSession, callback: Callable, *args, **kwargs):
+    """
+    Call ``callback(*args, **kwargs)`` once the session's transaction has really
+    committed, never if it rolls back. Cache invalidations go through here: inside
+    a unit of work ``commit`` only flushes, and clearing a cache before the real
+    commit lets a concurrent request cache the old rows again.
+    """
+    session.info.setdefault(ON_COMMIT, []).append((callback, args, kwargs))
+
+
+def bind_request_user(user_id: UUID):
+    """Tie the current request to ``user_id`` so it reads its own recent writes."""
+    _request_user.set(str(user_id))
+
+
+def _reads_from_primary() -> bool:
+    if _request_wrote.get():
+        return True
+    user_id = _request_user.get()
+    return user_id is not None and user_id in _recent_writers
+
+
+@asynccontextmanager
+async def unit_of_work():
+    """
+    One connection and one transaction for a multi-step service flow.
+
+    Pass the yielded session to the db_handlers; it commits when the block exits
+    and rolls everything back if it raises.
+    """
+    async with async_session() as session:
+        session.info[UNIT_OF_WORK] = True
+        async with session.begin():
+            yield session
+
+
+@asynccontextmanager
+async def session_scope(session: Optional[AsyncSession] = None):
+    """Reuse the caller's unit-of-work session, otherwise open a fresh one."""
+    if session is not None:
+        yield session
+        return
+
+    async with async_session() as new_session:
+        yield new_session
+
+
+def read_session() -> AsyncSession:
+    """
+    Session for read-only handlers, served by the replica unless the current
+    request or user wrote within the read-your-writes window.
+
+    Recent writers are remembered by this worker process only, and only the user
+    who wrote is pinned, not the users the write affected (a suspended member, a
+    demoted officer). Lookups that authenticate or authorise a request, and cache
+    refills after an invalidation, must therefore read the primary.
+    """
+    session = replica_session()
+    session.info[READ_FROM_PRIMARY] = _reads_from_primary()
+    return session
+
+
+@asynccontextmanager
+async def read_scope(session: Optional[AsyncSession] = None):
+    """session_scope for read-only handlers, fresh sessions come from read_session."""
+    if session is not None:
+        yield session
+        return
+
+    async with read_session() as new_session:
+        yield new_session
+
+
+def read_from_primary(session: AsyncSession):
+    """Sends the rest of a read_session's queries to the primary."""
+    session.info[READ_FROM_PRIMARY] = True
+
+
+async def commit(session: AsyncSession):
+    if session.info.get(UNIT_OF_WORK):
+        # the unit of work commits once, when the whole flow succeeded
+        await session.flush()
+        return
+    await session.commit()
+
+
+async def rollback(session: AsyncSession):
+    # inside a unit of work the raised error rolls back the whole flow
+    if not session.info.get(UNIT_OF_WORK):
+        await session.rollback()
+
+
+def precompile(statement) -> Compiled:
+    """
+    Compile ``statement`` once for the primary's dialect. SQLAlchemy can't cache
+    some constructs, postgresql INSERT ... ON CONFLICT among them, and compiles
+    them anew on every execution; hot write paths run them precompiled instead.
+    """
+    return statement.compile(dialect=engine.dialect)
+
+
+async def execute_precompiled(session: AsyncSession, compiled: Compiled, params: dict):
+    """Run a ``precompile``d write on the session's connection and transaction."""
+    # the DML never passes through do_orm_execute
+    session.info[WROTE] = True
+    connection = await session.connection()
+    return await connection.exec_driver_sql(
+        compiled.string, tuple(params[name] for name in compiled.positiontup)
+    )
+
+
+async def warm_up_pool(connections: int = settings.db_pool_warmup):
+    """Open ``connections`` pooled connections up front so the first requests don't pay for them."""
+    connections = min(connections, settings.db_pool_size)
+    if connections <= 0:
+        return
+
+    # hold every connection until all are open, else the pool hands back the same one
+    async with AsyncExitStack() as stack:
+        await asyncio.gather(
+            *[stack.enter_async_context(engine.connect()) for _ in range(connections)]
+        )
+
+
+def pool_stats() -> dict:
+    pool = engine.pool
+    return {
+        "pool_size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.db_max_overflow,
+        **_checkout_wait_stats,
+    }
@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime, timedelta
-from typing import Annotated
+from typing import Annotated, Optional
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, Request, status
@@ -9,8 +9,10 @@ from itsdangerous import BadSignature, BadTimeSignature, URLSafeTimedSerializer
 from jose import ExpiredSignatureError, JWTError, jwt
 
 import coop_connect.services.cooperative_service as cooperative_service
+import coop_connect.services.service_utils.cache_utils as cache_utils
 import coop_connect.services.user_service as admin_service
 from coop_connect.database.orms.user_orm import User
+from coop_connect.root.database import bind_request_user
 from coop_connect.root.settings import Settings
 from coop_connect.schemas.cooperative_schemas import CooperativeProfile
 from coop_connect.schemas.user_schemas import TokenData, UserProfile
@@ -25,6 +27,7 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 60 * 7
 REFRESH_SECRET_KEY = settings.ref_jwt_secret_key
 REFRESH_TOKEN_EXPIRE_MINUTES = 60 * 60 * 7 * 3
+COOP_ROLE_CLAIMS_EXPIRE_SECONDS = settings.coop_role_claims_ttl
 
 
 # TOP_LEVEL_SIGNER
@@ -38,17 +41,31 @@ def sign_token(jwt_token: str) -> str:
     return token_signer.dumps(obj=jwt_token)
 
 
-def resolve_token(signed_token: str, max_age: int):
+def resolve_token(signed_token: str, max_age: int, return_timestamp: bool = False):
     try:
-        return token_signer.loads(s=signed_token, max_age=max_age)
+        return token_signer.loads(
+            s=signed_token, max_age=max_age, return_timestamp=return_timestamp
+        )
     except (BadTimeSignature, BadSignature) as e:
         LOGGER.exception(e)
         raise Exception
 
 
-def create_access_token(data: dict):
+def create_access_token(
+    data: dict, coop_roles: Optional[dict] = None, coop_role_version: int = 0
+):
     expire = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES) + datetime.utcnow()
     data.update({"exp": expire})
+    if coop_roles is not None:
+        # short-lived coop_id -> (role, status) claims, see CoopBasePermission
+        data.update(
+            {
+                "cr": coop_roles,
+                "crv": coop_role_version,
+                "cre": int(datetime.utcnow().timestamp())
+                + COOP_ROLE_CLAIMS_EXPIRE_SECONDS,
+            }
+        )
     encoded_jwt = jwt.encode(claims=data, key=SECRET_KEY, algorithm=ALGORITHM)
     dangerous_access_token = sign_token(jwt_token=encoded_jwt)
 
@@ -66,10 +83,18 @@ def create_refresh_token(data: dict):
 
 
 async def verify_access_token(token: str):
+    # the same bearer token is presented on every request of a session,
+    # skip both signature checks once it has been verified
+    token_key = cache_utils.token_digest(token=token)
+    token_data = cache_utils.get_cached_token(token_key=token_key)
+    if token_data is not None:
+        return token_data
 
     try:
-        jwt_token = resolve_token(
-            signed_token=token, max_age=ACCESS_TOKEN_EXPIRE_MINUTES
+        jwt_token, signed_at = resolve_token(
+            signed_token=token,
+            max_age=ACCESS_TOKEN_EXPIRE_MINUTES,
+            return_timestamp=True,
         )
     except Exception:
         LOGGER.error("Access_token top level signer decrypt failed")
@@ -83,12 +108,25 @@ async def verify_access_token(token: str):
             LOGGER.error(f"Decrypted JWT has not id in payload. {payload}")
             raise credentials_exception()
 
-        token_data = TokenData(id=UUID(id))
+        token_data = TokenData(
+            id=UUID(id),
+            coop_roles=payload.get("cr"),
+            coop_role_version=payload.get("crv"),
+            coop_roles_exp=payload.get("cre"),
+        )
     except (JWTError, ExpiredSignatureError) as e:
         LOGGER.exception(e)
         LOGGER.error("JWT Decryption Error")
         raise credentials_exception()
 
+    # whichever signer expires first bounds how long the token stays valid
+    cache_utils.cache_token(
+        token_key=token_key,
+        token_data=token_data,
+        expires_at=min(
+            payload["exp"], signed_at.timestamp() + ACCESS_TOKEN_EXPIRE_MINUTES
+        ),
+    )
     return token_data
 
 
@@ -124,7 +162,15 @@ async def get_new_access_token(token: str):
     token_dict = {
         "id": str(token_data.id),
     }
-    return create_access_token(data=token_dict)
+    if not settings.coop_role_claims_enabled:
+        return create_access_token(data=token_dict)
+
+    user = await admin_service.get_user(id=token_data.id)
+    return create_access_token(
+        data=token_dict,
+        coop_roles=await cooperative_service.get_coop_role_claims(user_id=user.id),
+        coop_role_version=user.coop_role_version,
+    )
 
 
 def credentials_exception():
@@ -147,9 +193,11 @@ async def get_current_user(
         credentials_exception()
 
     token = await verify_access_token(token=auth_credential.credentials)
+    bind_request_user(user_id=token.id)
 
     user = await admin_service.get_user(id=token.id)
 
+    request.state.token = token
     request.state.user = user
     return user
 
@@ -1,3 +1,4 @@
+import time
 from abc import ABC, abstractmethod
 
 from fastapi import Request
@@ -84,14 +85,37 @@ class CoopBasePermission(ABC):
             raise ConnectPermissionException(message=self.user_role_error_msg)
 
     async def set_coop_role_and_status(self, request: Request):
-        self.coop_role, self.coop_member_status = (
-            await coop_service.get_coop_member_role(
-                user_id=request.state.user.id,
-                cooperative_id=request.path_params[
-                    "coop_id"
-                ],  # extracted from router path
+        coop_id = request.path_params["coop_id"]  # extracted from router path
+
+        # resolved once per request and shared by every permission class
+        coop_memberships = getattr(request.state, "coop_memberships", None)
+        if coop_memberships is None:
+            coop_memberships = request.state.coop_memberships = {}
+
+        if coop_id not in coop_memberships:
+            coop_memberships[coop_id] = self.claimed_coop_role(
+                request=request, coop_id=coop_id
+            ) or await coop_service.get_coop_member_role(
+                user_id=request.state.user.id, cooperative_id=coop_id
             )
-        )
+
+        self.coop_role, self.coop_member_status = coop_memberships[coop_id]
+
+    @staticmethod
+    def claimed_coop_role(request: Request, coop_id: str):
+        """(role, status) signed into the access token, None when absent or stale."""
+        token = getattr(request.state, "token", None)
+        if token is None or not token.coop_roles:
+            return None
+
+        if token.coop_roles_exp is None or token.coop_roles_exp < time.time():
+            return None
+
+        # a membership changed since the token was issued
+        if token.coop_role_version != request.state.user.coop_role_version:
+            return None
+
+        return token.coop_roles.get(str(coop_id))
 
     def is_active(self) -> bool:
         if self.coop_member_status in self.edge_status:
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import EmailStr
 from pydantic.networks import AmqpDsn, PostgresDsn
 
@@ -8,6 +10,7 @@ from .utils.base_schemas import AbstractSettings
 
 class Settings(AbstractSettings):
     postgres_url: PostgresDsn
+    postgres_replica_url: Optional[PostgresDsn] = None  # read-only handlers use it
     jwt_secret_key: str
     ref_jwt_secret_key: str
     second_signer_key: str
@@ -29,6 +32,48 @@ class Settings(AbstractSettings):
     payaza_secret_key: str
     cloud_ampq_url: AmqpDsn
     environment: Environment = Environment.DEVELOPMENT
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # seconds
+    db_pool_recycle: int = 1800  # seconds
+    db_pool_pre_ping: bool = True
+    db_pool_warmup: int = 0  # connections opened at startup
+    db_statement_cache_size: int = 100
+    db_pgbouncer_mode: bool = False  # transaction pooling, no prepared statement reuse
+    # seconds a writer reads from the primary, tracked per worker process
+    read_your_writes_window: int = 10
+    read_your_writes_maxsize: int = 50_000
+    query_stats_enabled: bool = True  # per-request query count/time headers and logs
+    slow_query_threshold_ms: int = 200  # slower statements are logged with EXPLAIN
+    slow_query_explain_interval: int = 300  # seconds between plans of one statement
+    n_plus_one_threshold: int = 5  # identical statements in one request
+    metrics_enabled: bool = True  # prometheus /metrics and request histograms
+    profiling_enabled: bool = False
+    profiling_token: Optional[str] = (
+        None  # X-Profile header value that profiles a request
+    )
+    profiling_sample_rate: float = 0.0  # share of requests profiled and stored
+    profiling_interval: float = 0.001  # seconds between stack samples
+    profiling_dir: str = "profiles"
+    user_cache_ttl: int = 300  # seconds
+    user_cache_maxsize: int = 10_000
+    token_cache_maxsize: int = 50_000
+    member_role_cache_ttl: int = 120  # seconds
+    member_role_cache_maxsize: int = 50_000
+    listing_count_cache_ttl: int = 60  # seconds
+    listing_count_cache_maxsize: int = 10_000
+    count_estimate_threshold: int = 10_000  # smaller estimates are counted exactly
+    coop_role_claims_enabled: bool = True
+    coop_role_claims_ttl: int = 900  # seconds
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    member_import_chunk_size: int = 500  # rows validated and inserted together
+    member_import_max_rows: int = 20_000
+    ledger_hot_account_stripes: int = 16  # balance rows of 1010/2000, 1 turns it off
+    # [(principal from, annual rate), ...] in minor units, banded; empty accrues nothing
+    savings_interest_tiers: list[tuple[int, float]] = []
+    loan_interest_tiers: list[tuple[int, float]] = []
+    interest_day_count: int = 365  # Actual/365 fixed
 
 
 settings = Settings()
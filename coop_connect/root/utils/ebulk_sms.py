@@ -4,6 +4,7 @@ from uuid import uuid4
 from httpx import AsyncClient
 
 from coop_connect.root.settings import settings
+from coop_connect.root.utils.metrics import observe_outbound
 
 LOGGER = logging.getLogger(name="__file__")
 
@@ -29,9 +30,10 @@ async def send_sms(message: str, phone_number: str):
     }
 
     try:
-        response = await client.post(url=url, json=data, timeout=None)
-        if response.status_code >= 400:
-            response.raise_for_status()
+        with observe_outbound(provider="sms", operation="send_sms"):
+            response = await client.post(url=url, json=data, timeout=None)
+            if response.status_code >= 400:
+                response.raise_for_status()
         LOGGER.info("OTP SENT")
         return True
     except Exception as e:
@@ -0,0 +1,183 @@
+"""
+Prometheus metrics, served by the /metrics route in root/app.py.
+
+``MetricsMiddleware`` times every HTTP request by route template (never the raw
+path, which would carry ids) and tracks the requests in flight. Outbound calls to
+Payaza, the SMS gateway and SMTP are timed with ``observe_outbound`` and RabbitMQ
+publishes with ``observe_publish``. Connection pool and password-hashing pool
+figures are read on every scrape.
+
+Metrics live in this process only: behind several workers each one is scraped
+(or aggregated) on its own.
+"""
+
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from coop_connect.root.database import engine, pool_stats, replica_engine
+from coop_connect.services.service_utils.auth_utils import password_pool_stats
+
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served")
+OUTBOUND_LATENCY = Histogram(
+    "outbound_request_duration_seconds",
+    "Latency of calls to external providers",
+    ["provider", "operation", "outcome"],
+)
+PUBLISH_LATENCY = Histogram(
+    "rabbitmq_publish_duration_seconds",
+    "RabbitMQ publish latency, connection included",
+    ["queue"],
+)
+PUBLISH_FAILURES = Counter(
+    "rabbitmq_publish_failures_total", "Failed RabbitMQ publishes", ["queue"]
+)
+
+
+@contextmanager
+def observe_outbound(provider: str, operation: str):
+    """Time the block as one call to ``provider``, an exception marks it failed."""
+    started_at = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        OUTBOUND_LATENCY.labels(provider, operation, outcome).observe(
+            time.perf_counter() - started_at
+        )
+
+
+@asynccontextmanager
+async def observe_publish(queue: str):
+    started_at = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        PUBLISH_FAILURES.labels(queue).inc()
+        raise
+    finally:
+        PUBLISH_LATENCY.labels(queue).observe(time.perf_counter() - started_at)
+
+
+class DatabasePoolCollector:
+    """Pool gauges of the primary (and replica) engine, read at scrape time."""
+
+    def collect(self):
+        binds = {"primary": engine}
+        if replica_engine is not engine:
+            binds["replica"] = replica_engine
+
+        gauges = {
+            "size": GaugeMetricFamily(
+                "db_pool_size", "Configured pool size", labels=["engine"]
+            ),
+            "checked_out": GaugeMetricFamily(
+                "db_pool_checked_out", "Connections in use", labels=["engine"]
+            ),
+            "checked_in": GaugeMetricFamily(
+                "db_pool_checked_in", "Idle pooled connections", labels=["engine"]
+            ),
+            "overflow": GaugeMetricFamily(
+                "db_pool_overflow", "Connections over pool_size", labels=["engine"]
+            ),
+        }
+        for name, bind in binds.items():
+            pool = bind.pool
+            gauges["size"].add_metric([name], pool.size())
+            gauges["checked_out"].add_metric([name], pool.checkedout())
+            gauges["checked_in"].add_metric([name], pool.checkedin())
+            # overflow() counts up from -pool_size until the pool is full
+            gauges["overflow"].add_metric([name], max(pool.overflow(), 0))
+        yield from gauges.values()
+
+        wait_stats = pool_stats()
+        yield CounterMetricFamily(
+            "db_pool_checkouts",
+            "Connection checkouts, all engines",
+            value=wait_stats["checkouts"],
+        )
+        yield CounterMetricFamily(
+            "db_pool_checkout_wait_seconds",
+            "Time spent waiting for a pooled connection, all engines",
+            value=wait_stats["wait_seconds_total"],
+        )
+
+
+REGISTRY.register(DatabasePoolCollector())
+
+
+class PasswordHashPoolCollector:
+    """Queue depth and saturation of the bcrypt thread pool, read at scrape time."""
+
+    def collect(self):
+        stats = password_pool_stats()
+        yield GaugeMetricFamily(
+            "password_hash_pool_workers", "Hashing threads", value=stats["workers"]
+        )
+        yield GaugeMetricFamily(
+            "password_hash_pool_running",
+            "Hashes being computed",
+            value=stats["running"],
+        )
+        yield GaugeMetricFamily(
+            "password_hash_pool_queued",
+            "Hashes waiting for a free thread",
+            value=stats["queued"],
+        )
+        yield GaugeMetricFamily(
+            "password_hash_pool_queued_max",
+            "Most hashes ever waiting at once",
+            value=stats["max_queued"],
+        )
+        yield CounterMetricFamily(
+            "password_hash_pool_completed",
+            "Hashes and verifications completed",
+            value=stats["completed"],
+        )
+
+
+REGISTRY.register(PasswordHashPoolCollector())
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording REQUEST_LATENCY and REQUESTS_IN_FLIGHT."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started_at = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # the router stores the matched route in the scope
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                getattr(route, "path_format", UNMATCHED_ROUTE),
+                str(status),
+            ).observe(time.perf_counter() - started_at)
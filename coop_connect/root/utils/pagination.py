@@ -0,0 +1,149 @@
+"""
+Keyset (cursor) pagination over ``(date_created_utc, id)``.
+
+Cursors are opaque to clients: urlsafe base64 of the sort key of the row the
+page starts after (``next``) or before (``prev``).
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT = "next"
+PREV = "prev"
+
+
+class Cursor(NamedTuple):
+    date_created_utc: datetime
+    id: UUID
+    direction: str = NEXT
+
+
+def encode_cursor(date_created_utc: datetime, id: UUID, direction: str) -> str:
+    payload = json.dumps([date_created_utc.isoformat(), str(id), direction])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Raises ValueError for a cursor that was not produced by encode_cursor."""
+    try:
+        date_created_utc, id, direction = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("ascii"))
+        )
+        if direction not in (NEXT, PREV):
+            raise ValueError(f"unknown cursor direction {direction}")
+        return Cursor(datetime.fromisoformat(date_created_utc), UUID(id), direction)
+    except (TypeError, ValueError, AttributeError) as e:
+        # JSONDecodeError, UnicodeError and binascii.Error are ValueErrors
+        raise ValueError("malformed cursor") from e
+
+
+def paginate(
+    statement: Select,
+    model,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[Cursor] = None,
+    rank=None,
+) -> Select:
+    """
+    Orders ``statement`` by the keyset and fetches one extra row to detect more pages.
+
+    Ranked (search) results are ordered by ``rank`` first and can only be offset paged.
+    """
+    key = tuple_(model.date_created_utc, model.id)
+
+    if rank is not None:
+        return (
+            statement.order_by(rank.desc(), model.date_created_utc, model.id)
+            .offset(offset)
+            .limit(limit + 1)
+        )
+
+    if cursor is None:
+        return (
+            statement.order_by(model.date_created_utc, model.id)
+            .offset(offset)
+            .limit(limit + 1)
+        )
+
+    cursor_key = tuple_(cursor.date_created_utc, cursor.id)
+    if cursor.direction == NEXT:
+        return (
+            statement.filter(key > cursor_key)
+            .order_by(model.date_created_utc, model.id)
+            .limit(limit + 1)
+        )
+    return (
+        statement.filter(key < cursor_key)
+        .order_by(model.date_created_utc.desc(), model.id.desc())
+        .limit(limit + 1)
+    )
+
+
+def page_cursors(
+    rows: list, limit: int, offset: int = 0, cursor: Optional[Cursor] = None
+) -> tuple[list, Optional[str], Optional[str]]:
+    """Trims the look-ahead row of a ``paginate`` result and returns (rows, next_cursor, prev_cursor)."""
+    has_more = len(rows) > limit
+    rows = list(rows[:limit])
+    direction = cursor.direction if cursor else NEXT
+    if direction == PREV:
+        rows.reverse()
+
+    if not rows:
+        return rows, None, None
+
+    next_cursor = prev_cursor = None
+    if (direction == NEXT and has_more) or direction == PREV:
+        next_cursor = encode_cursor(rows[-1].date_created_utc, rows[-1].id, NEXT)
+    if (direction == PREV and has_more) or (
+        direction == NEXT and (cursor is not None or offset > 0)
+    ):
+        prev_cursor = encode_cursor(rows[0].date_created_utc, rows[0].id, PREV)
+
+    return rows, next_cursor, prev_cursor
+
+
+def count_statement(model, filters: tuple, joins: tuple = ()) -> Select:
+    """``SELECT count(*)`` over ``model`` joined to ``joins`` ((target, onclause), ...)."""
+    statement = select(func.count()).select_from(model)
+    for target, onclause in joins:
+        statement = statement.join(target, onclause)
+    return statement.filter(*filters)
+
+
+def total_count_column(
+    model, filters: tuple, cursor: Optional[Cursor] = None, joins: tuple = ()
+):
+    """
+    Total matching rows as an extra column of the page query (one round trip).
+
+    Offset pages use a window count; keyset pages filter rows out with the cursor,
+    so they count the unfiltered set in an uncorrelated (run once) subquery instead.
+    """
+    if cursor is None:
+        return func.count().over().label("total_count")
+    return (
+        count_statement(model=model, filters=filters, joins=joins)
+        .scalar_subquery()
+        .label("total_count")
+    )
+
+
+async def estimate_row_count(session: AsyncSession, statement: Select) -> int:
+    """Planner row estimate for ``statement``, no rows are read."""
+    connection = await session.connection()
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+    )
+    # driver level, so literals such as a search term are not parsed for binds
+    plan = (
+        await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+    ).scalar_one()
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,119 @@
+"""
+On-demand request profiling with pyinstrument.
+
+With ``profiling_enabled`` set, ``ProfilingMiddleware`` samples the stack of:
+
+- requests carrying ``X-Profile: <profiling_token>``; the response is replaced by
+  the HTML profile, the status the route answered with is in ``X-Profiled-Status``
+- a ``profiling_sample_rate`` share of all other requests; their profile is stored
+  in ``profiling_dir`` and logged with its top frames
+
+Profiles run in pyinstrument's async mode, so time spent awaiting (I/O, the
+database, other tasks) shows up as ``[await]`` frames, apart from the time the
+request held the event loop.
+"""
+
+import hmac
+import logging
+import random
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse
+from pyinstrument import Profiler
+from pyinstrument.frame import AWAIT_FRAME_IDENTIFIER, OUT_OF_CONTEXT_FRAME_IDENTIFIER
+
+from coop_connect.root.settings import Settings
+
+LOGGER = logging.getLogger(__name__)
+
+settings = Settings()
+
+PROFILE_HEADER = b"x-profile"
+WAITING_FRAMES = (AWAIT_FRAME_IDENTIFIER, OUT_OF_CONTEXT_FRAME_IDENTIFIER)
+
+
+def _requested(scope: dict) -> bool:
+    if not settings.profiling_token:
+        return False
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return hmac.compare_digest(value, settings.profiling_token.encode())
+    return False
+
+
+def _awaited_seconds(frame) -> float:
+    if frame.identifier in WAITING_FRAMES:
+        return frame.time
+    return sum(_awaited_seconds(child) for child in frame.children)
+
+
+def _summary(scope: dict, profiler: Profiler) -> str:
+    session = profiler.last_session
+    root = session.root_frame()
+    awaited = _awaited_seconds(root) if root is not None else 0.0
+    return (
+        f"{scope['method']} {scope['path']}: {session.duration * 1000:.1f} ms, "
+        f"{(session.duration - awaited) * 1000:.1f} ms on the event loop, "
+        f"{awaited * 1000:.1f} ms awaiting"
+    )
+
+
+def _store(scope: dict, profiler: Profiler) -> Path:
+    directory = Path(settings.profiling_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid4().hex[:8]}.html"
+    path.write_text(profiler.output_html())
+
+    LOGGER.info(
+        "profiled %s, stored in %s\n%s",
+        _summary(scope, profiler),
+        path,
+        profiler.output_text(show_all=False),
+    )
+    return path
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requested and sampled requests, see the module docstring."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = _requested(scope)
+        if not requested and random.random() >= settings.profiling_sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        status: Optional[int] = None
+
+        async def discard_response(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        profiler = Profiler(interval=settings.profiling_interval, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard_response if requested else send)
+        finally:
+            profiler.stop()
+
+        if not requested:
+            await run_in_threadpool(_store, scope, profiler)
+            return
+
+        LOGGER.info("profiled %s on request", _summary(scope, profiler))
+        response = HTMLResponse(
+            content=profiler.output_html(),
+            headers={"X-Profiled-Status": str(status)},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,117 @@
+"""
+Fast ORM-to-schema mapping for hot read paths.
+
+``projection`` selects only the columns a response model exposes, ``construct``
+builds the model from such a row without validation and ``TrustedJSONResponse``
+renders it with orjson, skipping FastAPI's second response_model validation.
+List endpoints project summary models, ``sparse_schema`` widens a summary with
+the ``?fields=`` a client asked for.
+
+Trusted construction is only for rows read from our own tables through
+``projection``: JSONB values are passed through as stored, they are not
+re-parsed into their nested models.
+"""
+
+from functools import lru_cache
+from typing import Any, Mapping, Optional, TypeVar, get_args
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, create_model
+from sqlalchemy import BigInteger, Numeric, cast
+
+Schema = TypeVar("Schema", bound=BaseModel)
+
+# keyset pagination reads these from every listed row, see pagination.py
+KEYSET_COLUMNS = ("id", "date_created_utc")
+
+
+def _is_int(annotation) -> bool:
+    return annotation is int or int in get_args(annotation)
+
+
+@lru_cache(maxsize=None)
+def projection(model, schema: type[BaseModel]) -> tuple:
+    """
+    Columns of ``model`` that ``schema`` exposes, ready for ``select(*projection(...))``.
+    Numeric columns the schema types as int are cast in SQL, which is what
+    validation would otherwise convert in Python.
+    """
+    columns = []
+    for column in model.__table__.columns:
+        field = schema.model_fields.get(column.key)
+        if field is None and column.key not in KEYSET_COLUMNS:
+            continue
+
+        attribute = getattr(model, column.key)
+        if (
+            field is not None
+            and isinstance(column.type, Numeric)
+            and _is_int(field.annotation)
+        ):
+            attribute = cast(attribute, BigInteger).label(column.key)
+        columns.append(attribute)
+    return tuple(columns)
+
+
+def parse_fields(fields: Optional[str], model, schema: type[BaseModel]) -> frozenset:
+    """
+    ``?fields=a,b`` as a frozenset of ``schema`` fields stored on ``model``.
+    Raises ValueError naming the fields that can't be projected.
+    """
+    if not fields:
+        return frozenset()
+
+    requested = frozenset(field.strip() for field in fields.split(",") if field.strip())
+    allowed = {column.key for column in model.__table__.columns} & set(
+        schema.model_fields
+    )
+    unknown = requested - allowed
+    if unknown:
+        raise ValueError(
+            f"unknown fields {', '.join(sorted(unknown))}, "
+            f"choose from {', '.join(sorted(allowed))}"
+        )
+    return requested
+
+
+@lru_cache(maxsize=256)
+def sparse_schema(
+    summary: type[BaseModel], schema: type[BaseModel], fields: frozenset
+) -> type[BaseModel]:
+    """``summary`` plus ``fields`` taken from the full ``schema``, one class per fieldset."""
+    extra = sorted(fields - set(summary.model_fields))
+    if not extra:
+        return summary
+
+    return create_model(
+        f"{summary.__name__}Sparse",
+        __base__=summary,
+        **{
+            name: (schema.model_fields[name].annotation, schema.model_fields[name])
+            for name in extra
+        },
+    )
+
+
+def construct(schema: type[Schema], mapping: Mapping[str, Any]) -> Schema:
+    """``schema`` from a ``projection`` row mapping, unknown keys are ignored."""
+    return schema.model_construct(**mapping)
+
+
+class TrustedJSONResponse(ORJSONResponse):
+    """orjson rendering of constructed models, return it from the route to skip re-validation."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (list, tuple)):
+            content = [self._dump(item) for item in content]
+        else:
+            content = self._dump(content)
+        return super().render(content)
+
+    @staticmethod
+    def _dump(content: Any) -> Any:
+        if isinstance(content, BaseModel):
+            # constructed models hold JSONB as plain dicts, don't warn about it;
+            # serialize_as_any keeps the extra fields of sparse_schema items
+            return content.model_dump(warnings=False, serialize_as_any=True)
+        return content
@@ -0,0 +1,193 @@
+"""
+Per-request SQL instrumentation.
+
+``instrument_engine`` hooks an engine's cursor events: every statement's latency
+and row count is logged at DEBUG and added to the current request's QueryStats.
+``QueryStatsMiddleware`` opens those stats per request, reports them in the
+``X-Query-Count`` and ``Server-Timing`` response headers and the log, and warns
+about statements repeated often enough to be an N+1 pattern. Statements slower
+than ``slow_query_threshold_ms`` are logged with their ``EXPLAIN`` plan. Plans are
+fetched once the statement is done, on a connection of their own rather than one
+from the request pool, one at a time and at most once per statement every
+``slow_query_explain_interval`` seconds; other slow runs are logged without one.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from coop_connect.root.database import single_connection_engine
+from coop_connect.root.settings import Settings
+
+LOGGER = logging.getLogger(__name__)
+
+settings = Settings()
+
+EXPLAINABLE_STATEMENTS = ("SELECT", "WITH", "UPDATE", "DELETE")
+EXPLAINED_STATEMENTS_MAXSIZE = 1_000
+
+
+class QueryStats:
+    """Queries one request issued, filled in by the engine events."""
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.statements = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements run at least ``threshold`` times, the probable N+1s."""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+# statements (SQL text, parameters are placeholders) whose plan was logged recently
+_explained = TTLCache(
+    maxsize=EXPLAINED_STATEMENTS_MAXSIZE, ttl=settings.slow_query_explain_interval
+)
+_plan_loggers: list["_PlanLogger"] = []
+
+
+def _rows(cursor) -> int:
+    if cursor.rowcount >= 0:
+        return cursor.rowcount
+    # asyncpg's adapter buffers a SELECT's rows on execute and reports rowcount -1
+    return len(getattr(cursor, "_rows", ()))
+
+
+class _PlanLogger:
+    """Logs slow statements of one engine, EXPLAINed on a dedicated connection."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = single_connection_engine(engine)
+        self.task: Optional[asyncio.Task] = None
+
+    def log(self, statement: str, parameters, duration_ms: float):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        # one plan at a time, slow queries come in bursts when the database struggles
+        if loop is None or statement in _explained or self.task is not None:
+            LOGGER.warning("slow query, %.1f ms: %s", duration_ms, statement)
+            return
+
+        _explained[statement] = True
+        self.task = loop.create_task(self._log_plan(statement, parameters, duration_ms))
+        self.task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task):
+        self.task = None
+
+    async def _log_plan(self, statement: str, parameters, duration_ms: float):
+        # self.engine isn't instrumented, the EXPLAIN is not one of the request's queries
+        try:
+            async with self.engine.connect() as connection:
+                plan = (
+                    await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                ).all()
+            plan = "\n".join(str(row[0]) for row in plan)
+        except Exception as e:
+            plan = f"EXPLAIN failed: {e}"
+
+        LOGGER.warning("slow query, %.1f ms: %s\n%s", duration_ms, statement, plan)
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Record every statement ``engine`` runs, see the module docstring."""
+    plan_logger = _PlanLogger(engine)
+    _plan_loggers.append(plan_logger)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        context._query_started_at = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - context._query_started_at
+        duration_ms = duration * 1000
+        LOGGER.debug("%.2f ms, %d rows: %s", duration_ms, _rows(cursor), statement)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.record(statement=statement, duration=duration)
+
+        if (
+            duration_ms >= settings.slow_query_threshold_ms
+            and not executemany
+            and statement.lstrip().upper().startswith(EXPLAINABLE_STATEMENTS)
+        ):
+            plan_logger.log(statement, parameters, duration_ms)
+
+
+async def dispose_plan_engines():
+    """Close the connections slow-query plans were fetched on."""
+    for plan_logger in _plan_loggers:
+        await plan_logger.engine.dispose()
+
+
+def _report(scope: dict, stats: QueryStats):
+    route = f"{scope['method']} {scope['path']}"
+    LOGGER.info("%s: %d queries in %.1f ms", route, stats.count, stats.duration * 1000)
+    for statement, count in stats.repeated(settings.n_plus_one_threshold):
+        LOGGER.warning(
+            "%s ran the same statement %d times, probable N+1: %s",
+            route,
+            count,
+            statement,
+        )
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware that gives every HTTP request its own QueryStats."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(stats.count).encode()))
+                headers.append(
+                    (
+                        b"server-timing",
+                        f"db;dur={stats.duration * 1000:.1f}".encode(),
+                    )
+                )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _request_stats.reset(token)
+            _report(scope, stats)
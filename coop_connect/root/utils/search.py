@@ -0,0 +1,58 @@
+"""
+Trigram (pg_trgm) backed text search.
+
+Every searchable column carries a GIN ``gin_trgm_ops`` index (see ``trigram_index``),
+which serves both the substring ``ILIKE`` and the fuzzy ``%`` operator used here.
+The ``pg_trgm`` extension is created by migration/env.py.
+"""
+
+from sqlalchemy import Index, and_, func, or_
+
+# true when similarity >= pg_trgm.similarity_threshold (0.3 by default)
+TRIGRAM_OPERATOR = "%"
+
+
+def trigram_index(name: str, column: str) -> Index:
+    """GIN trigram index for ``column``, declare it in the ORM ``__table_args__``."""
+    return Index(
+        name,
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    )
+
+
+# "!" rather than a backslash, which the postgres dialects escape differently in literals
+LIKE_ESCAPE = "!"
+
+
+def _escape_like(term: str) -> str:
+    for char in (LIKE_ESCAPE, "%", "_"):
+        term = term.replace(char, f"{LIKE_ESCAPE}{char}")
+    return term
+
+
+def search_filter(columns: tuple, search: str):
+    """
+    Every word of ``search`` must match one of ``columns``, either as a substring
+    or fuzzily (typos), so "ada obi" finds first_name "Ada" + last_name "Obi".
+    """
+    return and_(
+        *[
+            or_(
+                *[
+                    or_(
+                        column.ilike(f"%{_escape_like(word)}%", escape=LIKE_ESCAPE),
+                        column.op(TRIGRAM_OPERATOR)(word),
+                    )
+                    for column in columns
+                ]
+            )
+            for word in search.split()
+        ]
+    )
+
+
+def search_rank(columns: tuple, search: str):
+    """Best trigram similarity of ``search`` against any of ``columns``, higher is better."""
+    return func.greatest(*[func.similarity(column, search) for column in columns])
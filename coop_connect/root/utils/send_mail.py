@@ -7,6 +7,7 @@ from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
 from fastapi_mail.errors import ConnectionErrors
 
 from coop_connect.root.settings import Settings
+from coop_connect.root.utils.metrics import observe_outbound
 
 settings = Settings()
 
@@ -46,7 +47,8 @@ async def send_mail(
 
     try:
         # send mail
-        await fm.send_message(message, template_name=template)
+        with observe_outbound(provider="smtp", operation="send_mail"):
+            await fm.send_message(message, template_name=template)
 
     except ConnectionErrors as e:
         LOGGER.exception(e)
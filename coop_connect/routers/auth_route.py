@@ -106,7 +106,7 @@ async def reset_password(
     token: str = Body(embed=True, example=1345),
     new_password: str = Body(embed=True),
 ):
-    user = await user_service.reset_password(token=token, new_password=new_password)
+    user = await user_service.reset_password(code=token, new_password=new_password)
     return user
 
 
@@ -4,16 +4,21 @@ Management of membership profile and
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, UploadFile, status
 
 import coop_connect.schemas.cooperative_schemas as schemas
 import coop_connect.services.cooperative_service as cooperative_service
-from coop_connect.root.dependencies import Current_User, CurrentCooperative
+from coop_connect.root.dependencies import (
+    Current_User,
+    CurrentCooperative,
+    CurrentUnprotectedCooperative,
+)
 from coop_connect.root.permission import (
     CoopAllRoles,
     CoopGeneralPerm,
     PermissionsDependency,
 )
+from coop_connect.root.utils.projection import TrustedJSONResponse
 
 api_router = APIRouter(
     prefix="/coop/{coop_id}/members", tags=["Cooperative Membership Management"]
@@ -52,8 +57,45 @@ async def all_coop_member(
     current_user: Current_User,
     pagination_query: schemas.PaginationMembCoopQuery = Depends(),
 ):
-    return await cooperative_service.get_all_coop_members(
-        cooperative_id=coop_id, **pagination_query.model_dump()
+    # built from trusted projections, rendered without a second validation
+    return TrustedJSONResponse(
+        content=await cooperative_service.get_all_coop_members(
+            cooperative_id=coop_id, **pagination_query.model_dump()
+        )
+    )
+
+
+@api_router.post(
+    "/approve",
+    response_model=schemas.MemberBatchApprovalResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(PermissionsDependency([CoopGeneralPerm]))],
+)
+async def approve_members(
+    coop_id: UUID,
+    batch_approval: schemas.MemberBatchApproval,
+    current_user: Current_User,
+):
+    """Activates up to 500 pending members at once, members that are not pending are skipped."""
+    return await cooperative_service.approve_coop_members(
+        cooperative_id=coop_id, member_ids=batch_approval.member_ids
+    )
+
+
+@api_router.post(
+    "/import",
+    response_model=schemas.MemberImportReport,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(PermissionsDependency([CoopGeneralPerm]))],
+)
+async def import_members(
+    upload_file: UploadFile,
+    current_user: Current_User,
+    cooperative: CurrentUnprotectedCooperative,
+):
+    """Onboards existing members from a CSV/XLSX with a header row, see MemberImportRow for the columns."""
+    return await cooperative_service.import_coop_members(
+        cooperative=cooperative, upload_file=upload_file
     )
 
 
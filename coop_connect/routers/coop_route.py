@@ -3,6 +3,7 @@ Cooperative Creation and Management alongside invitation of users (Admin) to
 cooperative
 """
 
+from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, status
@@ -15,20 +16,25 @@ from coop_connect.root.permission import (
     CoopGeneralPerm,
     PermissionsDependency,
 )
+from coop_connect.root.utils.projection import TrustedJSONResponse
 
 api_router = APIRouter(prefix="/coop", tags=["Cooperative Admin & Management"])
 
 
 @api_router.get(
     "/",
-    response_model=list[schemas.CooperativeProfile],
+    response_model=list[schemas.CooperativeSummary],
     status_code=status.HTTP_200_OK,
     dependencies=[Depends(PermissionsDependency([CoopAdminorSuperAdminOnly]))],
 )
 async def get_cooperatives_via_acronym(
-    acronym: str, current_user_profile: Current_User
+    acronym: str, current_user_profile: Current_User, fields: Optional[str] = None
 ):
-    return await cooperative_service.get_cooperatives_via_acronym(acronym=acronym)
+    return TrustedJSONResponse(
+        content=await cooperative_service.get_cooperatives_via_acronym(
+            acronym=acronym, fields=fields
+        )
+    )
 
 
 @api_router.post(
@@ -53,7 +59,12 @@ async def create_cooperative(
 async def get_cooperatives(
     current_user: Current_User, paginated_query: schemas.PaginationCoopQuery = Depends()
 ):
-    return await cooperative_service.get_cooperatives(**paginated_query.model_dump())
+    # built from trusted projections, rendered without a second validation
+    return TrustedJSONResponse(
+        content=await cooperative_service.get_cooperatives(
+            **paginated_query.model_dump()
+        )
+    )
 
 
 @api_router.get(
@@ -1,6 +1,14 @@
 from fastapi import APIRouter, Depends, status
 
 from coop_connect.root.permission import CoopSuperAdminOnly, PermissionsDependency
+from coop_connect.schemas.finance_schemas import (
+    BalanceCheckpointReport,
+    InterestAccrualReport,
+)
+from coop_connect.services.finance_service import (
+    accrue_interest_for_all,
+    create_balance_checkpoints,
+)
 from coop_connect.services.maintenance_service import (
     delete_cooperative,
     delete_non_admin_users,
@@ -27,3 +35,25 @@ async def clear_cooperatives():
 async def clear_users():
     await delete_non_admin_users()
     return
+
+
+@api_router.post(
+    "/ledger-balance-checkpoints",
+    status_code=status.HTTP_200_OK,
+    response_model=BalanceCheckpointReport,
+    dependencies=[Depends(PermissionsDependency([CoopSuperAdminOnly]))],
+)
+async def checkpoint_ledger_balances():
+    """Meant for a daily scheduler, checkpoints balances as of the start of today."""
+    return await create_balance_checkpoints()
+
+
+@api_router.post(
+    "/interest-accrual",
+    status_code=status.HTTP_200_OK,
+    response_model=list[InterestAccrualReport],
+    dependencies=[Depends(PermissionsDependency([CoopSuperAdminOnly]))],
+)
+async def accrue_interest():
+    """Meant for a daily scheduler, accrues yesterday's interest in every cooperative."""
+    return await accrue_interest_for_all()
@@ -1,12 +1,21 @@
 from datetime import date, datetime
 from typing import Annotated, List, Optional
-from uuid import UUID
-
-from pydantic import AnyHttpUrl, EmailStr, Field, conint, constr
+from uuid import UUID, uuid4
+
+from pydantic import (
+    AnyHttpUrl,
+    EmailStr,
+    Field,
+    conint,
+    constr,
+    field_validator,
+    model_validator,
+)
 
 from coop_connect.root.coop_enums import (
     CooperativeStatus,
     CooperativeUserRole,
+    CountMode,
     MembershipStatus,
     MembershipType,
 )
@@ -45,12 +54,27 @@ class CooperativeProfile(CooperativeExtended):
     date_updated_utc: Optional[datetime] = None
 
 
+class CooperativeSummary(AbstractModel):
+    """List view of a cooperative, ?fields= adds CooperativeProfile fields."""
+
+    id: UUID
+    coop_id: str
+    name: str
+    acronym: str
+    status: CooperativeStatus
+    public_listing: bool = False
+    date_created_utc: datetime
+
+
 class PaginatedCooperativeProfile(AbstractModel):
-    result_set: list[CooperativeProfile] = []
+    result_set: list[CooperativeSummary] = []
     result_count: int = 0
     page: int = 0
     page_size: int = 0
     total_count: int = 0
+    count_mode: CountMode = CountMode.EXACT
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class CooperativeUpdate(AbstractModel):
@@ -105,6 +129,67 @@ class MembershipProfile(MembershipExtended):
     cooperative: Optional[CooperativeProfile] = None
 
 
+class MemberBatchApproval(AbstractModel):
+    member_ids: list[UUID] = Field(min_length=1, max_length=500)
+
+
+class MemberBatchApprovalResponse(AbstractModel):
+    result_set: list[MembershipProfile] = []
+    approved_count: int = 0
+    skipped: list[UUID] = []  # not in the cooperative or not pending approval
+
+
+class MembershipImport(MembershipExtended):
+    id: UUID = Field(default_factory=uuid4)  # known up front to open ledger accounts
+    date_joined: Optional[datetime] = None
+
+
+class MemberImportRow(AbstractModel):
+    """One spreadsheet row of a bulk member import, the user is matched by email or phone."""
+
+    email: Optional[EmailStr] = None
+    phone_number: Optional[PhoneNumber] = None
+    membership_type: MembershipType = MembershipType.REGULAR
+    role: CooperativeUserRole = CooperativeUserRole.MEMBER
+    status: MembershipStatus = MembershipStatus.ACTIVE
+    membership_id: Optional[str] = None
+    date_joined: Optional[datetime] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def drop_blank_cells(cls, data):
+        # empty cells fall back to the column default
+        if isinstance(data, dict):
+            return {key: value for key, value in data.items() if value != ""}
+        return data
+
+    @field_validator("role")
+    @classmethod
+    def member_role_only(cls, role: CooperativeUserRole):
+        # staff can import, officers are never appointed through a spreadsheet
+        if role != CooperativeUserRole.MEMBER:
+            raise ValueError(f"only {CooperativeUserRole.MEMBER} rows can be imported")
+        return role
+
+    @model_validator(mode="after")
+    def has_contact(self):
+        if self.email is None and self.phone_number is None:
+            raise ValueError("email or phone_number is required")
+        return self
+
+
+class MemberImportError(AbstractModel):
+    row: int  # spreadsheet row number, the header is row 1
+    errors: list[str]
+
+
+class MemberImportReport(AbstractModel):
+    total_rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: list[MemberImportError] = []
+
+
 class MembershipUpdate(AbstractModel):
     date_joined: Optional[datetime] = None
     status: Optional[MembershipStatus] = None
@@ -123,22 +208,45 @@ class MembershipExtendedUpdate(MembershipUpdate):
     referal_code: Optional[str] = None
 
 
+class MembershipSummary(AbstractModel):
+    """List view of a membership, ?fields= adds MembershipProfile fields."""
+
+    id: UUID
+    user_id: UUID
+    cooperative_id: UUID
+    membership_id: Optional[str] = None
+    role: CooperativeUserRole
+    status: MembershipStatus
+    membership_type: MembershipType
+    date_joined: Optional[datetime] = None
+    date_created_utc: datetime
+
+
 class PaginatedMembersResponse(AbstractModel):
-    result_set: List[MembershipProfile] = []
+    result_set: List[MembershipSummary] = []
     result_count: int = 0
     page: int = 0
     page_size: int = 0
     total_count: int = 0
+    count_mode: CountMode = CountMode.EXACT
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
-class PaginationCoopQuery(AbstractModel):
+class PaginationCoopQuery(PaginationModel):
     search: Optional[str] = None
     public_listing: Optional[bool] = None
+    cursor: Optional[str] = None  # next_cursor/prev_cursor of a previous page
+    count_mode: CountMode = CountMode.EXACT
+    fields: Optional[str] = None  # comma separated profile fields added to each item
 
 
-class PaginationMembCoopQuery(AbstractModel):
+class PaginationMembCoopQuery(PaginationModel):
     search: Optional[str] = None
     status: Optional[MembershipStatus] = None
+    cursor: Optional[str] = None  # next_cursor/prev_cursor of a previous page
+    count_mode: CountMode = CountMode.EXACT
+    fields: Optional[str] = None  # comma separated profile fields added to each item
 
 
 Years = Annotated[int, conint(ge=2025)]
@@ -2,11 +2,13 @@ from datetime import date, datetime
 from typing import Annotated, List, Optional
 from uuid import UUID
 
-from pydantic import AnyHttpUrl, EmailStr, Field, conint
+from pydantic import AnyHttpUrl, EmailStr, Field, conint, model_validator
 
 from coop_connect.root.coop_enums import (
     CooperativeStatus,
     CooperativeUserRole,
+    Ledger,
+    LedgerAccountType,
     MembershipStatus,
     MembershipType,
 )
@@ -24,12 +26,16 @@ class Wallet(AbstractModel):
     cooperative_id: UUID
 
 class WalletUpdate(AbstractModel):
-    balance: str
-    is_active: Optional[str] = None
+    is_active: Optional[bool] = None
+
+class WalletTransaction(AbstractModel):
+    amount: int = Field(gt=0)  # minor units
 
 class WalletFull(Wallet):
     id: UUID
-    balance: str
+    balance: int  # minor units
+    version: int  # bumped by every credit and debit
+    precision: int
     is_active: bool
     meta: dict
 
@@ -51,5 +57,90 @@ class BankAccountUpdate(AbstractModel):
 class BankAccountFull(BankAccount):
     id: UUID
     status: str
-    
+
+
+# ------ LEDGER ----------
+class LedgerAccount(AbstractModel):
+    cooperative_id: UUID
+    member_id: Optional[UUID] = None
+    ledger: Ledger
+    code: str
+    name: str
+    account_type: LedgerAccountType
+    description: Optional[str] = None
+
+
+class LedgerAccountFull(LedgerAccount):
+    id: UUID
+
+
+class LedgerBalance(LedgerAccountFull):
+    balance: int  # minor units, debit balances > 0
+    as_of: Optional[datetime] = None  # None for the current balance
+
+
+class BalanceCheckpointReport(AbstractModel):
+    as_of: datetime
+    checkpoints: int  # accounts checkpointed
+
+
+class InterestAccrualReport(AbstractModel):
+    cooperative_id: UUID
+    accrual_date: date
+    accounts: int  # member accounts accrued on
+    totals: dict[str, int]  # minor units posted per account code, e.g. "savings"
+    duplicates: List[str]  # journals of the day posted before, left as they were
+
+
+class PostingLeg(AbstractModel):
+    account_id: UUID
+    amount: int  # minor units, debit > 0, credit < 0
+
+
+class LegDetail(AbstractModel):
+    """
+    Member subsidiary postings itemising a journal's leg on their GL control
+    account, e.g. each member's share of 1210. Plain lists, there can be one per
+    member: build it with model_construct from trusted rows.
+    """
+
+    control_account_id: UUID  # account of the leg itemised
+    account_ids: List[UUID]
+    amounts: List[int]  # minor units, they add up to the control leg
+
+
+class JournalEntry(AbstractModel):
+    reference: str  # posting the same reference twice is a no-op
+    description: Optional[str] = None
+    effective_at: datetime = Field(default_factory=datetime.utcnow)
+    legs: List[PostingLeg] = Field(min_length=2)
+    # posted with the legs, outside of the debits and credits check
+    detail: Optional[LegDetail] = None
+
+    @model_validator(mode="after")
+    def check_balanced(self):
+        if any(leg.amount == 0 for leg in self.legs):
+            raise ValueError(f"journal {self.reference} has a zero amount leg")
+        if sum(leg.amount for leg in self.legs) != 0:
+            raise ValueError(f"journal {self.reference} debits and credits differ")
+        if self.detail is not None:
+            control = [
+                leg.amount
+                for leg in self.legs
+                if leg.account_id == self.detail.control_account_id
+            ]
+            if (
+                len(self.detail.account_ids) != len(self.detail.amounts)
+                or 0 in self.detail.amounts
+                or control != [sum(self.detail.amounts)]
+            ):
+                raise ValueError(
+                    f"journal {self.reference} detail doesn't itemise its control leg"
+                )
+        return self
+
+
+class PostingReport(AbstractModel):
+    posted: List[str]  # references of the journals written
+    duplicates: List[str]  # references that were already posted
 
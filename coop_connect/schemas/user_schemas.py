@@ -63,6 +63,13 @@ class UserBioRead(UserBio):
     signature_file: Optional[FileLite] = None
 
 
+class UserContact(AbstractModel):
+    id: UUID
+    email: Optional[EmailStr] = None
+    phone_number: Optional[str] = None
+    bio_id: Optional[UUID] = None
+
+
 class UserOnboard(User):
     user_bio: Optional[UserBio] = None
 
@@ -75,6 +82,7 @@ class UserProfile(User):
     # excluding password
     password: str = Field(exclude=True)
     email: Optional[EmailStr] = Field(exclude=True, default=None)
+    coop_role_version: int = Field(exclude=True, default=0)
 
 
 class UserUpdate(AbstractModel):
@@ -88,6 +96,10 @@ class UserUpdate(AbstractModel):
 
 class TokenData(AbstractModel):
     id: UUID
+    # signed coop_id -> (role, status) claims, trusted until coop_roles_exp
+    coop_roles: Optional[dict[str, tuple[str, str]]] = None
+    coop_role_version: Optional[int] = None
+    coop_roles_exp: Optional[int] = None
 
 
 class UserAccessToken(AbstractModel):
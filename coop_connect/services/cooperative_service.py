@@ -3,78 +3,153 @@ from datetime import date, datetime
 from typing import Optional
 from uuid import UUID, uuid4
 
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
 import coop_connect.database.db_handlers.cooperative_db_handler as cooperative_db_handler
+import coop_connect.database.db_handlers.finance_db_handler as finance_db_handler
+import coop_connect.database.db_handlers.user_db_handler as user_db_handler
 import coop_connect.schemas.cooperative_schemas as schemas
+import coop_connect.services.service_utils.cache_utils as cache_utils
+from coop_connect.database.orms.cooperative_orm import Cooperative as Cooperative_DB
+from coop_connect.database.orms.cooperative_orm import Member as Member_DB
 from coop_connect.root.connect_exception import (
     ConnectBadRequestException,
     ConnectNotFoundException,
 )
 from coop_connect.root.coop_enums import MembershipStatus
+from coop_connect.root.database import unit_of_work
+from coop_connect.root.settings import Settings
+from coop_connect.root.utils.pagination import decode_cursor
+from coop_connect.root.utils.projection import parse_fields
 from coop_connect.schemas.user_schemas import UserProfile
 from coop_connect.services.service_utils.exception_collection import (
+    DuplicateError,
     NotFound,
     UpdateError,
 )
+from coop_connect.services.service_utils.import_utils import (
+    UnsupportedFileError,
+    iter_rows,
+    read_chunk,
+)
 
 LOGGER = logging.getLogger(__name__)
+settings = Settings()
 
 
 # ------- START OF COOPERATIVE MANAGEMENT -------
 
 
-async def get_cooperatives_via_acronym(acronym: str):
-    return cooperative_db_handler.get_cooperatives_via_acronym(acronym=acronym)
+async def get_cooperatives_via_acronym(acronym: str, fields: Optional[str] = None):
+    return await cooperative_db_handler.get_cooperatives_via_acronym(
+        acronym=acronym,
+        fields=_parse_fields(
+            fields=fields,
+            model=Cooperative_DB,
+            schema=schemas.CooperativeProfile,
+        ),
+    )
 
 
 async def create_cooperative(coop_in: schemas.CooperativeIn, user: UserProfile):
 
     coop_name = f"{coop_in.acronym.upper()[0:4]}{coop_in.acronym.upper()[4:6]}"
     coop_id = f"COOP-{coop_name.replace(' ','-')}-{str(uuid4()).replace('-', '')[:10]}"
-    try:
-        await cooperative_db_handler.get_cooperative_via_accronym(
-            acronym=coop_in.acronym
-        )
-        raise ConnectBadRequestException("acroynm is not unique")
-    except NotFound:
-
+    # acronym check, cooperative and root member are written atomically
+    async with unit_of_work() as session:
         try:
-
-            cooperative = await cooperative_db_handler.create_cooperative(
-                cooperative_in=schemas.CooperativeExtended(
-                    **coop_in.model_dump(exclude="creator_role"),
-                    coop_id=coop_id,
-                    created_by=user.id,
-                    status=schemas.CooperativeStatus.INACTIVE,
-                )
+            await cooperative_db_handler.get_cooperative_via_accronym(
+                acronym=coop_in.acronym, session=session
             )
+            raise ConnectBadRequestException("acroynm is not unique")
+        except NotFound:
+
+            try:
+
+                cooperative = await cooperative_db_handler.create_cooperative(
+                    cooperative_in=schemas.CooperativeExtended(
+                        **coop_in.model_dump(exclude="creator_role"),
+                        coop_id=coop_id,
+                        created_by=user.id,
+                        status=schemas.CooperativeStatus.INACTIVE,
+                    ),
+                    session=session,
+                )
 
-            # create root_coop member
-            membership_id = f"{coop_name}-{date.today().year}-1"
-            referal_code = f"{date.today().year}-1-{str(uuid4()).replace('-', '')[:6]}"
+                # create root_coop member
+                year = date.today().year
+                number = await cooperative_db_handler.allocate_membership_numbers(
+                    cooperative_id=cooperative.id, year=year, session=session
+                )
+                membership_id = f"{coop_name}-{year}-{number}"
+                referal_code = f"{year}-{number}-{str(uuid4()).replace('-', '')[:6]}"
+
+                root_member = await cooperative_db_handler.create_coop_member(
+                    member=schemas.MembershipExtended(
+                        membership_id=membership_id,
+                        cooperative_id=cooperative.id,
+                        onboarding_response=None,
+                        user_id=user.id,
+                        user_bio=user.bio.id,
+                        status=schemas.MembershipStatus.ACTIVE,
+                        role=coop_in.creator_role,
+                        referal_code=referal_code,
+                    ),
+                    session=session,
+                )
 
-            await cooperative_db_handler.create_coop_member(
-                member=schemas.MembershipExtended(
-                    membership_id=membership_id,
+                await finance_db_handler.create_gl_accounts(
+                    cooperative_id=cooperative.id, session=session
+                )
+                await finance_db_handler.create_member_accounts(
                     cooperative_id=cooperative.id,
-                    onboarding_response=None,
-                    user_id=user.id,
-                    user_bio=user.bio.id,
-                    status=schemas.MembershipStatus.ACTIVE,
-                    role=coop_in.creator_role,
-                    referal_code=referal_code,
-                ),
-            )
+                    member_ids=[root_member.id],
+                    session=session,
+                )
 
-            return cooperative
+                return cooperative
+
+            except Exception as e:
+                LOGGER.exception(e)
+                LOGGER.error("cooperative failed to create")
+
+                raise ConnectBadRequestException(message="cooperative failed to create")
+
+
+def _decode_cursor(cursor: Optional[str], search: Optional[str] = None):
+    if cursor is None:
+        return None
+    if search:
+        # search results are ordered by relevance, which has no keyset
+        raise ConnectBadRequestException(
+            message="search results are paginated with offset, not cursor"
+        )
+    try:
+        return decode_cursor(cursor=cursor)
+    except ValueError as e:
+        LOGGER.exception(e)
+        raise ConnectBadRequestException(message="invalid pagination cursor")
 
-        except Exception as e:
-            LOGGER.exception(e)
-            LOGGER.error("cooperative failed to create")
 
-            raise ConnectBadRequestException(message="cooperative failed to create")
+def _parse_fields(fields: Optional[str], model, schema) -> frozenset:
+    try:
+        return parse_fields(fields=fields, model=model, schema=schema)
+    except ValueError as e:
+        raise ConnectBadRequestException(message=str(e))
 
 
 async def get_cooperatives(**kwargs):
+    kwargs["fields"] = _parse_fields(
+        fields=kwargs.get("fields"),
+        model=Cooperative_DB,
+        schema=schemas.CooperativeProfile,
+    )
+    kwargs["cursor"] = _decode_cursor(
+        cursor=kwargs.get("cursor"), search=kwargs.get("search")
+    )
 
     return await cooperative_db_handler.get_cooperatives(**kwargs)
 
@@ -206,19 +281,42 @@ async def _get_coop_member_via_user_id(user_id: UUID, cooperative_id: UUID):
 
 
 async def get_coop_member_role(user_id: UUID, cooperative_id: UUID):
+    cached_role = cache_utils.get_cached_member_role(
+        user_id=user_id, cooperative_id=cooperative_id
+    )
+    if cached_role is not None:
+        return cached_role
+
     try:
         cooperative_member = await _get_coop_member_via_user_id(
             user_id=user_id, cooperative_id=cooperative_id
         )
+        cache_utils.cache_member_role(
+            user_id=user_id,
+            cooperative_id=cooperative_id,
+            role=cooperative_member.role,
+            status=cooperative_member.status,
+        )
         return cooperative_member.role, cooperative_member.status
     except NotFound:
         raise ConnectNotFoundException(message="user is not a member of cooperative")
 
 
-async def get_coop_member(member_id: UUID, cooperative_id: UUID):
+async def get_coop_role_claims(user_id: UUID) -> dict:
+    """coop_id -> (role, status) for every cooperative the user belongs to."""
+    memberships = await cooperative_db_handler.get_user_memberships(user_id=user_id)
+    return {
+        str(membership.cooperative_id): (membership.role, membership.status)
+        for membership in memberships
+    }
+
+
+async def get_coop_member(
+    member_id: UUID, cooperative_id: UUID, session: Optional[AsyncSession] = None
+):
     try:
         return await cooperative_db_handler.get_coop_member(
-            id=member_id, cooperative_id=cooperative_id
+            id=member_id, cooperative_id=cooperative_id, session=session
         )
     except NotFound as e:
         LOGGER.exception(e)
@@ -233,16 +331,26 @@ async def get_all_coop_members(
     limit: int = 20,
     search: Optional[str] = None,
     year: Optional[schemas.Years] = None,
+    cursor: Optional[str] = None,
+    count_mode: schemas.CountMode = schemas.CountMode.EXACT,
+    fields: Optional[str] = None,
+    session: Optional[AsyncSession] = None,
 ) -> schemas.PaginatedMembersResponse:
 
     return await cooperative_db_handler.get_all_members(
         id=cooperative_id,
+        session=session,
         **{
             "status": status,
             "offset": offset,
             "limit": limit,
             "years": year,
             "search": search,
+            "cursor": _decode_cursor(cursor=cursor, search=search),
+            "count_mode": count_mode,
+            "fields": _parse_fields(
+                fields=fields, model=Member_DB, schema=schemas.MembershipProfile
+            ),
         },
     )
 
@@ -251,35 +359,46 @@ async def update_coop_membership(
     cooperative_id: UUID, member_id: UUID, member_update: schemas.MembershipUpdate
 ):
     try:
-        cooperative_member_profile = await get_coop_member(
-            member_id=member_id, cooperative_id=cooperative_id
-        )
+        # member read, numbering and update share one connection and transaction
+        async with unit_of_work() as session:
+            cooperative_member_profile = await get_coop_member(
+                member_id=member_id, cooperative_id=cooperative_id, session=session
+            )
 
-        member_update = schemas.MembershipExtendedUpdate(
-            **member_update.model_dump(),
-            membership_id=None,
-            referal_code=None,
-        )
+            member_update = schemas.MembershipExtendedUpdate(
+                **member_update.model_dump(),
+                membership_id=None,
+                referal_code=None,
+            )
 
-        if member_update.status == MembershipStatus.ACTIVE:
-            coop_name = cooperative_member_profile.cooperative.acronym.upper()[0:4]
+            if member_update.status == MembershipStatus.ACTIVE:
+                coop_name = cooperative_member_profile.cooperative.acronym.upper()[0:4]
 
-            all_members = await get_all_coop_members(
-                cooperative_id=cooperative_id, year=date.today().year
-            )
-            # create root_coop member
-            member_update.membership_id = (
-                f"{coop_name}-{date.today().year}-{all_members.total_count+1}"
-            )
+                # one locked sequence write, concurrent approvals never share a number
+                year = date.today().year
+                number = await cooperative_db_handler.allocate_membership_numbers(
+                    cooperative_id=cooperative_id, year=year, session=session
+                )
+                member_update.membership_id = f"{coop_name}-{year}-{number}"
 
-            member_update.referal_code = f"{date.today().year}-{all_members.total_count+1}-{str(uuid4()).replace('-', '')[:6]}"
+                member_update.referal_code = (
+                    f"{year}-{number}-{str(uuid4()).replace('-', '')[:6]}"
+                )
 
-        coop_member_update = await cooperative_db_handler.update_coop_membership(
-            coop_member_update=member_update,
-            coop_member_id=member_id,
-            coop_id=cooperative_id,
-        )
-        return coop_member_update
+            coop_member_update = await cooperative_db_handler.update_coop_membership(
+                coop_member_update=member_update,
+                coop_member_id=member_id,
+                coop_id=cooperative_id,
+                session=session,
+            )
+            if member_update.status == MembershipStatus.ACTIVE:
+                # opened with the approval, like batch approval and import do
+                await finance_db_handler.create_member_accounts(
+                    cooperative_id=cooperative_id,
+                    member_ids=[member_id],
+                    session=session,
+                )
+            return coop_member_update
 
     except UpdateError as e:
         LOGGER.exception(e)
@@ -289,4 +408,235 @@ async def update_coop_membership(
         )
 
 
+async def approve_coop_members(
+    cooperative_id: UUID, member_ids: list[UUID]
+) -> schemas.MemberBatchApprovalResponse:
+    """Activates every listed pending member in one transaction with contiguous membership numbers."""
+    member_ids = list(dict.fromkeys(member_ids))
+    try:
+        async with unit_of_work() as session:
+            cooperative = await cooperative_db_handler.get_cooperative(
+                id=cooperative_id, session=session
+            )
+            pending = await cooperative_db_handler.lock_pending_members(
+                coop_id=cooperative_id, member_ids=member_ids, session=session
+            )
+            approved = []
+            if pending:
+                coop_name = cooperative.acronym.upper()[0:4]
+                year = date.today().year
+                first = await cooperative_db_handler.allocate_membership_numbers(
+                    cooperative_id=cooperative_id,
+                    year=year,
+                    count=len(pending),
+                    session=session,
+                )
+                approved = await cooperative_db_handler.approve_coop_members(
+                    coop_id=cooperative_id,
+                    approvals=[
+                        (
+                            member_id,
+                            f"{coop_name}-{year}-{number}",
+                            f"{year}-{number}-{str(uuid4()).replace('-', '')[:6]}",
+                        )
+                        for number, member_id in enumerate(pending, start=first)
+                    ],
+                    session=session,
+                )
+                await finance_db_handler.create_member_accounts(
+                    cooperative_id=cooperative_id,
+                    member_ids=[member.id for member in approved],
+                    session=session,
+                )
+    except NotFound as e:
+        LOGGER.exception(e)
+        raise ConnectNotFoundException(message="cooperative not found")
+    except UpdateError as e:
+        LOGGER.exception(e)
+        LOGGER.error("batch member approval failed")
+        raise ConnectBadRequestException(message="member approval failed")
+
+    approved_ids = {member.id for member in approved}
+    return schemas.MemberBatchApprovalResponse(
+        result_set=approved,
+        approved_count=len(approved),
+        skipped=[
+            member_id for member_id in member_ids if member_id not in approved_ids
+        ],
+    )
+
+
+async def import_coop_members(
+    cooperative: schemas.CooperativeProfile, upload_file: UploadFile
+) -> schemas.MemberImportReport:
+    """
+    Bulk onboarding of existing members from a CSV/XLSX upload.
+
+    The file is streamed in chunks; each chunk is validated, matched to users in
+    two queries and inserted in one transaction. Invalid rows are reported and
+    skipped, they never fail the rest of the import.
+    """
+    try:
+        rows = iter_rows(file=upload_file.file, filename=upload_file.filename)
+    except UnsupportedFileError:
+        raise ConnectBadRequestException(message="upload a .csv or .xlsx file")
+
+    report = schemas.MemberImportReport()
+    chunk_size = settings.member_import_chunk_size
+    while chunk := await run_in_threadpool(read_chunk, rows, chunk_size):
+        first_row = report.total_rows + 2  # spreadsheet rows, after the header
+        if report.total_rows + len(chunk) > settings.member_import_max_rows:
+            chunk = chunk[: settings.member_import_max_rows - report.total_rows]
+            await _import_member_chunk(cooperative, chunk, first_row, report)
+            report.errors.append(
+                schemas.MemberImportError(
+                    row=report.total_rows + 2,
+                    errors=[
+                        f"import stopped, at most {settings.member_import_max_rows} rows per file"
+                    ],
+                )
+            )
+            break
+
+        await _import_member_chunk(cooperative, chunk, first_row, report)
+
+    report.failed = report.total_rows - report.imported
+    return report
+
+
+async def _import_member_chunk(
+    cooperative: schemas.CooperativeProfile,
+    chunk: list[dict],
+    first_row: int,
+    report: schemas.MemberImportReport,
+):
+    report.total_rows += len(chunk)
+    errors: dict[int, list[str]] = {}
+
+    rows: dict[int, schemas.MemberImportRow] = {}
+    for row_number, raw_row in enumerate(chunk, start=first_row):
+        try:
+            rows[row_number] = schemas.MemberImportRow(**raw_row)
+        except ValidationError as e:
+            errors[row_number] = [
+                f"{'.'.join(str(loc) for loc in error['loc']) or 'row'}: {error['msg']}"
+                for error in e.errors()
+            ]
+
+    users = await user_db_handler.get_users_by_contact(
+        emails=[row.email for row in rows.values() if row.email],
+        phone_numbers=[row.phone_number for row in rows.values() if row.phone_number],
+    )
+    users_by_email = {user.email: user for user in users if user.email}
+    users_by_phone = {user.phone_number: user for user in users if user.phone_number}
+    existing_members = await cooperative_db_handler.get_member_user_ids(
+        cooperative_id=cooperative.id, user_ids=[user.id for user in users]
+    )
+    taken_membership_ids = await cooperative_db_handler.get_taken_membership_ids(
+        membership_ids=[row.membership_id for row in rows.values() if row.membership_id]
+    )
+
+    matched: dict[int, tuple] = {}
+    for row_number, row in rows.items():
+        user = users_by_email.get(row.email) or users_by_phone.get(row.phone_number)
+        if user is None:
+            error = "no user with this email or phone_number"
+        elif user.bio_id is None:
+            error = "user profile not complete"
+        elif user.id in existing_members:
+            error = "user is already a member of this cooperative"
+        elif row.membership_id and row.membership_id in taken_membership_ids:
+            error = f"membership_id {row.membership_id} is already in use"
+        else:
+            error = None
+            # later rows of the same file see this row as taken
+            existing_members.add(user.id)
+            if row.membership_id:
+                taken_membership_ids.add(row.membership_id)
+            matched[row_number] = (row, user)
+
+        if error:
+            errors[row_number] = [error]
+
+    if matched:
+        try:
+            async with unit_of_work() as session:
+                members = await _number_imported_members(
+                    cooperative=cooperative, matched=matched, session=session
+                )
+                report.imported += await cooperative_db_handler.create_coop_members(
+                    members=members, session=session
+                )
+                await finance_db_handler.create_member_accounts(
+                    cooperative_id=cooperative.id,
+                    member_ids=[
+                        member.id
+                        for member in members
+                        if member.status == MembershipStatus.ACTIVE
+                    ],
+                    session=session,
+                )
+        except DuplicateError as e:
+            # a concurrent join/approval took a user or number, nothing in this chunk was written
+            LOGGER.exception(e)
+            for row_number in matched:
+                errors[row_number] = [
+                    "conflicts with a concurrent change, retry this row"
+                ]
+
+    report.errors.extend(
+        schemas.MemberImportError(row=row_number, errors=row_errors)
+        for row_number, row_errors in sorted(errors.items())
+    )
+
+
+async def _number_imported_members(
+    cooperative: schemas.CooperativeProfile,
+    matched: dict[int, tuple],
+    session: AsyncSession,
+) -> list[schemas.MembershipImport]:
+    """Active rows without a membership_id get one block of numbers per join year."""
+    coop_name = cooperative.acronym.upper()[0:4]
+
+    unnumbered: dict[int, list[int]] = {}
+    for row_number, (row, _) in matched.items():
+        if row.status == MembershipStatus.ACTIVE and not row.membership_id:
+            year = (row.date_joined or datetime.now()).year
+            unnumbered.setdefault(year, []).append(row_number)
+
+    numbers: dict[int, tuple[int, int]] = {}
+    for year, row_numbers in unnumbered.items():
+        first = await cooperative_db_handler.allocate_membership_numbers(
+            cooperative_id=cooperative.id,
+            year=year,
+            count=len(row_numbers),
+            session=session,
+        )
+        for number, row_number in enumerate(row_numbers, start=first):
+            numbers[row_number] = (year, number)
+
+    members = []
+    for row_number, (row, user) in matched.items():
+        membership_id, referal_code = row.membership_id, None
+        if row_number in numbers:
+            year, number = numbers[row_number]
+            membership_id = f"{coop_name}-{year}-{number}"
+            referal_code = f"{year}-{number}-{str(uuid4()).replace('-', '')[:6]}"
+
+        members.append(
+            schemas.MembershipImport(
+                membership_type=row.membership_type,
+                membership_id=membership_id,
+                user_bio=user.bio_id,
+                user_id=user.id,
+                status=row.status,
+                cooperative_id=cooperative.id,
+                referal_code=referal_code,
+                role=row.role,
+                date_joined=row.date_joined,
+            )
+        )
+    return members
+
+
 # ------- END OF COOP MEMBER MANAGEMENT -------
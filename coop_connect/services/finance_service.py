@@ -1,8 +1,10 @@
 import logging
-from datetime import date, datetime
+from datetime import date, datetime, time, timedelta
 from typing import Optional
 from uuid import UUID, uuid4
 
+import numpy as np
+
 import coop_connect.database.db_handlers.finance_db_handler as finance_db_handler
 import coop_connect.schemas.finance_schemas as schemas
 import coop_connect.schemas.cooperative_schemas as cooperative_schemas
@@ -10,8 +12,12 @@ from coop_connect.root.connect_exception import (
     ConnectBadRequestException,
     ConnectNotFoundException,
 )
+from coop_connect.root.database import unit_of_work
+from coop_connect.root.settings import Settings
 from coop_connect.schemas.user_schemas import UserProfile
+from coop_connect.services.service_utils import interest_utils
 from coop_connect.services.service_utils.exception_collection import (
+    InsufficientFunds,
     NotFound,
     UpdateError,
 )
@@ -20,6 +26,8 @@ from coop_connect.services import payaza_service
 
 LOGGER = logging.getLogger(__name__)
 
+settings = Settings()
+
 async def _get_member_wallet(user_id: UUID, cooperative_id: UUID):
     try:
         return await finance_db_handler.get_wallet(
@@ -54,15 +62,48 @@ async def update_wallet(
         cooperative: cooperative_schemas.CooperativeProfile,
         user: UserProfile
     ):
-    # if wallet_update.is_active is None:
-
     wallet= await _get_member_wallet(
             user_id=user.id, cooperative_id=cooperative.id
         )
+    if not wallet_update.model_dump(exclude_none=True, exclude_unset=True):
+        # nothing to change, an UPDATE without SET values can't run
+        return wallet
     return await finance_db_handler.update_wallet(
         wallet_details=wallet_update, wallet_id=wallet.id
     )
 
+async def credit_wallet(
+        transaction: schemas.WalletTransaction,
+        cooperative: cooperative_schemas.CooperativeProfile,
+        user: UserProfile
+    ):
+    try:
+        wallet = await _get_member_wallet(
+            user_id=user.id, cooperative_id=cooperative.id
+        )
+        return await finance_db_handler.credit_wallet(
+            wallet_id=wallet.id, amount=transaction.amount
+        )
+    except NotFound:
+        raise ConnectNotFoundException(message="Wallet not found for this member")
+
+async def debit_wallet(
+        transaction: schemas.WalletTransaction,
+        cooperative: cooperative_schemas.CooperativeProfile,
+        user: UserProfile
+    ):
+    try:
+        wallet = await _get_member_wallet(
+            user_id=user.id, cooperative_id=cooperative.id
+        )
+        return await finance_db_handler.debit_wallet(
+            wallet_id=wallet.id, amount=transaction.amount
+        )
+    except NotFound:
+        raise ConnectNotFoundException(message="Wallet not found for this member")
+    except InsufficientFunds:
+        raise ConnectBadRequestException(message="Insufficient wallet balance")
+
 
 async def _get_bank_account(user_id: UUID, cooperative_id: UUID):
     try:
@@ -112,15 +153,280 @@ async def create_member_bank_account(
     
 
 async def payaza_collect_payment(
-        wallet_update: schemas.WalletUpdate,
+        transaction: schemas.WalletTransaction,
         cooperative: cooperative_schemas.CooperativeProfile,
         user: UserProfile
     ):
-    # if wallet_update.is_active is None:
+    return await credit_wallet(
+        transaction=transaction, cooperative=cooperative, user=user
+    )
 
-    wallet= await _get_member_wallet(
-            user_id=user.id, cooperative_id=cooperative.id
+
+# ------ LEDGER ----------
+async def get_ledger_accounts(
+    cooperative_id: UUID,
+    member_ids: Optional[list[UUID]] = None,
+    codes: Optional[list[str]] = None,
+) -> dict[tuple, schemas.LedgerAccountFull]:
+    """Accounts keyed by (member_id, code), member_id is None for GL accounts."""
+    accounts = await finance_db_handler.get_ledger_accounts(
+        cooperative_id=cooperative_id, member_ids=member_ids, codes=codes
+    )
+    return {(account.member_id, account.code): account for account in accounts}
+
+
+async def post_journals(
+    cooperative_id: UUID, entries: list[schemas.JournalEntry]
+) -> schemas.PostingReport:
+    """Posts a batch of balanced journals in one round trip, reposted references are no-ops."""
+    # a reference repeated within the batch is a duplicate as well
+    unique_entries = {}
+    for entry in entries:
+        unique_entries.setdefault(entry.reference, entry)
+    try:
+        posted = await finance_db_handler.post_journals(
+            cooperative_id=cooperative_id, entries=list(unique_entries.values())
         )
-    return await finance_db_handler.update_wallet(
-        wallet_details=wallet_update, wallet_id=wallet.id
-    )
\ No newline at end of file
+    except UpdateError as e:
+        LOGGER.exception(e)
+        raise ConnectBadRequestException(
+            message="journal legs must be on the cooperative's ledger accounts"
+        )
+
+    posted_references = set(posted)
+    return schemas.PostingReport(
+        posted=posted,
+        duplicates=[
+            entry.reference
+            for entry in entries
+            if entry.reference not in posted_references
+            or unique_entries[entry.reference] is not entry
+        ],
+    )
+
+
+async def get_ledger_balances(
+    cooperative_id: UUID,
+    member_ids: Optional[list[UUID]] = None,
+    codes: Optional[list[str]] = None,
+    as_of: Optional[datetime] = None,
+) -> list[schemas.LedgerBalance]:
+    """Current balances, or balances over the postings effective before ``as_of``."""
+    return await finance_db_handler.get_ledger_balances(
+        cooperative_id=cooperative_id, member_ids=member_ids, codes=codes, as_of=as_of
+    )
+
+
+async def create_balance_checkpoints(
+    as_of: Optional[datetime] = None,
+) -> schemas.BalanceCheckpointReport:
+    """Checkpoints the accounts posted to, by default as of the start of today (naive UTC)."""
+    if as_of is None:
+        as_of = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    if as_of > datetime.utcnow():
+        # every posting until then would have to restate it
+        raise ConnectBadRequestException(message="checkpoints can't be in the future")
+
+    checkpoints = 0
+    # a transaction per cooperative, its journal batches only wait for its own scan
+    for cooperative_id in await finance_db_handler.get_ledger_cooperative_ids():
+        checkpoints += await finance_db_handler.create_balance_checkpoints(
+            as_of=as_of, cooperative_id=cooperative_id
+        )
+    LOGGER.info(f"{checkpoints} ledger balance checkpoints as of {as_of}")
+    return schemas.BalanceCheckpointReport(as_of=as_of, checkpoints=checkpoints)
+
+
+def _interest_schedules() -> dict:
+    schedules = {}
+    for product, tiers in (
+        (interest_utils.SAVINGS_INTEREST, settings.savings_interest_tiers),
+        (interest_utils.LOAN_INTEREST, settings.loan_interest_tiers),
+    ):
+        if tiers:
+            schedules[product] = interest_utils.tier_schedule(tiers)
+    return schedules
+
+
+async def accrue_interest(
+    cooperative_id: UUID, accrual_date: date
+) -> schemas.InterestAccrualReport:
+    """
+    Accrues a day of interest on every member savings and loan account, on the
+    balances at the end of ``accrual_date``. Each product's day is posted as one
+    GL journal; loan interest's 1210 leg is itemised over the members'
+    loan_interest accounts, so 1210 reconciles to them. The members' shares and
+    residuals go to interest_accrual, all in one transaction. Days are accrued
+    in order, a day at or before the latest one accrued is refused.
+    """
+    schedules = _interest_schedules()
+    report = schemas.InterestAccrualReport(
+        cooperative_id=cooperative_id,
+        accrual_date=accrual_date,
+        accounts=0,
+        totals={},
+        duplicates=[],
+    )
+    if not schedules:
+        return report
+
+    end_of_day = datetime.combine(accrual_date + timedelta(days=1), time.min)
+    started_at = datetime.utcnow()
+    async with unit_of_work() as session:
+        await finance_db_handler.lock_interest_accruals(
+            cooperative_id=cooperative_id, session=session
+        )
+        accrued_through = await finance_db_handler.get_interest_accrued_through(
+            cooperative_id=cooperative_id, session=session
+        )
+        if accrued_through is not None and accrual_date <= accrued_through:
+            # the residuals carried are those left after accrued_through
+            raise ConnectBadRequestException(
+                message=f"interest is accrued through {accrued_through}, "
+                "days are accrued in order"
+            )
+
+        rows = await finance_db_handler.get_interest_accrual_inputs(
+            cooperative_id=cooperative_id,
+            codes=[product.code for product in schedules],
+            as_of=end_of_day,
+            member_detail_codes={
+                product.code: product.member_detail_code
+                for product in schedules
+                if product.member_detail_code
+            },
+            session=session,
+        )
+        if not rows:
+            return report
+        account_ids, codes, residuals, detail_account_ids, balances = zip(*rows)
+        codes = np.array(codes)
+        residuals = np.array(residuals, dtype=np.int64)
+        amounts, carried, totals = interest_utils.accrue_accounts(
+            codes=codes,
+            balances=np.array(balances, dtype=np.int64),
+            residuals=residuals,
+            schedules=schedules,
+            day_count=settings.interest_day_count,
+        )
+        loaded_at = datetime.utcnow()
+
+        gl_accounts = await finance_db_handler.get_ledger_accounts(
+            cooperative_id=cooperative_id,
+            codes=[
+                code
+                for product in schedules
+                for code in (product.debit_code, product.credit_code)
+            ],
+            session=session,
+        )
+        gl_account_ids = {account.code: account.id for account in gl_accounts}
+        entries = {}
+        for product in schedules:
+            if not totals[product.code]:
+                continue
+            detail = None
+            if product.member_detail_code:
+                indexes = np.flatnonzero((codes == product.code) & (amounts > 0))
+                # straight from the arrays, a leg model per member costs seconds
+                detail = schemas.LegDetail.model_construct(
+                    control_account_id=gl_account_ids[product.debit_code],
+                    account_ids=[detail_account_ids[index] for index in indexes],
+                    amounts=amounts[indexes].tolist(),
+                )
+            entries[product] = schemas.JournalEntry(
+                reference=interest_utils.accrual_reference(product, accrual_date),
+                description=f"{product.code} interest accrued on {accrual_date}",
+                # within the day, so the next day's checkpoint includes it
+                effective_at=end_of_day - timedelta(microseconds=1),
+                legs=[
+                    schemas.PostingLeg(
+                        account_id=gl_account_ids[product.debit_code],
+                        amount=totals[product.code],
+                    ),
+                    schemas.PostingLeg(
+                        account_id=gl_account_ids[product.credit_code],
+                        amount=-totals[product.code],
+                    ),
+                ],
+                detail=detail,
+            )
+        posted = set(
+            await finance_db_handler.post_journals(
+                cooperative_id=cooperative_id,
+                entries=list(entries.values()),
+                session=session,
+            )
+        )
+
+        # only accounts that changed, of products whose day wasn't posted before
+        recorded = (amounts > 0) | (carried != residuals)
+        for product, entry in entries.items():
+            if entry.reference not in posted:
+                report.duplicates.append(entry.reference)
+                recorded &= codes != product.code
+        indexes = np.flatnonzero(recorded)
+        await finance_db_handler.record_interest_accruals(
+            account_ids=[account_ids[index] for index in indexes],
+            amounts=amounts[indexes].tolist(),
+            residuals=carried[indexes].tolist(),
+            accrual_date=accrual_date,
+            session=session,
+        )
+
+    LOGGER.info(
+        f"accrued {accrual_date} interest on {len(rows)} accounts of "
+        f"{cooperative_id}: {totals}, loaded and computed in "
+        f"{(loaded_at - started_at).total_seconds():.2f} s, written in "
+        f"{(datetime.utcnow() - loaded_at).total_seconds():.2f} s"
+    )
+    report.accounts = len(rows)
+    report.totals = {
+        product.code: totals[product.code]
+        for product, entry in entries.items()
+        if entry.reference in posted
+    }
+    return report
+
+
+async def accrue_interest_for_all(
+    accrual_date: Optional[date] = None,
+) -> list[schemas.InterestAccrualReport]:
+    """
+    Accrues interest in every cooperative through ``accrual_date``, by default
+    yesterday (UTC). Days missed since a cooperative's latest accrual are
+    accrued first, in order.
+    """
+    today = datetime.utcnow().date()
+    if accrual_date is None:
+        accrual_date = today - timedelta(days=1)
+    if accrual_date >= today:
+        # the day's balances aren't final yet
+        raise ConnectBadRequestException(message="only past days can be accrued")
+
+    reports = []
+    for cooperative_id in await finance_db_handler.get_ledger_cooperative_ids():
+        accrued_through = await finance_db_handler.get_interest_accrued_through(
+            cooperative_id=cooperative_id
+        )
+        day = (
+            accrual_date
+            if accrued_through is None
+            else accrued_through + timedelta(days=1)
+        )
+        while day <= accrual_date:
+            try:
+                reports.append(
+                    await accrue_interest(
+                        cooperative_id=cooperative_id, accrual_date=day
+                    )
+                )
+            except Exception as e:
+                # later days would leave this one unaccruable, the others go on
+                LOGGER.exception(
+                    f"interest accrual of {cooperative_id} on {day} failed: {e}"
+                )
+                break
+            day += timedelta(days=1)
+    return reports
+# ------ END OF LEDGER ----------
@@ -10,6 +10,7 @@ from coop_connect.listeners import rabbitmq
 from coop_connect.root.utils.base_schemas import AbstractModel
 from coop_connect.root.connect_exception import ConnectAuthException, ConnectBadRequestException, ConnectReqPayloadException
 from coop_connect.root.settings import Settings
+from coop_connect.root.utils.metrics import observe_outbound
 
 from fastapi import Request
 from fastapi.responses import JSONResponse
@@ -68,9 +69,10 @@ def create_reserved_bank_account(
     'Content-Type': 'application/json'
   }
   try:
-    conn.request("POST", "/live/merchant-collection/merchant/virtual_account/generate_virtual_account/", payload, headers)
-    res = conn.getresponse()
-    data = res.read()
+    with observe_outbound(provider="payaza", operation="generate_virtual_account"):
+      conn.request("POST", "/live/merchant-collection/merchant/virtual_account/generate_virtual_account/", payload, headers)
+      res = conn.getresponse()
+      data = res.read()
     res_obj = json.loads(data.decode("utf-8"))
     return PayazaResponse.model_validate(res_obj)
   except Exception as e:
@@ -1,3 +1,8 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 from passlib.context import CryptContext
 
 from coop_connect.root.settings import Settings
@@ -5,12 +10,66 @@ from coop_connect.root.settings import Settings
 settings = Settings()
 
 # PASSWORD HASHING AND VALIDATOR
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max rounds pin the cost factor, so hashes made with any other cost
+# are reported by verify_and_update and rehashed on the next login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+
+# bcrypt is CPU bound (~200ms per call), run it off the event loop on a small
+# dedicated pool so login bursts can not starve the other requests
+hash_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers, thread_name_prefix="password-hash"
+)
+
+_stats_lock = threading.Lock()
+_pool_stats = {"queued": 0, "running": 0, "completed": 0, "max_queued": 0}
+
+
+def password_pool_stats() -> dict:
+    with _stats_lock:
+        return {**_pool_stats, "workers": settings.password_hash_workers}
+
+
+def _tracked(func, *args):
+    with _stats_lock:
+        _pool_stats["queued"] -= 1
+        _pool_stats["running"] += 1
+    try:
+        return func(*args)
+    finally:
+        with _stats_lock:
+            _pool_stats["running"] -= 1
+            _pool_stats["completed"] += 1
+
+
+async def _run_in_pool(func, *args):
+    with _stats_lock:
+        _pool_stats["queued"] += 1
+        _pool_stats["max_queued"] = max(
+            _pool_stats["max_queued"], _pool_stats["queued"]
+        )
+    return await asyncio.get_running_loop().run_in_executor(
+        hash_executor, _tracked, func, *args
+    )
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_pool(pwd_context.verify, plain_password, hashed_password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """Returns (is_valid, new_hash); new_hash is set when the stored hash uses an outdated cost."""
+    return await _run_in_pool(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
 
 
-def hash_password(plain_password: str) -> str:
-    return pwd_context.hash(plain_password)
+async def hash_password(plain_password: str) -> str:
+    return await _run_in_pool(pwd_context.hash, plain_password)
@@ -0,0 +1,105 @@
+"""
+In-process caches for hot read paths.
+
+Caches are per worker process, so every entry is bounded by a TTL; writes that
+change the cached data must call the matching ``invalidate_*`` helper once they
+have committed (see ``database.on_commit``).
+"""
+
+import hashlib
+import time
+from typing import Optional
+from uuid import UUID
+
+from cachetools import TLRUCache, TTLCache
+
+from coop_connect.root.settings import Settings
+from coop_connect.schemas.user_schemas import TokenData, UserProfile
+
+settings = Settings()
+
+# USER PROFILES (get_current_user)
+user_profile_cache: TTLCache = TTLCache(
+    maxsize=settings.user_cache_maxsize, ttl=settings.user_cache_ttl
+)
+
+
+def get_cached_user(user_id: UUID) -> Optional[UserProfile]:
+    user = user_profile_cache.get(user_id)
+    if user is None:
+        return None
+    # callers mutate the profile and its bio (e.g. user_service.user_update),
+    # never hand out the cached one or anything nested in it
+    return user.model_copy(deep=True)
+
+
+def cache_user(user: UserProfile) -> UserProfile:
+    user_profile_cache[user.id] = user
+    return user.model_copy(deep=True)
+
+
+def invalidate_user(user_id: UUID):
+    user_profile_cache.pop(user_id, None)
+
+
+# COOPERATIVE MEMBERSHIP ROLES (permission checks)
+# keyed by str ids, path params arrive as strings while handlers return UUIDs
+member_role_cache: TTLCache = TTLCache(
+    maxsize=settings.member_role_cache_maxsize, ttl=settings.member_role_cache_ttl
+)
+
+
+def get_cached_member_role(user_id: UUID, cooperative_id: UUID) -> Optional[tuple]:
+    return member_role_cache.get((str(user_id), str(cooperative_id)))
+
+
+def cache_member_role(user_id: UUID, cooperative_id: UUID, role: str, status: str):
+    member_role_cache[(str(user_id), str(cooperative_id))] = (role, status)
+
+
+def invalidate_member_role(user_id: UUID, cooperative_id: UUID):
+    member_role_cache.pop((str(user_id), str(cooperative_id)), None)
+
+
+# LISTING TOTALS (CountMode.CACHED)
+# keys are tuples that start with a scope, e.g. ("member", cooperative_id, *filters)
+listing_count_cache: TTLCache = TTLCache(
+    maxsize=settings.listing_count_cache_maxsize, ttl=settings.listing_count_cache_ttl
+)
+
+
+def get_cached_count(key: tuple) -> Optional[int]:
+    return listing_count_cache.get(key)
+
+
+def cache_count(key: tuple, total_count: int):
+    listing_count_cache[key] = total_count
+
+
+def invalidate_counts(*scope):
+    """Drops every cached total whose key starts with ``scope``."""
+    for key in [key for key in listing_count_cache if key[: len(scope)] == scope]:
+        listing_count_cache.pop(key, None)
+
+
+# VERIFIED ACCESS TOKENS (verify_access_token)
+# entries are (token_data, expires_at) and are evicted once the token itself expires
+verified_token_cache: TLRUCache = TLRUCache(
+    maxsize=settings.token_cache_maxsize,
+    ttu=lambda _key, entry, _now: entry[1],
+    timer=time.time,
+)
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def get_cached_token(token_key: bytes) -> Optional[TokenData]:
+    entry = verified_token_cache.get(token_key)
+    return entry[0] if entry is not None else None
+
+
+def cache_token(token_key: bytes, token_data: TokenData, expires_at: float):
+    if expires_at > time.time():
+        verified_token_cache[token_key] = (token_data, expires_at)
@@ -21,3 +21,8 @@ class DuplicateError(Exception):
 class DeleteError(Exception):
     "Delete Error"
     ...
+
+
+class InsufficientFunds(Exception):
+    "Insufficient Funds"
+    ...
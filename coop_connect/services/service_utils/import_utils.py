@@ -0,0 +1,63 @@
+"""
+Streaming readers for spreadsheet uploads (CSV and XLSX).
+
+Rows are read lazily and handed out in chunks, so an upload of any size is never
+held in memory at once; read_chunk is blocking and meant for run_in_threadpool.
+"""
+
+import codecs
+import csv
+from itertools import islice
+from typing import BinaryIO, Iterator, Optional
+
+CSV_EXTENSIONS = (".csv",)
+XLSX_EXTENSIONS = (".xlsx",)
+
+
+class UnsupportedFileError(Exception):
+    """Upload is not a CSV or XLSX file"""
+
+
+def _normalise_header(header) -> str:
+    return str(header or "").strip().lower().replace(" ", "_")
+
+
+def _csv_rows(file: BinaryIO) -> Iterator[dict]:
+    # utf-8-sig drops the BOM spreadsheet programs prepend to exported CSVs
+    reader = csv.reader(codecs.iterdecode(file, "utf-8-sig"))
+    headers = [_normalise_header(header) for header in next(reader, [])]
+    for values in reader:
+        if any(value.strip() for value in values):
+            yield dict(zip(headers, (value.strip() for value in values)))
+
+
+def _xlsx_rows(file: BinaryIO) -> Iterator[dict]:
+    # only needed for XLSX uploads, kept off the import path of the app
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [_normalise_header(header) for header in next(rows, ())]
+        for values in rows:
+            if any(value not in (None, "") for value in values):
+                yield {
+                    header: (str(value).strip() if value is not None else "")
+                    for header, value in zip(headers, values)
+                }
+    finally:
+        workbook.close()
+
+
+def iter_rows(file: BinaryIO, filename: Optional[str]) -> Iterator[dict]:
+    """Header-keyed rows of ``file``, headers are lower_snake_cased."""
+    filename = (filename or "").lower()
+    if filename.endswith(CSV_EXTENSIONS):
+        return _csv_rows(file)
+    if filename.endswith(XLSX_EXTENSIONS):
+        return _xlsx_rows(file)
+    raise UnsupportedFileError(filename)
+
+
+def read_chunk(rows: Iterator[dict], size: int) -> list[dict]:
+    return list(islice(rows, size))
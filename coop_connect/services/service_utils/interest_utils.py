@@ -0,0 +1,138 @@
+"""
+Daily interest accrual, vectorised over every member account of a cooperative.
+
+Tiers are banded: a tier's annual rate applies to the part of the principal
+between its threshold and the next tier's. A day accrues ``rate / day_count`` of
+it (Actual/365 fixed by default). Rates are held in millionths, so a day's
+interest is an exact integer over ``RATE_SCALE * day_count``: the whole minor
+units of it are posted and the remainder is carried into the account's next
+accrual, rounding never loses or creates interest over time.
+"""
+
+from datetime import date
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from coop_connect.services.service_utils import ledger_utils
+
+
+class InterestProduct(NamedTuple):
+    code: str  # member subsidiary account the interest accrues on
+    balance_sign: int  # turns the account's signed balance into its principal
+    debit_code: str  # GL accounts of the daily journal
+    credit_code: str
+    # member account itemising the debit, each member's share of it
+    member_detail_code: Optional[str] = None
+
+
+SAVINGS_INTEREST = InterestProduct(
+    code=ledger_utils.SAVINGS,
+    balance_sign=-1,  # liability, credit balance
+    debit_code=ledger_utils.INTEREST_EXPENSE_SAVINGS,
+    credit_code=ledger_utils.INTEREST_PAYABLE_SAVINGS,
+)
+LOAN_INTEREST = InterestProduct(
+    code=ledger_utils.LOAN_PRINCIPAL,
+    balance_sign=1,  # asset, debit balance
+    debit_code=ledger_utils.INTEREST_RECEIVABLE_LOANS,
+    credit_code=ledger_utils.INTEREST_INCOME_LOANS,
+    member_detail_code=ledger_utils.LOAN_INTEREST,
+)
+
+# rates are held to six decimal places
+RATE_SCALE = 1_000_000
+# a principal times a rate stays below this, leaving room for the residual
+MAX_ANNUAL_UNITS = np.iinfo(np.int64).max // 2
+
+
+class TierSchedule(NamedTuple):
+    thresholds: np.ndarray  # principal each tier starts at, minor units
+    rates: np.ndarray  # annual rate of each tier, in millionths
+
+
+def tier_schedule(tiers: Sequence[tuple[int, float]]) -> TierSchedule:
+    """``[(threshold, annual rate), ...]`` checked and sorted, the first must start at 0."""
+    if not tiers:
+        raise ValueError("an interest schedule needs at least one tier")
+    thresholds, rates = zip(*sorted(tiers))
+    if thresholds[0] != 0:
+        raise ValueError("the first interest tier must start at 0")
+    if len(set(thresholds)) != len(thresholds):
+        raise ValueError("interest tiers must have distinct thresholds")
+    if min(rates) < 0:
+        raise ValueError("interest rates can't be negative")
+    scaled = [round(rate * RATE_SCALE) for rate in rates]
+    if any(abs(rate * RATE_SCALE - units) > 1e-6 for rate, units in zip(rates, scaled)):
+        raise ValueError("interest rates can have at most six decimal places")
+    return TierSchedule(
+        thresholds=np.array(thresholds, dtype=np.int64),
+        rates=np.array(scaled, dtype=np.int64),
+    )
+
+
+def daily_interest(principal: np.ndarray, schedule: TierSchedule) -> np.ndarray:
+    """
+    A day's exact interest on each principal, in ``1 / (RATE_SCALE * day_count)``
+    minor units, whatever the day count: the year's interest in millionths.
+    """
+    if principal.size and int(principal.max()) * int(schedule.rates.max()) > (
+        MAX_ANNUAL_UNITS
+    ):
+        raise ValueError("principal too large to accrue interest on exactly")
+    upper = np.append(schedule.thresholds[1:], np.iinfo(np.int64).max)
+    # (accounts, tiers): the part of each principal inside each band
+    in_band = np.clip(
+        np.minimum(principal[:, None], upper[None, :]) - schedule.thresholds[None, :],
+        0,
+        None,
+    )
+    return in_band @ schedule.rates
+
+
+def accrue(
+    principal: np.ndarray,
+    residual: np.ndarray,
+    schedule: TierSchedule,
+    day_count: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (whole minor units to post, remainder to carry) of a day, per account. The
+    residuals are in ``1 / (RATE_SCALE * day_count)`` minor units.
+    """
+    return np.divmod(
+        daily_interest(principal, schedule) + residual, RATE_SCALE * day_count
+    )
+
+
+def accrue_accounts(
+    codes: np.ndarray,
+    balances: np.ndarray,
+    residuals: np.ndarray,
+    schedules: dict[InterestProduct, TierSchedule],
+    day_count: int,
+) -> tuple[np.ndarray, np.ndarray, dict[str, int]]:
+    """
+    A day of interest on mixed savings and loan accounts, ``codes`` telling them
+    apart. Returns the amounts, the residuals to carry and each product's total,
+    residuals in ``1 / (RATE_SCALE * day_count)`` minor units.
+    """
+    amounts = np.zeros(len(codes), dtype=np.int64)
+    carried = residuals.copy()
+    totals = {}
+    for product, schedule in schedules.items():
+        accruing = codes == product.code
+        principal = np.maximum(product.balance_sign * balances[accruing], 0)
+        amounts[accruing], carried[accruing] = accrue(
+            principal=principal,
+            residual=residuals[accruing],
+            schedule=schedule,
+            day_count=day_count,
+        )
+        totals[product.code] = int(amounts[accruing].sum())
+    return amounts, carried, totals
+
+
+def accrual_reference(product: InterestProduct, accrual_date: date) -> str:
+    """One journal per product and day, a rerun of the day is a duplicate."""
+    return f"interest-accrual:{product.code}:{accrual_date.isoformat()}"
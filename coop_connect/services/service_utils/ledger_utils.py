@@ -0,0 +1,74 @@
+"""
+Chart of accounts from ledger_arch.csv at the repository root.
+
+GL rows are seeded once per cooperative; ``MEMBER_ID.<code>`` rows are the
+templates of every member's subsidiary accounts, stored with the member_id set
+and ``<code>`` as their code.
+"""
+
+import csv
+from functools import lru_cache
+from pathlib import Path
+
+from coop_connect.root.coop_enums import Ledger
+
+CHART_OF_ACCOUNTS = Path(__file__).resolve().parents[3] / "ledger_arch.csv"
+MEMBER_CODE_PREFIX = "MEMBER_ID."
+
+# GL codes the finance flows post to
+CASH_ON_HAND = "1000"
+BANK_OPERATING = "1010"
+LOANS_RECEIVABLE = "1200"
+INTEREST_RECEIVABLE_LOANS = "1210"
+MEMBER_SAVINGS = "2000"
+INTEREST_PAYABLE_SAVINGS = "2010"
+INTEREST_INCOME_LOANS = "4000"
+INTEREST_EXPENSE_SAVINGS = "5000"
+
+# every deposit moves these, their balance is striped over several rows
+HOT_ACCOUNTS = (BANK_OPERATING, MEMBER_SAVINGS)
+
+# member subsidiary codes
+SAVINGS = "savings"
+SHARE_CAPITAL = "share_capital"
+LOAN_PRINCIPAL = "loan_principal"
+LOAN_INTEREST = "loan_interest"
+FEES = "fees"
+
+
+@lru_cache(maxsize=None)
+def chart_of_accounts() -> tuple[dict, ...]:
+    """Every account row of the chart, member codes without their MEMBER_ID. prefix."""
+    accounts = []
+    with CHART_OF_ACCOUNTS.open(newline="") as file:
+        for row in csv.DictReader(file):
+            if not row.get("account_code"):
+                continue
+            # descriptions aren't quoted, a comma in one spills into extra fields
+            description = ",".join([row["description"], *row.get(None, [])])
+            accounts.append(
+                {
+                    "ledger": Ledger(row["ledger_id"]),
+                    "code": row["account_code"].removeprefix(MEMBER_CODE_PREFIX),
+                    "name": row["account_name"],
+                    "account_type": row["account_type"],
+                    "description": description.strip(),
+                }
+            )
+    return tuple(accounts)
+
+
+def gl_accounts() -> tuple[dict, ...]:
+    return tuple(
+        account
+        for account in chart_of_accounts()
+        if account["ledger"] == Ledger.COOPERATIVE_GL
+    )
+
+
+def member_accounts() -> tuple[dict, ...]:
+    return tuple(
+        account
+        for account in chart_of_accounts()
+        if account["ledger"] == Ledger.MEMBERS_SUBSIDIARY
+    )
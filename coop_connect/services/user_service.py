@@ -8,7 +8,9 @@ from fastapi import HTTPException
 import coop_connect.database.db_handlers.user_db_handler as user_db_handler
 import coop_connect.root.dependencies as dep
 import coop_connect.schemas.user_schemas as schemas
+import coop_connect.services.cooperative_service as cooperative_service
 import coop_connect.services.service_utils.auth_utils as auth_utils
+import coop_connect.services.service_utils.cache_utils as cache_utils
 import coop_connect.services.service_utils.token_utils as toks_utils
 from coop_connect.root.connect_exception import (
     ConnectAuthException,
@@ -35,8 +37,12 @@ async def get_user_via_unique(email: str = None, phone_number: str = None):
 
 
 async def get_user(id: UUID):
+    cached_user = cache_utils.get_cached_user(user_id=id)
+    if cached_user is not None:
+        return cached_user
+
     try:
-        return await user_db_handler.get(user_id=id)
+        return cache_utils.cache_user(user=await user_db_handler.get(user_id=id))
     except NotFound as e:
         LOGGER.exception(e)
         LOGGER.error("user not found")
@@ -201,7 +207,7 @@ async def onboard_user(user_onboard: schemas.UserOnboard):
 # create record
 async def sign_up(user_in: schemas.User):
 
-    user_in.password = auth_utils.hash_password(plain_password=user_in.password)
+    user_in.password = await auth_utils.hash_password(plain_password=user_in.password)
 
     user_profile = await user_db_handler.create_user(user=user_in)
     user_profile_dict = {"id": str(user_profile.id)}
@@ -225,14 +231,29 @@ async def login(
         )
     try:
         user_profile = await get_user_via_unique(email=email, phone_number=phone_number)  # type: ignore
-        if not auth_utils.verify_password(
+        is_valid, new_password_hash = await auth_utils.verify_and_update_password(
             hashed_password=user_profile.password, plain_password=password
-        ):
+        )
+        if not is_valid:
             raise ConnectAuthException(message="email or password is incorrect")
 
+        if new_password_hash is not None:
+            # stored hash uses an outdated bcrypt cost factor
+            await user_db_handler.update_user_password(
+                user_id=user_profile.id, password=new_password_hash
+            )
+
         payload_dict = {"id": str(user_profile.id)}
+        coop_roles = None
+        if dep.settings.coop_role_claims_enabled:
+            coop_roles = await cooperative_service.get_coop_role_claims(
+                user_id=user_profile.id
+            )
+
         access_token, refresh_token = dep.create_access_token(
-            data=payload_dict
+            data=dict(payload_dict),
+            coop_roles=coop_roles,
+            coop_role_version=user_profile.coop_role_version,
         ), dep.create_refresh_token(data=payload_dict)
 
         return schemas.UserAccessToken(
@@ -283,12 +304,11 @@ async def reset_password(code: int, new_password: str) -> user_db_handler.User_D
             email=mfa_token_read.email, phone_number=mfa_token_read.phone_number
         )
 
-        new_password = auth_utils.hash_password(plain_password=new_password)
-        updated_user_profile = await user_update(
-            admin_update=schemas.UserUpdate(password=new_password),
-            admin_user_uid=user_profile.id,
+        new_password = await auth_utils.hash_password(plain_password=new_password)
+        await user_db_handler.update_user_password(
+            user_id=user_profile.id, password=new_password
         )
-        return updated_user_profile
+        return await get_user(id=user_profile.id)
     except NotFound:
         LOGGER.error(f"forgot password token: {code} not valid")
         raise ConnectNotFoundException(
@@ -1,7 +1,7 @@
 from logging.config import fileConfig
 
 from alembic import context
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import engine_from_config, pool, text
 
 from coop_connect.root.api_router import router  # noqa: F401
 from coop_connect.root.settings import Settings
@@ -29,6 +29,10 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = AbstractBase.metadata
 
+# postgres extensions the models depend on, created before any migration runs
+# pg_trgm: gin_trgm_ops search indexes (coop_connect/root/utils/search.py)
+EXTENSIONS = ("pg_trgm",)
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -56,6 +60,8 @@ def run_migrations_offline() -> None:
     )
 
     with context.begin_transaction():
+        for extension in EXTENSIONS:
+            context.execute(f"CREATE EXTENSION IF NOT EXISTS {extension}")
         context.run_migrations()
 
 
@@ -73,6 +79,10 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        for extension in EXTENSIONS:
+            connection.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
+        connection.commit()
+
         context.configure(connection=connection, target_metadata=target_metadata)
 
         with context.begin_transaction():
@@ -0,0 +1,37 @@
+"""
+Per-request cost of verify_access_token with and without the verified-token cache.
+
+    python -m tests.benchmarks.bench_auth_token
+"""
+
+import asyncio
+import time
+from uuid import uuid4
+
+import coop_connect.services.service_utils.cache_utils as cache_utils
+from coop_connect.root.dependencies import create_access_token, verify_access_token
+
+ROUNDS = 5_000
+
+
+async def _time_per_call(token: str, clear_cache: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        if clear_cache:
+            cache_utils.verified_token_cache.clear()
+        await verify_access_token(token=token)
+    return (time.perf_counter() - start) / ROUNDS * 1_000_000
+
+
+async def main():
+    token = create_access_token(data={"id": str(uuid4())})
+
+    uncached = await _time_per_call(token=token, clear_cache=True)
+    cached = await _time_per_call(token=token, clear_cache=False)
+
+    print(f"verify_access_token uncached: {uncached:8.1f} us/request")
+    print(f"verify_access_token cached:   {cached:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
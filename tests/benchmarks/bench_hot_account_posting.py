@@ -0,0 +1,113 @@
+"""
+Hot-account contention: WRITERS concurrent writers each post DEPOSITS single-deposit
+journals (Dr 1010 Bank - Operating, Cr 2000 Member Savings), the way deposits
+arrive one by one, once with the two GL balances on a single row each and once
+striped over STRIPES rows.
+
+Writes to the database in POSTGRES_URL, so point it at a throwaway database (the
+tables are created if missing). The pool must hold a connection per writer:
+
+    DB_POOL_SIZE=64 python -m tests.benchmarks.bench_hot_account_posting
+"""
+
+import asyncio
+import time
+from uuid import uuid4
+
+from sqlalchemy import update
+
+import coop_connect.database.db_handlers.finance_db_handler as finance_db_handler
+import coop_connect.schemas.finance_schemas as schemas
+from coop_connect.database.orms.ledger_orm import LedgerAccount
+from coop_connect.root.app import app  # noqa: F401, registers every ORM
+from coop_connect.root.database import async_session, engine
+from coop_connect.root.settings import Settings
+from coop_connect.services.service_utils import ledger_utils
+from tests.benchmarks.bench_ledger_posting import _seed
+
+settings = Settings()
+
+WRITERS = 64
+DEPOSITS = 100
+STRIPES = 16
+
+
+async def _set_stripes(cooperative_id, stripes: int):
+    async with async_session() as session:
+        await session.execute(
+            update(LedgerAccount)
+            .where(
+                LedgerAccount.cooperative_id == cooperative_id,
+                LedgerAccount.member_id.is_(None),
+                LedgerAccount.code.in_(ledger_utils.HOT_ACCOUNTS),
+            )
+            .values(balance_stripes=stripes)
+        )
+        await session.commit()
+
+
+async def _writer(cooperative_id, bank_id, savings_id):
+    for _ in range(DEPOSITS):
+        await finance_db_handler.post_journals(
+            cooperative_id=cooperative_id,
+            entries=[
+                schemas.JournalEntry(
+                    reference=str(uuid4()),
+                    description="deposit",
+                    legs=[
+                        schemas.PostingLeg(account_id=bank_id, amount=50_000),
+                        schemas.PostingLeg(account_id=savings_id, amount=-50_000),
+                    ],
+                )
+            ],
+        )
+
+
+async def _run(cooperative_id, accounts: dict, stripes: int) -> float:
+    await _set_stripes(cooperative_id=cooperative_id, stripes=stripes)
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[
+            _writer(
+                cooperative_id=cooperative_id,
+                bank_id=accounts[ledger_utils.BANK_OPERATING],
+                savings_id=accounts[ledger_utils.MEMBER_SAVINGS],
+            )
+            for _ in range(WRITERS)
+        ]
+    )
+    return time.perf_counter() - start
+
+
+async def main():
+    if settings.db_pool_size + settings.db_max_overflow < WRITERS:
+        print(f"the pool holds fewer than {WRITERS} connections, set DB_POOL_SIZE")
+
+    cooperative = await _seed()
+    accounts = {
+        account.code: account.id
+        for account in await finance_db_handler.get_ledger_accounts(
+            cooperative_id=cooperative.id, codes=list(ledger_utils.HOT_ACCOUNTS)
+        )
+    }
+    journals = WRITERS * DEPOSITS
+    for stripes in (1, STRIPES):
+        elapsed = await _run(
+            cooperative_id=cooperative.id, accounts=accounts, stripes=stripes
+        )
+        print(
+            f"{stripes:>2} stripe(s): {journals:,} deposits by {WRITERS} writers in "
+            f"{elapsed:.1f} s, {journals / elapsed:,.0f} journals/s"
+        )
+
+    # striped or not, the balance reads back whole
+    balances = await finance_db_handler.get_ledger_balances(
+        cooperative_id=cooperative.id, codes=list(ledger_utils.HOT_ACCOUNTS)
+    )
+    print(", ".join(f"{balance.code}: {balance.balance:,}" for balance in balances))
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Daily interest accrual over ACCOUNTS member accounts, half savings and half loans,
+from the rows get_interest_accrual_inputs returns to the loan journal's batch
+parameters, its 1210 leg itemised per member, and the amounts and residuals
+record_interest_accruals writes: the in-process part of
+finance_service.accrue_interest. Loading and writing are logged by accrue_interest
+itself.
+
+    python -m tests.benchmarks.bench_interest_accrual
+"""
+
+import random
+import time
+from uuid import uuid4
+
+import numpy as np
+
+import coop_connect.database.db_handlers.finance_db_handler as finance_db_handler
+from coop_connect.schemas.finance_schemas import JournalEntry, LegDetail, PostingLeg
+from coop_connect.services.service_utils import interest_utils
+
+ACCOUNTS = 1_000_000
+DAY_COUNT = 365
+SCHEDULES = {
+    interest_utils.SAVINGS_INTEREST: interest_utils.tier_schedule(
+        [(0, 0.04), (10_000_000, 0.06), (100_000_000, 0.08)]
+    ),
+    interest_utils.LOAN_INTEREST: interest_utils.tier_schedule([(0, 0.18)]),
+}
+
+
+def _rows() -> list[tuple]:
+    rng = random.Random(25)
+    rows = []
+    for index in range(ACCOUNTS):
+        if index % 2:
+            code, balance = interest_utils.SAVINGS_INTEREST.code, -rng.randrange(10**9)
+        else:
+            code, balance = interest_utils.LOAN_INTEREST.code, rng.randrange(10**9)
+        residual = rng.randrange(interest_utils.RATE_SCALE * DAY_COUNT)
+        rows.append((uuid4(), code, residual, uuid4(), balance))
+    return rows
+
+
+def main():
+    rows = _rows()
+
+    start = time.perf_counter()
+    account_ids, codes, residuals, detail_account_ids, balances = zip(*rows)
+    codes = np.array(codes)
+    residuals = np.array(residuals, dtype=np.int64)
+    balances = np.array(balances, dtype=np.int64)
+    loaded = time.perf_counter()
+
+    amounts, carried, totals = interest_utils.accrue_accounts(
+        codes=codes,
+        balances=balances,
+        residuals=residuals,
+        schedules=SCHEDULES,
+        day_count=DAY_COUNT,
+    )
+    computed = time.perf_counter()
+
+    indexes = np.flatnonzero(
+        (codes == interest_utils.LOAN_INTEREST.code) & (amounts > 0)
+    )
+    total = totals[interest_utils.LOAN_INTEREST.code]
+    receivable = uuid4()
+    loan_journal = JournalEntry(
+        reference="bench",
+        legs=[
+            PostingLeg(account_id=receivable, amount=total),
+            PostingLeg(account_id=uuid4(), amount=-total),
+        ],
+        detail=LegDetail.model_construct(
+            control_account_id=receivable,
+            account_ids=[detail_account_ids[index] for index in indexes],
+            amounts=amounts[indexes].tolist(),
+        ),
+    )
+    journal_parameters, _ = finance_db_handler._journal_batch_params(
+        cooperative_id=uuid4(), entries=[loan_journal]
+    )
+    legged = time.perf_counter()
+
+    indexes = np.flatnonzero((amounts > 0) | (carried != residuals))
+    parameters = (
+        [account_ids[index] for index in indexes],
+        amounts[indexes].tolist(),
+        carried[indexes].tolist(),
+    )
+    prepared = time.perf_counter()
+
+    print(f"{ACCOUNTS:,} accounts, totals {totals}")
+    print(f"rows to arrays   {(loaded - start) * 1000:8.1f} ms")
+    print(f"accrual          {(computed - loaded) * 1000:8.1f} ms")
+    print(
+        f"loan journal     {(legged - computed) * 1000:8.1f} ms "
+        f"({len(journal_parameters['account_ids']):,} postings)"
+    )
+    print(
+        f"write parameters {(prepared - legged) * 1000:8.1f} ms ({len(parameters[0]):,} rows)"
+    )
+    print(f"total            {(prepared - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Journal posting throughput: WORKERS concurrent writers, each posting BATCHES batches
+of BATCH_SIZE two-leg deposits (Dr 1010 Bank - Operating, Cr 2000 Member Savings).
+
+Writes to the database in POSTGRES_URL, so point it at a throwaway database (the
+tables are created if missing):
+
+    python -m tests.benchmarks.bench_ledger_posting
+"""
+
+import asyncio
+import time
+from uuid import uuid4
+
+from sqlalchemy import select, text
+
+import coop_connect.database.db_handlers.finance_db_handler as finance_db_handler
+import coop_connect.schemas.finance_schemas as schemas
+from coop_connect.database.orms.cooperative_orm import Cooperative
+from coop_connect.root.app import app  # noqa: F401, registers every ORM
+from coop_connect.root.database import async_session, engine
+from coop_connect.root.utils.abstract_base import AbstractBase
+from coop_connect.services.service_utils import ledger_utils
+
+WORKERS = 8
+BATCHES = 20
+BATCH_SIZE = 500
+
+
+async def _seed() -> Cooperative:
+    async with engine.begin() as connection:
+        await connection.run_sync(AbstractBase.metadata.create_all)
+
+    async with async_session() as session:
+        cooperative = (
+            await session.execute(select(Cooperative).filter_by(acronym="LEDGER"))
+        ).scalar_one_or_none()
+        if cooperative is None:
+            creator_id, coop_id = uuid4(), uuid4()
+            await session.execute(
+                text(
+                    """INSERT INTO "user" (id, first_name, last_name, password, user_type,
+                                           coop_role_version)
+                       VALUES (:id, 'Ledger', 'Owner', 'x', 'Member', 0)"""
+                ),
+                {"id": creator_id},
+            )
+            await session.execute(
+                text(
+                    """INSERT INTO cooperative (id, coop_id, name, acronym, status, created_by)
+                       VALUES (:id, 'COOP-LEDGER', 'Ledger Cooperative', 'LEDGER', 'Active',
+                               :creator_id)"""
+                ),
+                {"id": coop_id, "creator_id": creator_id},
+            )
+            await session.commit()
+            cooperative = await session.get(Cooperative, coop_id)
+
+    await finance_db_handler.create_gl_accounts(cooperative_id=cooperative.id)
+    return cooperative
+
+
+def _batch(bank_id, savings_id) -> list[schemas.JournalEntry]:
+    return [
+        schemas.JournalEntry(
+            reference=str(uuid4()),
+            description="deposit",
+            legs=[
+                schemas.PostingLeg(account_id=bank_id, amount=50_000),
+                schemas.PostingLeg(account_id=savings_id, amount=-50_000),
+            ],
+        )
+        for _ in range(BATCH_SIZE)
+    ]
+
+
+async def _writer(cooperative_id, batches: list[list[schemas.JournalEntry]]):
+    for entries in batches:
+        await finance_db_handler.post_journals(
+            cooperative_id=cooperative_id, entries=entries
+        )
+
+
+async def main():
+    cooperative = await _seed()
+    accounts = {
+        account.code: account.id
+        for account in await finance_db_handler.get_ledger_accounts(
+            cooperative_id=cooperative.id,
+            codes=[ledger_utils.BANK_OPERATING, ledger_utils.MEMBER_SAVINGS],
+        )
+    }
+    # built up front, the benchmark times the database round trips only
+    work = [
+        [
+            _batch(
+                bank_id=accounts[ledger_utils.BANK_OPERATING],
+                savings_id=accounts[ledger_utils.MEMBER_SAVINGS],
+            )
+            for _ in range(BATCHES)
+        ]
+        for _ in range(WORKERS)
+    ]
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[_writer(cooperative_id=cooperative.id, batches=batches) for batches in work]
+    )
+    elapsed = time.perf_counter() - start
+
+    journals = WORKERS * BATCHES * BATCH_SIZE
+    print(f"{journals:,} journals ({journals * 2:,} postings) in {elapsed:.1f} s")
+    print(
+        f"{journals / elapsed:,.0f} journals/s, {journals * 2 / elapsed:,.0f} postings/s"
+    )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""
+CPU cost of mapping one members-list page (GET /coop/{coop_id}/members) to JSON.
+
+    python -m tests.benchmarks.bench_member_listing
+
+"validated" is the as_dict + schema(**row) path, followed by FastAPI's response_model
+re-validation and JSONResponse rendering; "projected" is projection rows + construct +
+TrustedJSONResponse. Database time is the same for both and is not measured.
+"""
+
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+import coop_connect.schemas.cooperative_schemas as schemas
+from coop_connect.database.orms.cooperative_orm import Member
+from coop_connect.root.app import app  # noqa: F401, registers every ORM
+from coop_connect.root.utils.projection import (
+    TrustedJSONResponse,
+    construct,
+    projection,
+)
+
+PAGE_SIZE = 20
+ROUNDS = 500
+RESPONSE_ADAPTER = TypeAdapter(schemas.PaginatedMembersResponse)
+CONTACT = {"name": "Ada Obi", "phone_number": "08030000000", "email": "ada@example.com"}
+
+
+def _member() -> Member:
+    return Member(
+        id=uuid4(),
+        user_id=uuid4(),
+        user_bio=uuid4(),
+        cooperative_id=uuid4(),
+        membership_id="THEO-2025-1",
+        role="Member",
+        status="Active",
+        membership_type="Regular",
+        emergency_contact=[CONTACT],
+        guarantors=[CONTACT, CONTACT],
+        referal_code="2025-1-abcdef",
+        shares_owned=1,
+        total_deposits=25_000,
+        credit_score=0,
+        date_created_utc=datetime.utcnow(),
+        meta={},
+    )
+
+
+def _validated(members: list[Member]) -> bytes:
+    page = schemas.PaginatedMembersResponse(
+        result_set=[
+            schemas.MembershipSummary(**member.as_dict()) for member in members
+        ],
+        page_size=len(members),
+        total_count=1_000,
+        page=1,
+    )
+    # what FastAPI does with a returned model and response_model
+    content = RESPONSE_ADAPTER.dump_python(
+        RESPONSE_ADAPTER.validate_python(page, from_attributes=True), mode="json"
+    )
+    return JSONResponse(content=content).body
+
+
+def _projected(rows: list[dict]) -> bytes:
+    page = schemas.PaginatedMembersResponse.model_construct(
+        result_set=[construct(schemas.MembershipSummary, row) for row in rows],
+        page_size=len(rows),
+        total_count=1_000,
+        page=1,
+    )
+    return TrustedJSONResponse(content=page).body
+
+
+def _time_per_page(func, page) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(page)
+    return (time.perf_counter() - start) / ROUNDS * 1_000_000
+
+
+def main():
+    members = [_member() for _ in range(PAGE_SIZE)]
+    columns = [column.key for column in projection(Member, schemas.MembershipSummary)]
+    rows = [{key: getattr(member, key) for key in columns} for member in members]
+
+    validated = _time_per_page(_validated, members)
+    projected = _time_per_page(_projected, rows)
+
+    print(f"members page of {PAGE_SIZE}, validated: {validated:8.1f} us")
+    print(f"members page of {PAGE_SIZE}, projected: {projected:8.1f} us")
+    print(f"saving: {1 - projected / validated:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Member search latency on a synthetic cooperative, with and without the trigram indexes.
+
+Seeds MEMBERS members into the database in POSTGRES_URL, so point it at a throwaway
+database (the tables are created if missing, pg_trgm must be installable):
+
+    python -m tests.benchmarks.bench_member_search
+"""
+
+import asyncio
+import time
+from uuid import uuid4
+
+from sqlalchemy import func, select, text
+
+import coop_connect.database.db_handlers.cooperative_db_handler as cooperative_db_handler
+from coop_connect.database.orms.cooperative_orm import Cooperative, Member
+from coop_connect.root.app import app  # noqa: F401, registers every ORM
+from coop_connect.root.coop_enums import CountMode
+from coop_connect.root.database import async_session, engine
+from coop_connect.root.utils.abstract_base import AbstractBase
+
+MEMBERS = 1_000_000
+ROUNDS = 20
+SEARCHES = ("ada", "okonkwo", "ngozi eze", "BENC-2025-4242", "0803", "chukwuemka")
+TRIGRAM_INDEXES = (
+    ("user", "ix_user_first_name_trgm", "first_name"),
+    ("user", "ix_user_last_name_trgm", "last_name"),
+    ("user", "ix_user_phone_number_trgm", "phone_number"),
+    ("member", "ix_member_membership_id_trgm", "membership_id"),
+)
+
+SEED_SQL = (
+    """
+    INSERT INTO "user" (id, first_name, last_name, phone_number, password, user_type,
+                        coop_role_version, date_created_utc)
+    SELECT gen_random_uuid(),
+           (ARRAY['Ada','Ngozi','Chukwuemeka','Bola','Tunde','Aisha','Ifeoma','Musa'])[1 + i % 8]
+               || (i % 997)::text,
+           (ARRAY['Okonkwo','Eze','Adeyemi','Bello','Obi','Nwosu','Lawal','Okafor'])[1 + (i / 8) % 8],
+           '0803' || lpad(i::text, 7, '0'), 'x', 'Member', 0,
+           now() - (i || ' seconds')::interval
+    FROM generate_series(1, :members) AS i
+    """,
+    """
+    INSERT INTO user_bio (id, user_id, signature, date_created_utc)
+    SELECT gen_random_uuid(), u.id, :file_id, u.date_created_utc FROM "user" u
+    WHERE u.phone_number LIKE '0803%'
+    """,
+    """
+    INSERT INTO member (id, user_id, user_bio, cooperative_id, membership_id, role, status,
+                        membership_type, shares_owned, total_deposits, credit_score,
+                        date_created_utc)
+    SELECT gen_random_uuid(), b.user_id, b.id, :coop_id,
+           'BENC-2025-' || row_number() OVER (ORDER BY b.date_created_utc),
+           'Member', 'Active', 'Regular', 0, 0, 0, b.date_created_utc
+    FROM user_bio b
+    """,
+)
+
+
+async def _seed() -> Cooperative:
+    async with engine.begin() as connection:
+        await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await connection.run_sync(AbstractBase.metadata.create_all)
+
+    async with async_session() as session:
+        cooperative = (
+            await session.execute(select(Cooperative).filter_by(acronym="BENCH"))
+        ).scalar_one_or_none()
+        if cooperative is not None:
+            return cooperative
+
+        creator_id, file_id, coop_id = uuid4(), uuid4(), uuid4()
+        await session.execute(
+            text("""INSERT INTO "user" (id, first_name, last_name, password, user_type,
+                                       coop_role_version)
+                   VALUES (:id, 'Bench', 'Owner', 'x', 'Member', 0)"""),
+            {"id": creator_id},
+        )
+        await session.execute(
+            text("""INSERT INTO file (id, file_name, purpose, link, link_expiration)
+                   VALUES (:id, 'signature', 'Signature', 'bench', now())"""),
+            {"id": file_id},
+        )
+        await session.execute(
+            text(
+                """INSERT INTO cooperative (id, coop_id, name, acronym, status, created_by)
+                   VALUES (:id, 'COOP-BENCH', 'Bench Cooperative', 'BENCH', 'Active',
+                           :creator_id)"""
+            ),
+            {"id": coop_id, "creator_id": creator_id},
+        )
+        print(f"seeding {MEMBERS:,} members...")
+        for statement in SEED_SQL:
+            await session.execute(
+                text(statement),
+                {"members": MEMBERS, "file_id": file_id, "coop_id": coop_id},
+            )
+        await session.commit()
+        await session.execute(text('ANALYZE "user", user_bio, member'))
+        await session.commit()
+        return await session.get(Cooperative, coop_id)
+
+
+async def _time_searches(cooperative_id) -> dict[str, float]:
+    timings = {}
+    for search in SEARCHES:
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            await cooperative_db_handler.get_all_members(
+                id=cooperative_id,
+                search=search,
+                limit=20,
+                count_mode=CountMode.ESTIMATED,
+            )
+        timings[search] = (time.perf_counter() - start) / ROUNDS * 1_000
+    return timings
+
+
+async def main():
+    cooperative = await _seed()
+    async with async_session() as session:
+        members = (
+            await session.execute(
+                select(func.count())
+                .select_from(Member)
+                .filter(Member.cooperative_id == cooperative.id)
+            )
+        ).scalar_one()
+    print(f"{members:,} members in {cooperative.name}")
+
+    indexed = await _time_searches(cooperative_id=cooperative.id)
+
+    async with engine.begin() as connection:
+        for _, index, _ in TRIGRAM_INDEXES:
+            await connection.execute(text(f"DROP INDEX IF EXISTS {index}"))
+    try:
+        unindexed = await _time_searches(cooperative_id=cooperative.id)
+    finally:
+        async with engine.begin() as connection:
+            for table, index, column in TRIGRAM_INDEXES:
+                await connection.execute(
+                    text(
+                        f'CREATE INDEX IF NOT EXISTS {index} ON "{table}" '
+                        f"USING gin ({column} gin_trgm_ops)"
+                    )
+                )
+
+    print(f"{'search':<20}{'trigram (ms)':>14}{'no trigram (ms)':>18}")
+    for search in SEARCHES:
+        print(f"{search:<20}{indexed[search]:>14.1f}{unindexed[search]:>18.1f}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+"""
+/coop routes through the app with the signed-in user and the service stubbed,
+covering serialization of what the handlers return; no database needed.
+"""
+
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+import coop_connect.services.cooperative_service as cooperative_service
+from coop_connect.root.app import app
+from coop_connect.root.coop_enums import UserType
+from coop_connect.root.dependencies import get_current_user
+from coop_connect.schemas.cooperative_schemas import CooperativeSummary
+from coop_connect.schemas.user_schemas import UserProfile
+
+
+async def _coop_admin(request: Request):
+    request.state.user = UserProfile.model_construct(
+        id=uuid4(), user_type=UserType.COOP_ADMIN
+    )
+    return request.state.user
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_user] = _coop_admin
+    yield TestClient(app=app)
+    app.dependency_overrides.pop(get_current_user)
+
+
+def test_get_cooperatives_via_acronym(client, monkeypatch):
+    # constructed the way the handler's projection builds them
+    cooperative = CooperativeSummary.model_construct(
+        id=uuid4(),
+        coop_id="COOP-ABC",
+        name="Abc Cooperative",
+        acronym="ABC",
+        status="Active",
+        public_listing=True,
+        date_created_utc=datetime(2026, 1, 31),
+    )
+
+    async def get_cooperatives_via_acronym(acronym, fields=None):
+        return [cooperative]
+
+    monkeypatch.setattr(
+        cooperative_service,
+        "get_cooperatives_via_acronym",
+        get_cooperatives_via_acronym,
+    )
+
+    response = client.get("/coop/", params={"acronym": "ABC"})
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "id": str(cooperative.id),
+            "coop_id": "COOP-ABC",
+            "name": "Abc Cooperative",
+            "acronym": "ABC",
+            "status": "Active",
+            "public_listing": True,
+            "date_created_utc": "2026-01-31T00:00:00",
+        }
+    ]
@@ -0,0 +1,522 @@
+"""
+Ledger posting against a local Postgres: journal batches, duplicate references,
+foreign accounts, the subsidiary accounts opened on member approval, running and
+as-of balances and their checkpoints, daily interest accrual.
+
+POSTGRES_URL must point at a throwaway database, the tables are (re)created in it:
+
+    LEDGER_CHECK=1 python -m pytest tests/integration_tests/test_ledger.py
+"""
+
+import asyncio
+import os
+from datetime import date, datetime, time, timedelta
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import func, select, text
+
+from coop_connect.root.coop_enums import MembershipStatus
+from coop_connect.schemas.finance_schemas import JournalEntry, LegDetail
+
+requires_postgres = pytest.mark.skipif(
+    not os.environ.get("LEDGER_CHECK"),
+    reason="needs a local Postgres in POSTGRES_URL, set LEDGER_CHECK=1",
+)
+
+if os.environ.get("LEDGER_CHECK"):
+    import coop_connect.database.db_handlers.finance_db_handler as finance_db_handler
+    import coop_connect.services.cooperative_service as cooperative_service
+    import coop_connect.services.finance_service as finance_service
+    from coop_connect.database.orms.cooperative_orm import Cooperative, Member
+    from coop_connect.database.orms.ledger_orm import (
+        LedgerAccount,
+        LedgerBalanceCheckpoint,
+        LedgerJournal,
+        LedgerPosting,
+    )
+    from coop_connect.database.orms.misc_orm import File
+    from coop_connect.database.orms.user_orm import User, UserBio
+    from coop_connect.root.app import app  # noqa: F401, registers every ORM
+    from coop_connect.root.connect_exception import ConnectBadRequestException
+    from coop_connect.root.database import async_session, engine, unit_of_work
+    from coop_connect.root.utils.abstract_base import AbstractBase
+    from coop_connect.schemas.cooperative_schemas import MembershipUpdate
+    from coop_connect.services.service_utils import ledger_utils
+
+
+async def _create_tables():
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await connection.run_sync(AbstractBase.metadata.drop_all)
+            await connection.run_sync(AbstractBase.metadata.create_all)
+    finally:
+        await engine.dispose()
+
+
+async def _new_cooperative(status: str = MembershipStatus.ACTIVE):
+    """A cooperative with its GL accounts and one member, returns their ids."""
+    suffix = uuid4().hex[:6].upper()
+    user = User(
+        id=uuid4(),
+        first_name="Ada",
+        last_name="Obi",
+        email=f"{uuid4()}@example.com",
+        password="x",
+        user_type="Cooperative Member",
+    )
+    signature = File(
+        id=uuid4(), file_name="signature.png", purpose="Signature", link="x"
+    )
+    bio = UserBio(id=uuid4(), user_id=user.id, signature=signature.id)
+    cooperative = Cooperative(
+        id=uuid4(),
+        coop_id=f"COOP-{suffix}",
+        name=f"Ledger Cooperative {suffix}",
+        acronym=suffix,
+        status="Active",
+        created_by=user.id,
+        onboarding_requirements=[],
+    )
+    member = Member(
+        id=uuid4(),
+        user_id=user.id,
+        user_bio=bio.id,
+        cooperative_id=cooperative.id,
+        role="Member",
+        status=status,
+        membership_type="Regular",
+        emergency_contact=[],
+        guarantors=[],
+    )
+    async with async_session() as session:
+        for row in (user, signature, bio, cooperative, member):
+            session.add(row)
+            await session.flush()
+        await session.commit()
+
+    await finance_db_handler.create_gl_accounts(cooperative_id=cooperative.id)
+    if status == MembershipStatus.ACTIVE:
+        await finance_db_handler.create_member_accounts(
+            cooperative_id=cooperative.id, member_ids=[member.id]
+        )
+    return cooperative.id, member.id
+
+
+async def _gl_account_ids(cooperative_id) -> dict:
+    accounts = await finance_service.get_ledger_accounts(cooperative_id=cooperative_id)
+    return {code: account.id for (_, code), account in accounts.items()}
+
+
+def _deposit(reference: str, bank_id, savings_id, amount: int = 500, **kwargs):
+    """Dr Bank - Operating, Cr Member Savings."""
+    return JournalEntry(
+        reference=reference,
+        legs=[
+            {"account_id": bank_id, "amount": amount},
+            {"account_id": savings_id, "amount": -amount},
+        ],
+        **kwargs,
+    )
+
+
+async def _posting_count(references: list[str]) -> int:
+    async with async_session() as session:
+        return (
+            await session.execute(
+                select(func.count())
+                .select_from(LedgerPosting)
+                .join(LedgerJournal, LedgerJournal.id == LedgerPosting.journal_id)
+                .where(LedgerJournal.reference.in_(references))
+            )
+        ).scalar_one()
+
+
+async def _run(coroutine):
+    try:
+        return await coroutine
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def tables():
+    asyncio.run(_create_tables())
+
+
+def test_unbalanced_entry_is_rejected():
+    with pytest.raises(ValidationError, match="debits and credits differ"):
+        JournalEntry(
+            reference="unbalanced",
+            legs=[
+                {"account_id": uuid4(), "amount": 500},
+                {"account_id": uuid4(), "amount": -400},
+            ],
+        )
+    with pytest.raises(ValidationError, match="zero amount leg"):
+        JournalEntry(
+            reference="zero",
+            legs=[
+                {"account_id": uuid4(), "amount": 0},
+                {"account_id": uuid4(), "amount": 0},
+            ],
+        )
+
+
+def test_detail_must_itemise_its_control_leg():
+    control, income = uuid4(), uuid4()
+
+    def entry(amounts):
+        return JournalEntry(
+            reference="detailed",
+            legs=[
+                {"account_id": control, "amount": 5},
+                {"account_id": income, "amount": -5},
+            ],
+            detail=LegDetail.model_construct(
+                control_account_id=control,
+                account_ids=[uuid4() for _ in amounts],
+                amounts=amounts,
+            ),
+        )
+
+    assert entry([2, 3]).detail.amounts == [2, 3]
+    for amounts in ([2, 2], [5, 0], []):
+        with pytest.raises(ValidationError, match="detail doesn't itemise"):
+            entry(amounts)
+
+
+@requires_postgres
+def test_duplicate_references_are_reported(tables):
+    async def post():
+        cooperative_id, _ = await _new_cooperative()
+        accounts = await _gl_account_ids(cooperative_id)
+        bank = accounts[ledger_utils.BANK_OPERATING]
+        savings = accounts[ledger_utils.MEMBER_SAVINGS]
+        first = await finance_service.post_journals(
+            cooperative_id=cooperative_id,
+            entries=[
+                _deposit("dup-1", bank, savings),
+                _deposit("dup-2", bank, savings),
+                _deposit("dup-1", bank, savings),
+            ],
+        )
+        second = await finance_service.post_journals(
+            cooperative_id=cooperative_id,
+            entries=[
+                _deposit("dup-2", bank, savings),
+                _deposit("dup-3", bank, savings),
+            ],
+        )
+        return first, second, await _posting_count(["dup-1", "dup-2", "dup-3"])
+
+    first, second, postings = asyncio.run(_run(post()))
+    assert first.posted == ["dup-1", "dup-2"]
+    assert first.duplicates == ["dup-1"]
+    assert second.posted == ["dup-3"]
+    assert second.duplicates == ["dup-2"]
+    assert postings == 6
+
+
+@requires_postgres
+def test_leg_on_a_foreign_account_rolls_back_the_batch(tables):
+    async def post():
+        cooperative_id, _ = await _new_cooperative()
+        other_cooperative_id, _ = await _new_cooperative()
+        accounts = await _gl_account_ids(cooperative_id)
+        foreign = await _gl_account_ids(other_cooperative_id)
+        bank = accounts[ledger_utils.BANK_OPERATING]
+        savings = accounts[ledger_utils.MEMBER_SAVINGS]
+        with pytest.raises(ConnectBadRequestException):
+            await finance_service.post_journals(
+                cooperative_id=cooperative_id,
+                entries=[
+                    _deposit("foreign-1", bank, savings),
+                    _deposit(
+                        "foreign-2", foreign[ledger_utils.BANK_OPERATING], savings
+                    ),
+                ],
+            )
+        balances = await finance_service.get_ledger_balances(
+            cooperative_id=cooperative_id
+        )
+        return (
+            await _posting_count(["foreign-1", "foreign-2"]),
+            [balance.balance for balance in balances],
+        )
+
+    postings, balances = asyncio.run(_run(post()))
+    assert postings == 0
+    assert not any(balances)
+
+
+@requires_postgres
+def test_single_approval_opens_member_accounts(tables):
+    async def approve():
+        cooperative_id, member_id = await _new_cooperative(
+            status=MembershipStatus.PENDING_APPROVAL
+        )
+        await cooperative_service.update_coop_membership(
+            cooperative_id=cooperative_id,
+            member_id=member_id,
+            member_update=MembershipUpdate(status=MembershipStatus.ACTIVE),
+        )
+        async with async_session() as session:
+            codes = (
+                await session.execute(
+                    select(LedgerAccount.code).where(
+                        LedgerAccount.member_id == member_id
+                    )
+                )
+            ).scalars()
+            return set(codes)
+
+    codes = asyncio.run(_run(approve()))
+    assert codes == {account["code"] for account in ledger_utils.member_accounts()}
+
+
+async def _bank_balance(cooperative_id, as_of=None) -> int:
+    (balance,) = await finance_service.get_ledger_balances(
+        cooperative_id=cooperative_id,
+        codes=[ledger_utils.BANK_OPERATING],
+        as_of=as_of,
+    )
+    return balance.balance
+
+
+async def _bank_checkpoints(cooperative_id) -> list[tuple]:
+    async with async_session() as session:
+        result = await session.execute(
+            select(LedgerBalanceCheckpoint.as_of, LedgerBalanceCheckpoint.balance)
+            .join(LedgerAccount, LedgerAccount.id == LedgerBalanceCheckpoint.account_id)
+            .where(
+                LedgerAccount.cooperative_id == cooperative_id,
+                LedgerAccount.member_id.is_(None),
+                LedgerAccount.code == ledger_utils.BANK_OPERATING,
+            )
+            .order_by(LedgerBalanceCheckpoint.as_of)
+        )
+        return result.tuples().all()
+
+
+async def _dated_deposits(cooperative_id, deposits: dict) -> dict:
+    """Posts ``{reference: (effective_at, amount)}``, returns the GL account ids."""
+    accounts = await _gl_account_ids(cooperative_id)
+    await finance_service.post_journals(
+        cooperative_id=cooperative_id,
+        entries=[
+            _deposit(
+                reference,
+                accounts[ledger_utils.BANK_OPERATING],
+                accounts[ledger_utils.MEMBER_SAVINGS],
+                amount=amount,
+                effective_at=effective_at,
+            )
+            for reference, (effective_at, amount) in deposits.items()
+        ],
+    )
+    return accounts
+
+
+TODAY = datetime.combine(date.today(), time())
+
+
+@requires_postgres
+def test_running_balance(tables):
+    async def post():
+        cooperative_id, _ = await _new_cooperative()
+        # single-entry batches, the way a striped hot account sees them
+        for amount in (500, 300, -200):
+            await _dated_deposits(
+                cooperative_id, {str(uuid4()): (datetime.utcnow(), amount)}
+            )
+        balances = await finance_service.get_ledger_balances(
+            cooperative_id=cooperative_id,
+            codes=[ledger_utils.BANK_OPERATING, ledger_utils.MEMBER_SAVINGS],
+        )
+        return {balance.code: balance.balance for balance in balances}
+
+    balances = asyncio.run(_run(post()))
+    assert balances == {
+        ledger_utils.BANK_OPERATING: 600,
+        ledger_utils.MEMBER_SAVINGS: -600,
+    }
+
+
+@requires_postgres
+def test_as_of_reads_across_a_checkpoint(tables):
+    checkpoint_at = TODAY - timedelta(days=2)
+
+    async def read():
+        cooperative_id, _ = await _new_cooperative()
+        await _dated_deposits(
+            cooperative_id,
+            {
+                "day-3": (TODAY - timedelta(days=3), 500),
+                "day-2": (TODAY - timedelta(days=2, hours=-1), 300),
+                "day-1": (TODAY - timedelta(days=1), 200),
+            },
+        )
+        await finance_service.create_balance_checkpoints(as_of=checkpoint_at)
+        return cooperative_id, {
+            as_of: await _bank_balance(cooperative_id, as_of=as_of)
+            for as_of in (
+                TODAY - timedelta(days=4),
+                checkpoint_at - timedelta(hours=1),
+                checkpoint_at,
+                checkpoint_at + timedelta(hours=2),
+                TODAY,
+            )
+        }
+
+    async def checkpoints(cooperative_id):
+        return await _bank_checkpoints(cooperative_id), await _bank_balance(
+            cooperative_id
+        )
+
+    cooperative_id, balances = asyncio.run(_run(read()))
+    assert list(balances.values()) == [0, 500, 500, 800, 1000]
+    assert asyncio.run(_run(checkpoints(cooperative_id))) == (
+        [(checkpoint_at, 500)],
+        1000,
+    )
+
+
+@requires_postgres
+def test_back_dated_posting_restates_the_checkpoint(tables):
+    checkpoint_at = TODAY - timedelta(days=1)
+
+    async def post():
+        cooperative_id, _ = await _new_cooperative()
+        await _dated_deposits(
+            cooperative_id,
+            {
+                "before": (TODAY - timedelta(days=2), 500),
+                "after": (TODAY - timedelta(hours=12), 300),
+            },
+        )
+        await finance_service.create_balance_checkpoints(as_of=checkpoint_at)
+        # lands before the checkpoint, which must now include it
+        await _dated_deposits(
+            cooperative_id, {"back-dated": (TODAY - timedelta(days=3), 50)}
+        )
+        return (
+            await _bank_checkpoints(cooperative_id),
+            await _bank_balance(cooperative_id, as_of=checkpoint_at),
+            await _bank_balance(cooperative_id, as_of=TODAY),
+            await _bank_balance(cooperative_id),
+        )
+
+    checkpoints, at_checkpoint, as_of_today, current = asyncio.run(_run(post()))
+    assert checkpoints == [(checkpoint_at, 550)]
+    assert (at_checkpoint, as_of_today, current) == (550, 850, 850)
+
+
+@requires_postgres
+def test_checkpoint_only_holds_off_its_own_cooperative(tables):
+    async def post():
+        cooperative_id, _ = await _new_cooperative()
+        other_cooperative_id, _ = await _new_cooperative()
+        await _dated_deposits(cooperative_id, {"busy": (TODAY, 100)})
+        async with unit_of_work() as session:
+            # the checkpoint's lock is held until this transaction commits
+            await finance_db_handler.create_balance_checkpoints(
+                as_of=TODAY + timedelta(hours=1),
+                cooperative_id=cooperative_id,
+                session=session,
+            )
+            await asyncio.wait_for(
+                _dated_deposits(other_cooperative_id, {"free": (TODAY, 100)}),
+                timeout=5,
+            )
+        return await _bank_balance(other_cooperative_id)
+
+    assert asyncio.run(_run(post())) == 100
+
+
+async def _balances(cooperative_id, member_ids=None) -> dict:
+    balances = await finance_service.get_ledger_balances(
+        cooperative_id=cooperative_id, member_ids=member_ids
+    )
+    return {balance.code: balance.balance for balance in balances}
+
+
+@requires_postgres
+def test_interest_accrues_day_by_day(tables, monkeypatch):
+    # a unit a day on 10_000 saved, two on 10_000 borrowed
+    monkeypatch.setattr(
+        finance_service.settings, "savings_interest_tiers", [(0, 0.0365)]
+    )
+    monkeypatch.setattr(finance_service.settings, "loan_interest_tiers", [(0, 0.073)])
+    first_day = (TODAY - timedelta(days=4)).date()
+
+    async def accrue():
+        cooperative_id, member_id = await _new_cooperative()
+        gl = await _gl_account_ids(cooperative_id)
+        member = {
+            account.code: account.id
+            for account in await finance_db_handler.get_ledger_accounts(
+                cooperative_id=cooperative_id, member_ids=[member_id]
+            )
+        }
+        await finance_service.post_journals(
+            cooperative_id=cooperative_id,
+            entries=[
+                _deposit(
+                    "saved",
+                    gl[ledger_utils.BANK_OPERATING],
+                    member[ledger_utils.SAVINGS],
+                    amount=10_000,
+                    effective_at=TODAY - timedelta(days=5),
+                ),
+                _deposit(
+                    "lent",
+                    member[ledger_utils.LOAN_PRINCIPAL],
+                    gl[ledger_utils.BANK_OPERATING],
+                    amount=10_000,
+                    effective_at=TODAY - timedelta(days=5),
+                ),
+            ],
+        )
+        first = await finance_service.accrue_interest(
+            cooperative_id=cooperative_id, accrual_date=first_day
+        )
+        refused = []
+        for day in (first_day, first_day - timedelta(days=1)):
+            with pytest.raises(ConnectBadRequestException) as e:
+                await finance_service.accrue_interest(
+                    cooperative_id=cooperative_id, accrual_date=day
+                )
+            refused.append(e.value)
+        # the three days since the first are caught up in order
+        caught_up = [
+            report.accrual_date
+            for report in await finance_service.accrue_interest_for_all(
+                accrual_date=first_day + timedelta(days=3)
+            )
+            if report.cooperative_id == cooperative_id
+        ]
+        return (
+            first,
+            len(refused),
+            caught_up,
+            await _balances(cooperative_id, member_ids=[member_id]),
+            await _balances(cooperative_id),
+        )
+
+    first, refused, caught_up, member, gl = asyncio.run(_run(accrue()))
+    assert first.totals == {
+        ledger_utils.SAVINGS: 1,
+        ledger_utils.LOAN_PRINCIPAL: 2,
+    }
+    assert refused == 2
+    assert caught_up == [first_day + timedelta(days=day) for day in (1, 2, 3)]
+    # the GL balances on its own, 1210 reconciles to the member's loan_interest
+    assert sum(gl.values()) == 0
+    assert gl[ledger_utils.INTEREST_RECEIVABLE_LOANS] == 8
+    assert gl[ledger_utils.INTEREST_INCOME_LOANS] == -8
+    assert member[ledger_utils.LOAN_INTEREST] == 8
+    assert gl[ledger_utils.INTEREST_EXPENSE_SAVINGS] == 4
+    assert gl[ledger_utils.INTEREST_PAYABLE_SAVINGS] == -4
@@ -0,0 +1,345 @@
+"""
+Query-plan regression suite: every db_handler query must be answerable from an index.
+
+Each handler runs against a seeded local Postgres while its statements are captured,
+then every captured SELECT/UPDATE/DELETE is EXPLAINed with ``enable_seqscan = off``.
+With sequential scans priced out, a "Seq Scan" left in a plan means no index can
+serve that query, whatever the table size. POSTGRES_URL must point at a throwaway
+database, the tables are (re)created in it:
+
+    QUERY_PLAN_CHECK=1 python -m pytest tests/integration_tests/test_query_plans.py
+"""
+
+import asyncio
+import json
+import os
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event, text
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("QUERY_PLAN_CHECK"),
+    reason="needs a local Postgres in POSTGRES_URL, set QUERY_PLAN_CHECK=1",
+)
+
+if os.environ.get("QUERY_PLAN_CHECK"):
+    import coop_connect.database.db_handlers.cooperative_db_handler as cooperative_db_handler
+    import coop_connect.database.db_handlers.file_db_handler as file_db_handler
+    import coop_connect.database.db_handlers.finance_db_handler as finance_db_handler
+    import coop_connect.database.db_handlers.user_db_handler as user_db_handler
+    import coop_connect.schemas.cooperative_schemas as coop_schemas
+    import coop_connect.schemas.finance_schemas as finance_schemas
+    from coop_connect.database.orms.cooperative_orm import (
+        Cooperative,
+        Member,
+        ReservedBankAccount,
+        Wallet,
+    )
+    from coop_connect.database.orms.misc_orm import File
+    from coop_connect.database.orms.user_orm import MfaToken, User, UserBio
+    from coop_connect.root.app import app  # noqa: F401, registers every ORM
+    from coop_connect.root.coop_enums import CountMode, MembershipStatus
+    from coop_connect.root.database import async_session, engine
+    from coop_connect.root.utils.abstract_base import AbstractBase
+    from coop_connect.root.utils.pagination import NEXT, Cursor
+    from coop_connect.services.service_utils.exception_collection import (
+        InsufficientFunds,
+        NotFound,
+        UpdateError,
+    )
+
+SKIPPED_STATEMENTS = ("INSERT", "EXPLAIN", "SET", "BEGIN", "COMMIT", "ROLLBACK")
+
+
+async def _seed() -> dict:
+    try:
+        return await _seed_tables()
+    finally:
+        await engine.dispose()
+
+
+async def _seed_tables() -> dict:
+    async with engine.begin() as connection:
+        await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await connection.run_sync(AbstractBase.metadata.drop_all)
+        await connection.run_sync(AbstractBase.metadata.create_all)
+
+    user = User(
+        id=uuid4(),
+        first_name="Ada",
+        last_name="Obi",
+        email="ada@example.com",
+        phone_number="+2348030000000",
+        password="x",
+        user_type="Member",
+    )
+    file = File(id=uuid4(), file_name="signature", purpose="Signature", link="x")
+    bio = UserBio(id=uuid4(), user_id=user.id, signature=file.id)
+    cooperative = Cooperative(
+        id=uuid4(),
+        coop_id="COOP-PLAN",
+        name="Plan Cooperative",
+        acronym="PLAN",
+        status="Active",
+        created_by=user.id,
+        public_listing=True,
+    )
+    member = Member(
+        id=uuid4(),
+        user_id=user.id,
+        user_bio=bio.id,
+        cooperative_id=cooperative.id,
+        membership_id="PLAN-2025-1",
+        role="Admin",
+        status=MembershipStatus.ACTIVE,
+        membership_type="Regular",
+    )
+    wallet = Wallet(
+        id=uuid4(),
+        user_id=user.id,
+        cooperative_id=cooperative.id,
+        currency_code="NGN",
+    )
+    bank_account = ReservedBankAccount(
+        id=uuid4(),
+        user_id=user.id,
+        cooperative_id=cooperative.id,
+        account_name="Ada Obi",
+        account_number="0000000000",
+        bank_code="000",
+        bank_name="Bank",
+        currency_code="NGN",
+        provider="payaza",
+        account_reference="ref",
+    )
+    mfa_token = MfaToken(id=uuid4(), email=user.email, code="123456")
+
+    async with async_session() as session:
+        session.add(user)
+        await session.flush()
+        session.add(file)
+        await session.flush()
+        session.add_all([bio, cooperative])
+        await session.flush()
+        session.add_all([member, wallet, bank_account, mfa_token])
+        await session.commit()
+
+    await finance_db_handler.create_gl_accounts(cooperative_id=cooperative.id)
+    await finance_db_handler.create_member_accounts(
+        cooperative_id=cooperative.id, member_ids=[member.id]
+    )
+
+    return {
+        "user": user,
+        "file": file,
+        "cooperative": cooperative,
+        "member": member,
+        "wallet": wallet,
+        "mfa_token": mfa_token,
+        "cursor": Cursor(datetime.utcnow(), uuid4(), NEXT),
+    }
+
+
+async def _post_journal(seed: dict):
+    accounts = await finance_db_handler.get_ledger_accounts(
+        cooperative_id=seed["cooperative"].id, codes=["1010", "2000"]
+    )
+    return await finance_db_handler.post_journals(
+        cooperative_id=seed["cooperative"].id,
+        entries=[
+            finance_schemas.JournalEntry(
+                reference=str(uuid4()),
+                legs=[
+                    finance_schemas.PostingLeg(account_id=accounts[0].id, amount=100),
+                    finance_schemas.PostingLeg(account_id=accounts[1].id, amount=-100),
+                ],
+            )
+        ],
+    )
+
+
+# (name, handler call), every read and update path of the db_handlers
+HANDLER_CALLS = {
+    "user.get_user_email": lambda s: user_db_handler.get_user(email=s["user"].email),
+    "user.get_user_phone": lambda s: user_db_handler.get_user(
+        phone_number=s["user"].phone_number
+    ),
+    "user.get": lambda s: user_db_handler.get(user_id=s["user"].id),
+    "user.update_user_password": lambda s: user_db_handler.update_user_password(
+        user_id=s["user"].id, password="x"
+    ),
+    "user.get_mfa_token": lambda s: user_db_handler.get_mfa_token(
+        code=s["mfa_token"].code
+    ),
+    "user.get_mfa_token_via_user_info": lambda s: (
+        user_db_handler.get_mfa_token_via_user_info(email=s["user"].email)
+    ),
+    "user.update_mfa_token": lambda s: user_db_handler.update_mfa_token(
+        id=s["mfa_token"].id
+    ),
+    "user.get_user_bio": lambda s: user_db_handler.get_user_bio(user_id=s["user"].id),
+    "file.get": lambda s: file_db_handler.get(file_id=s["file"].id),
+    "cooperative.get_cooperative_via_accronym": lambda s: (
+        cooperative_db_handler.get_cooperative_via_accronym(
+            acronym=s["cooperative"].acronym
+        )
+    ),
+    "cooperative.get_cooperative": lambda s: cooperative_db_handler.get_cooperative(
+        id=s["cooperative"].id
+    ),
+    "cooperative.get_cooperatives": lambda s: cooperative_db_handler.get_cooperatives(
+        public_listing=True
+    ),
+    "cooperative.get_cooperatives_cursor": lambda s: (
+        cooperative_db_handler.get_cooperatives(
+            cursor=s["cursor"], count_mode=CountMode.CACHED
+        )
+    ),
+    "cooperative.get_cooperatives_search": lambda s: (
+        cooperative_db_handler.get_cooperatives(search="plan")
+    ),
+    "cooperative.get_coop_member_via_user_id": lambda s: (
+        cooperative_db_handler.get_coop_member_via_user_id(
+            user_id=s["user"].id, cooperative_id=s["cooperative"].id
+        )
+    ),
+    "cooperative.get_user_memberships": lambda s: (
+        cooperative_db_handler.get_user_memberships(user_id=s["user"].id)
+    ),
+    "cooperative.get_coop_member": lambda s: cooperative_db_handler.get_coop_member(
+        id=s["member"].id, cooperative_id=s["cooperative"].id
+    ),
+    "cooperative.get_all_members": lambda s: cooperative_db_handler.get_all_members(
+        id=s["cooperative"].id,
+        status=MembershipStatus.ACTIVE,
+        count_mode=CountMode.CACHED,
+    ),
+    "cooperative.get_all_members_search": lambda s: (
+        cooperative_db_handler.get_all_members(id=s["cooperative"].id, search="ada")
+    ),
+    "cooperative.update_coop_membership": lambda s: (
+        cooperative_db_handler.update_coop_membership(
+            coop_member_update=coop_schemas.MembershipExtendedUpdate(
+                status=MembershipStatus.ACTIVE
+            ),
+            coop_member_id=s["member"].id,
+            coop_id=s["cooperative"].id,
+        )
+    ),
+    "cooperative.allocate_membership_numbers": lambda s: (
+        cooperative_db_handler.allocate_membership_numbers(
+            cooperative_id=s["cooperative"].id, year=2025
+        )
+    ),
+    "finance.get_wallet": lambda s: finance_db_handler.get_wallet(
+        user_id=s["user"].id, cooperative_id=s["cooperative"].id
+    ),
+    "finance.update_wallet": lambda s: finance_db_handler.update_wallet(
+        wallet_details=finance_schemas.WalletUpdate(is_active=True),
+        wallet_id=s["wallet"].id,
+    ),
+    "finance.credit_wallet": lambda s: finance_db_handler.credit_wallet(
+        wallet_id=s["wallet"].id, amount=100
+    ),
+    "finance.debit_wallet": lambda s: finance_db_handler.debit_wallet(
+        wallet_id=s["wallet"].id, amount=10**12
+    ),
+    "finance.get_bank_account": lambda s: finance_db_handler.get_bank_account(
+        user_id=s["user"].id, cooperative_id=s["cooperative"].id
+    ),
+    "finance.get_ledger_accounts": lambda s: finance_db_handler.get_ledger_accounts(
+        cooperative_id=s["cooperative"].id
+    ),
+    "finance.get_member_ledger_accounts": lambda s: (
+        finance_db_handler.get_ledger_accounts(
+            cooperative_id=s["cooperative"].id, member_ids=[s["member"].id]
+        )
+    ),
+    "finance.post_journals": _post_journal,
+    "finance.get_ledger_balances": lambda s: finance_db_handler.get_ledger_balances(
+        cooperative_id=s["cooperative"].id, member_ids=[s["member"].id]
+    ),
+    "finance.get_interest_accrual_inputs": lambda s: (
+        finance_db_handler.get_interest_accrual_inputs(
+            cooperative_id=s["cooperative"].id,
+            codes=["savings", "loan_principal"],
+            as_of=datetime.utcnow(),
+            member_detail_codes={"loan_principal": "loan_interest"},
+        )
+    ),
+    "finance.get_interest_accrued_through": lambda s: (
+        finance_db_handler.get_interest_accrued_through(
+            cooperative_id=s["cooperative"].id
+        )
+    ),
+    "finance.get_ledger_balances_as_of": lambda s: (
+        finance_db_handler.get_ledger_balances(
+            cooperative_id=s["cooperative"].id,
+            codes=["1010", "2000"],
+            as_of=datetime.utcnow(),
+        )
+    ),
+}
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    scans = []
+    if plan.get("Node Type") == "Seq Scan":
+        scans.append(plan.get("Relation Name", "?"))
+    for child in plan.get("Plans", []):
+        scans.extend(_seq_scans(child))
+    return scans
+
+
+async def _captured_statements(call, seed: dict) -> list[tuple]:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(SKIPPED_STATEMENTS):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await call(seed)
+    except (InsufficientFunds, NotFound, UpdateError):
+        pass
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    return statements
+
+
+async def _plan_seq_scans(name: str, seed: dict) -> list[str]:
+    try:
+        statements = await _captured_statements(HANDLER_CALLS[name], seed)
+        assert statements, f"{name} ran no queries"
+
+        failures = []
+        async with engine.connect() as connection:
+            await connection.exec_driver_sql("SET enable_seqscan = off")
+            for statement, parameters in statements:
+                plan = (
+                    await connection.exec_driver_sql(
+                        f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                    )
+                ).scalar_one()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                for table in _seq_scans(plan[0]["Plan"]):
+                    failures.append(f"Seq Scan on {table}: {statement}")
+            await connection.rollback()
+        return failures
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def seed():
+    return asyncio.run(_seed())
+
+
+@pytest.mark.parametrize("name", sorted(HANDLER_CALLS))
+def test_handler_queries_use_indexes(name, seed):
+    failures = asyncio.run(_plan_seq_scans(name, seed))
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,134 @@
+"""
+Read-replica routing against two local Postgres databases.
+
+POSTGRES_URL and POSTGRES_REPLICA_URL must point at two throwaway databases that do
+NOT replicate: a row written through the primary is then missing on the "replica",
+which shows where each read went. The tables are (re)created in both:
+
+    REPLICA_CHECK=1 python -m pytest tests/integration_tests/test_read_replica.py
+"""
+
+import asyncio
+import os
+from uuid import uuid4
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("REPLICA_CHECK"),
+    reason="needs two local Postgres in POSTGRES_URL/POSTGRES_REPLICA_URL, "
+    "set REPLICA_CHECK=1",
+)
+
+if os.environ.get("REPLICA_CHECK"):
+    import coop_connect.database.db_handlers.cooperative_db_handler as cooperative_db_handler
+    import coop_connect.database.db_handlers.user_db_handler as user_db_handler
+    from coop_connect.database.orms.cooperative_orm import Cooperative
+    from coop_connect.database.orms.user_orm import User
+    from coop_connect.root.app import app  # noqa: F401, registers every ORM
+    from coop_connect.root.database import (
+        async_session,
+        bind_request_user,
+        engine,
+        replica_engine,
+    )
+    from coop_connect.root.utils.abstract_base import AbstractBase
+    from coop_connect.services.service_utils.exception_collection import NotFound
+
+
+async def _create_tables():
+    try:
+        for bind in (engine, replica_engine):
+            async with bind.begin() as connection:
+                await connection.run_sync(AbstractBase.metadata.drop_all)
+                await connection.run_sync(AbstractBase.metadata.create_all)
+    finally:
+        await engine.dispose()
+        await replica_engine.dispose()
+
+
+async def _request(user_id, read_id, write: bool = False) -> bool:
+    """
+    One request authenticated as ``user_id`` (None for anonymous): optionally writes
+    ``user_id`` as a user and ``read_id`` as a cooperative it created, then tells
+    whether reading the cooperative back finds it.
+    """
+    try:
+        if user_id is not None:
+            bind_request_user(user_id=user_id)
+        if write:
+            async with async_session() as session:
+                session.add(
+                    User(
+                        id=user_id,
+                        first_name="Ada",
+                        last_name="Obi",
+                        email=f"{user_id}@example.com",
+                        password="x",
+                        user_type="Cooperative Member",
+                    )
+                )
+                await session.flush()
+                session.add(
+                    Cooperative(
+                        id=read_id,
+                        coop_id=str(read_id),
+                        name=str(read_id),
+                        acronym=str(read_id),
+                        status="Active",
+                        created_by=user_id,
+                        onboarding_requirements=[],
+                    )
+                )
+                await session.commit()
+        try:
+            await cooperative_db_handler.get_cooperative(id=read_id)
+            return True
+        except NotFound:
+            return False
+    finally:
+        await engine.dispose()
+        await replica_engine.dispose()
+
+
+async def _get_user(user_id) -> bool:
+    """An anonymous request authenticating ``user_id``, tells whether it is found."""
+    try:
+        await user_db_handler.get(user_id=user_id)
+        return True
+    except NotFound:
+        return False
+    finally:
+        await engine.dispose()
+        await replica_engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def writer():
+    assert engine is not replica_engine, "POSTGRES_REPLICA_URL is not set"
+    asyncio.run(_create_tables())
+    user_id, cooperative_id = uuid4(), uuid4()
+    # written to the primary only, read back within the same request
+    assert asyncio.run(_request(user_id=user_id, read_id=cooperative_id, write=True))
+    return user_id, cooperative_id
+
+
+def test_writer_reads_own_writes_in_later_requests(writer):
+    user_id, cooperative_id = writer
+    assert asyncio.run(_request(user_id=user_id, read_id=cooperative_id))
+
+
+def test_other_users_read_from_replica(writer):
+    _, cooperative_id = writer
+    assert not asyncio.run(_request(user_id=uuid4(), read_id=cooperative_id))
+
+
+def test_anonymous_requests_read_from_replica(writer):
+    _, cooperative_id = writer
+    assert not asyncio.run(_request(user_id=None, read_id=cooperative_id))
+
+
+def test_authentication_reads_from_primary(writer):
+    # nobody is pinned to the primary here, a revoked role must still be seen
+    user_id, _ = writer
+    assert asyncio.run(_get_user(user_id=user_id))
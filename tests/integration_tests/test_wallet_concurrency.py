@@ -0,0 +1,161 @@
+"""
+Wallet credit/debit under concurrency: OPERATIONS changes race for one wallet row
+through the whole connection pool, and no update may be lost or overdraw it.
+Settings updates are checked here as well.
+
+POSTGRES_URL must point at a throwaway database, the tables are (re)created in it:
+
+    WALLET_CONCURRENCY_CHECK=1 python -m pytest tests/integration_tests/test_wallet_concurrency.py
+"""
+
+import asyncio
+import os
+import random
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("WALLET_CONCURRENCY_CHECK"),
+    reason="needs a local Postgres in POSTGRES_URL, set WALLET_CONCURRENCY_CHECK=1",
+)
+
+if os.environ.get("WALLET_CONCURRENCY_CHECK"):
+    import coop_connect.database.db_handlers.finance_db_handler as finance_db_handler
+    import coop_connect.schemas.finance_schemas as schemas
+    from coop_connect.database.orms.cooperative_orm import Cooperative, Wallet
+    from coop_connect.database.orms.user_orm import User
+    from coop_connect.root.app import app  # noqa: F401, registers every ORM
+    from coop_connect.root.database import async_session, engine
+    from coop_connect.root.utils.abstract_base import AbstractBase
+    from coop_connect.services.service_utils.exception_collection import (
+        InsufficientFunds,
+        UpdateError,
+    )
+
+OPERATIONS = 1000
+
+
+async def _create_tables():
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await connection.run_sync(AbstractBase.metadata.drop_all)
+            await connection.run_sync(AbstractBase.metadata.create_all)
+    finally:
+        await engine.dispose()
+
+
+async def _new_wallet(balance: int):
+    suffix = uuid4().hex[:6].upper()
+    user = User(
+        id=uuid4(),
+        first_name="Ada",
+        last_name="Obi",
+        email=f"{uuid4()}@example.com",
+        password="x",
+        user_type="Member",
+    )
+    cooperative = Cooperative(
+        id=uuid4(),
+        coop_id=f"COOP-{suffix}",
+        name=f"Wallet Cooperative {suffix}",
+        acronym=suffix,
+        status="Active",
+        created_by=user.id,
+        onboarding_requirements=[],
+    )
+    wallet = Wallet(
+        id=uuid4(),
+        user_id=user.id,
+        cooperative_id=cooperative.id,
+        balance=balance,
+        currency_code="NGN",
+    )
+    async with async_session() as session:
+        session.add(user)
+        await session.flush()
+        session.add(cooperative)
+        await session.flush()
+        session.add(wallet)
+        await session.commit()
+    return wallet.id
+
+
+async def _race(opening_balance: int, deltas: list[int]):
+    """Applies every delta concurrently, returns the final wallet and which applied."""
+    try:
+        wallet_id = await _new_wallet(balance=opening_balance)
+
+        async def apply(delta: int) -> bool:
+            try:
+                if delta > 0:
+                    await finance_db_handler.credit_wallet(
+                        wallet_id=wallet_id, amount=delta
+                    )
+                else:
+                    await finance_db_handler.debit_wallet(
+                        wallet_id=wallet_id, amount=-delta
+                    )
+                return True
+            except InsufficientFunds:
+                return False
+
+        applied = await asyncio.gather(*[apply(delta) for delta in deltas])
+        async with async_session() as session:
+            wallet = await session.get(Wallet, wallet_id)
+        return wallet, applied
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def tables():
+    asyncio.run(_create_tables())
+
+
+def test_concurrent_credits_are_all_applied():
+    wallet, applied = asyncio.run(_race(opening_balance=0, deltas=[7] * OPERATIONS))
+    assert all(applied)
+    assert wallet.balance == 7 * OPERATIONS
+    assert wallet.version == OPERATIONS
+
+
+def test_concurrent_debits_never_overdraw():
+    wallet, applied = asyncio.run(_race(opening_balance=100, deltas=[-1] * OPERATIONS))
+    assert wallet.balance == 0
+    assert applied.count(True) == 100
+    assert wallet.version == 100
+
+
+def test_mixed_credits_and_debits_balance_out():
+    rng = random.Random(23)
+    deltas = [rng.choice([-3, -1, 2, 5]) for _ in range(OPERATIONS)]
+    wallet, applied = asyncio.run(_race(opening_balance=50, deltas=deltas))
+    # which debits are refused depends on the interleaving, but every applied
+    # change is in the balance exactly once
+    assert wallet.balance == 50 + sum(delta for delta, ok in zip(deltas, applied) if ok)
+    assert wallet.version == applied.count(True)
+    assert all(ok for delta, ok in zip(deltas, applied) if delta > 0)
+
+
+def test_wallet_settings_update():
+    async def update():
+        try:
+            wallet_id = await _new_wallet(balance=10)
+            with pytest.raises(UpdateError):
+                # no SET values, nothing is sent to the database
+                await finance_db_handler.update_wallet(
+                    wallet_details=schemas.WalletUpdate(), wallet_id=wallet_id
+                )
+            return await finance_db_handler.update_wallet(
+                wallet_details=schemas.WalletUpdate(is_active=False),
+                wallet_id=wallet_id,
+            )
+        finally:
+            await engine.dispose()
+
+    wallet = asyncio.run(update())
+    assert wallet.is_active is False
+    assert wallet.balance == 10
@@ -0,0 +1,42 @@
+"""In-process caches: no database needed."""
+
+from datetime import datetime
+from uuid import uuid4
+
+from coop_connect.schemas.user_schemas import Address, UserBioRead, UserProfile
+from coop_connect.services.service_utils import cache_utils
+
+
+def _user() -> UserProfile:
+    return UserProfile(
+        id=uuid4(),
+        first_name="Ada",
+        last_name="Obi",
+        password="x",
+        date_created_utc=datetime(2026, 1, 31),
+        bio=UserBioRead(
+            id=uuid4(),
+            bvn="12345678901",
+            address=Address(
+                street="1 Marina", city="Lagos", state="Lagos", country="NG"
+            ),
+        ),
+    )
+
+
+def test_cached_user_is_not_shared_with_callers():
+    user = _user()
+    handed_out = cache_utils.cache_user(user)
+    handed_out.first_name = "Changed"
+    handed_out.bio.bvn = "changed"
+
+    cached = cache_utils.get_cached_user(user.id)
+    cached.bio.address.city = "Abuja"
+    cached.bio = None
+
+    again = cache_utils.get_cached_user(user.id)
+    assert again.first_name == "Ada"
+    assert again.bio.bvn == "12345678901"
+    assert again.bio.address.city == "Lagos"
+    cache_utils.invalidate_user(user.id)
+    assert cache_utils.get_cached_user(user.id) is None
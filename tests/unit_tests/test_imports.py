@@ -0,0 +1,24 @@
+"""
+Modules that must import on their own, each in a fresh interpreter: mapper
+configuration during an import fails until every ORM module is loaded.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+MODULES = [
+    "coop_connect.root.dependencies",
+    "coop_connect.database.db_handlers.finance_db_handler",
+    "tests.benchmarks.bench_hot_account_posting",
+    "tests.benchmarks.bench_ledger_posting",
+]
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_module_imports_on_its_own(module):
+    result = subprocess.run(
+        [sys.executable, "-c", f"import {module}"], capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,131 @@
+"""Daily interest accrual, pure numpy: no database needed."""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from coop_connect.services.service_utils import interest_utils
+from coop_connect.services.service_utils.interest_utils import (
+    LOAN_INTEREST,
+    RATE_SCALE,
+    SAVINGS_INTEREST,
+)
+
+DAY_COUNT = 365
+
+
+def _accrue_days(principal, schedule, days):
+    """Posted total and final residual of ``days`` accruals on ``principal``."""
+    residual = np.zeros(len(principal), dtype=np.int64)
+    posted = np.zeros(len(principal), dtype=np.int64)
+    for _ in range(days):
+        amount, residual = interest_utils.accrue(
+            principal=principal,
+            residual=residual,
+            schedule=schedule,
+            day_count=DAY_COUNT,
+        )
+        posted += amount
+    return posted, residual
+
+
+def test_tier_schedule_sorts_and_scales_rates():
+    schedule = interest_utils.tier_schedule([(100_000, 0.03), (0, 0.0525)])
+
+    assert schedule.thresholds.tolist() == [0, 100_000]
+    assert schedule.rates.tolist() == [52_500, 30_000]
+    assert schedule.rates.dtype == np.int64
+
+
+@pytest.mark.parametrize(
+    "tiers",
+    [
+        [],
+        [(1, 0.05)],
+        [(0, 0.05), (0, 0.04)],
+        [(0, -0.01)],
+        [(0, 0.0000001)],
+    ],
+)
+def test_tier_schedule_rejects(tiers):
+    with pytest.raises(ValueError):
+        interest_utils.tier_schedule(tiers)
+
+
+def test_daily_interest_applies_each_rate_to_its_band():
+    schedule = interest_utils.tier_schedule([(0, 0.04), (1_000, 0.06)])
+    principal = np.array([0, 500, 1_000, 1_500], dtype=np.int64)
+
+    assert interest_utils.daily_interest(principal, schedule).tolist() == [
+        0,
+        500 * 40_000,
+        1_000 * 40_000,
+        1_000 * 40_000 + 500 * 60_000,
+    ]
+
+
+def test_daily_interest_refuses_to_overflow():
+    schedule = interest_utils.tier_schedule([(0, 1.0)])
+
+    with pytest.raises(ValueError):
+        interest_utils.daily_interest(np.array([2**62], dtype=np.int64), schedule)
+
+
+def test_accrue_carries_fractions_until_they_make_a_unit():
+    schedule = interest_utils.tier_schedule([(0, 0.05)])
+    principal = np.array([1_000], dtype=np.int64)  # 50 a year, 0.137 a day
+
+    amount, residual = interest_utils.accrue(
+        principal=principal,
+        residual=np.zeros(1, dtype=np.int64),
+        schedule=schedule,
+        day_count=DAY_COUNT,
+    )
+    assert amount.tolist() == [0]
+    assert residual.tolist() == [1_000 * 50_000]
+
+    posted, residual = _accrue_days(principal, schedule, 8)
+    assert posted.tolist() == [1]
+    assert residual.tolist() == [8 * 1_000 * 50_000 - RATE_SCALE * DAY_COUNT]
+
+
+def test_accrue_posts_a_year_of_tiered_interest_exactly():
+    schedule = interest_utils.tier_schedule([(0, 0.05), (100_000, 0.03)])
+    principal = np.array([150_000, 100_000, 7, 0], dtype=np.int64)
+
+    posted, residual = _accrue_days(principal, schedule, DAY_COUNT)
+
+    assert posted.tolist() == [6_500, 5_000, 0, 0]
+    assert residual.tolist() == [0, 0, 7 * 50_000 * DAY_COUNT, 0]
+
+
+def test_accrue_accounts_mixes_products():
+    schedules = {
+        SAVINGS_INTEREST: interest_utils.tier_schedule([(0, 0.0365)]),
+        LOAN_INTEREST: interest_utils.tier_schedule([(0, 0.073)]),
+    }
+    codes = np.array([SAVINGS_INTEREST.code, LOAN_INTEREST.code, "fees", "savings"])
+    # savings are credit balances, overdrawn savings and fees accrue nothing
+    balances = np.array([-10_000, 10_001, 10_000, 10_000], dtype=np.int64)
+    residuals = np.array([0, RATE_SCALE * DAY_COUNT - 1, 5, 0], dtype=np.int64)
+
+    amounts, carried, totals = interest_utils.accrue_accounts(
+        codes=codes,
+        balances=balances,
+        residuals=residuals,
+        schedules=schedules,
+        day_count=DAY_COUNT,
+    )
+
+    assert amounts.tolist() == [1, 3, 0, 0]
+    # 10_001 * 73_000 + the residual is three units and 72_999 over
+    assert carried.tolist() == [0, 72_999, 5, 0]
+    assert totals == {SAVINGS_INTEREST.code: 1, LOAN_INTEREST.code: 3}
+
+
+def test_accrual_reference_is_per_product_and_day():
+    assert (
+        interest_utils.accrual_reference(LOAN_INTEREST, date(2026, 1, 31))
+        == "interest-accrual:loan_principal:2026-01-31"
+    )
@@ -0,0 +1,47 @@
+"""Keyset cursors, pure encoding: no database needed."""
+
+import base64
+import json
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from coop_connect.root.utils.pagination import (
+    NEXT,
+    PREV,
+    Cursor,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+def _cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_cursor_round_trip():
+    id, date_created_utc = uuid4(), datetime(2026, 1, 31, 12, 30)
+
+    assert decode_cursor(encode_cursor(date_created_utc, id, PREV)) == Cursor(
+        date_created_utc, id, PREV
+    )
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+        _cursor("not a list"),
+        _cursor(["2026-01-31T00:00:00", str(uuid4())]),
+        _cursor(["2026-01-31T00:00:00", 123, NEXT]),
+        _cursor(["2026-01-31T00:00:00", "not a uuid", NEXT]),
+        _cursor([20260131, str(uuid4()), NEXT]),
+        _cursor(["yesterday", str(uuid4()), NEXT]),
+        _cursor(["2026-01-31T00:00:00", str(uuid4()), "sideways"]),
+    ],
+)
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)